@@ -0,0 +1,24 @@
+"""
+Mode multi-workers: gunicorn + workers uvicorn avec prechargement de l'application.
+
+    gunicorn -c backend/gunicorn.conf.py backend.main:app
+
+WEB_CONCURRENCY fixe le nombre de workers (defaut 1). Le maitre importe l'app une fois
+(poids modeles charges avant fork, partages en copy-on-write); chaque worker construit
+ses graphes MediaPipe et son interpreteur TFLite au demarrage (evenement startup).
+"""
+
+import gc
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+
+
+def when_ready(server):
+    # Gele les objets deja alloues: le GC des workers ne touchera plus leurs pages,
+    # ce qui evite de casser le partage copy-on-write.
+    gc.freeze()
@@ -1,13 +1,15 @@
 from __future__ import annotations
 
+import time
 from pathlib import Path
 from typing import Any, Dict
 
-from fastapi import FastAPI
-from fastapi.responses import FileResponse, JSONResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 
-from backend.src.web_api import api_router, get_meta_info, get_runtime_status, shutdown_services
+from backend.src.metrics import METRICS
+from backend.src.static_files import IMMUTABLE_PREFIX, StaticManifest
+from backend.src.web_api import api_router, get_meta_info, get_runtime_status, shutdown_services, startup_services
 
 app = FastAPI(title="AI Playground API", version="1.0.0")
 app.include_router(api_router)
@@ -26,30 +28,41 @@ def api_meta() -> Dict[str, Any]:
     return get_meta_info()
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> str:
+    METRICS.set_counter("process_cpu_seconds_total", time.process_time())
+    return METRICS.render_prometheus()
+
+
+@app.on_event("startup")
+def on_startup() -> None:
+    startup_services()
+
+
 @app.on_event("shutdown")
 def on_shutdown() -> None:
     shutdown_services()
 
 
 STATIC_DIR = Path(__file__).resolve().parent / "static"
-if STATIC_DIR.exists() and (STATIC_DIR / "assets").exists():
-    app.mount("/assets", StaticFiles(directory=str(STATIC_DIR / "assets")), name="assets")
+# Construit a l'import: une seule fois avant le fork avec gunicorn --preload
+STATIC = StaticManifest.build(STATIC_DIR) if STATIC_DIR.exists() else None
 
 
-@app.get("/{full_path:path}")
-def spa_fallback(full_path: str):
-    if full_path.startswith("api") or full_path == "health":
+@app.api_route("/{full_path:path}", methods=["GET", "HEAD"])
+def spa_fallback(full_path: str, request: Request):
+    if full_path.startswith("api") or full_path in ("health", "metrics"):
         return JSONResponse({"message": "Not found"}, status_code=404)
 
-    if not STATIC_DIR.exists():
+    if STATIC is None:
         return JSONResponse({"message": "Frontend build not found"}, status_code=503)
 
-    requested = STATIC_DIR / full_path
-    if full_path and requested.exists() and requested.is_file():
-        return FileResponse(requested)
-
-    index_file = STATIC_DIR / "index.html"
-    if index_file.exists():
-        return FileResponse(index_file)
+    asset = STATIC.get(full_path) if full_path else None
+    if asset is None:
+        if full_path.startswith(IMMUTABLE_PREFIX):
+            return JSONResponse({"message": "Not found"}, status_code=404)
+        asset = STATIC.get("index.html")
+    if asset is not None:
+        return STATIC.response(asset, request.headers, request.method)
 
     return JSONResponse({"message": "Frontend build not found"}, status_code=503)
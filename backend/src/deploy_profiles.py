@@ -0,0 +1,95 @@
+"""
+Profils de deploiement (DEPLOY_PROFILE): le processus n'importe et ne construit que les
+pipelines du profil.
+
+- `asl`: MediaPipe Hands + classifieur TFLite (routes /api/asl/*);
+- `segmentation`: Pose + FaceMesh, sans runtime TFLite (routes /api/segmentation/*);
+- `all` (defaut): les deux.
+
+Les modules propres a un pipeline sont importes une fois au chargement de l'app (avant le
+fork des workers, pages partagees) par `import_pipeline_modules`, et jamais pour un pipeline
+absent du profil. `FootprintReport` mesure le temps et le RSS de l'import puis du demarrage.
+"""
+
+from __future__ import annotations
+
+import importlib
+import sys
+import time
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from .memwatch import read_rss_bytes
+
+PIPELINES = ("asl", "segmentation")
+PROFILES: Dict[str, FrozenSet[str]] = {
+    "asl": frozenset({"asl"}),
+    "segmentation": frozenset({"segmentation"}),
+    "all": frozenset(PIPELINES),
+}
+# Modules relatifs a ce paquet (prefixe ".") ou absolus
+PIPELINE_MODULES: Dict[str, Tuple[str, ...]] = {
+    "asl": (".hand_roi", ".tflite_infer", ".inference_backends"),
+    "segmentation": ("mediapipe",),
+}
+HEAVY_MODULES = ("mediapipe", "tflite_runtime", "tensorflow", "onnxruntime", "kagglehub")
+
+
+def resolve_profile(name: str) -> Tuple[str, FrozenSet[str]]:
+    """(nom du profil, pipelines); profil inconnu = `all` avec un avertissement."""
+    key = name.strip().lower()
+    if key not in PROFILES:
+        print(f"[Profile] DEPLOY_PROFILE={name!r} inconnu (choix: {', '.join(PROFILES)}), profil 'all'")
+        key = "all"
+    return key, PROFILES[key]
+
+
+def import_pipeline_modules(pipelines: FrozenSet[str]) -> None:
+    for pipeline in PIPELINES:
+        if pipeline in pipelines:
+            for module in PIPELINE_MODULES[pipeline]:
+                importlib.import_module(module, __package__)
+
+
+def loaded_heavy_modules() -> List[str]:
+    return [name for name in HEAVY_MODULES if name in sys.modules]
+
+
+def _mb(value: int) -> float:
+    return round(value / (1024 * 1024), 1)
+
+
+class FootprintReport:
+    """Temps et RSS par phase (`import`, `startup`) pour le profil du processus."""
+
+    def __init__(self, profile: str, pipelines: FrozenSet[str]) -> None:
+        self.profile = profile
+        self.pipelines = sorted(pipelines)
+        self.phases: Dict[str, Dict[str, Any]] = {}
+
+    def mark(self, phase: str, started: float, rss_before: Optional[int] = None) -> Dict[str, Any]:
+        rss = read_rss_bytes()
+        self.phases[phase] = {
+            "ms": round((time.perf_counter() - started) * 1000.0, 1),
+            "rssMb": _mb(rss),
+            "rssDeltaMb": _mb(rss - rss_before) if rss_before is not None else None,
+        }
+        return self.phases[phase]
+
+    def summary(self) -> str:
+        phases = "  ".join(
+            f"{phase} {values['ms']:.0f} ms (RSS {values['rssMb']:.0f} Mo"
+            + (f", {values['rssDeltaMb']:+.0f})" if values["rssDeltaMb"] is not None else ")")
+            for phase, values in self.phases.items()
+        )
+        return (
+            f"profil={self.profile} pipelines={','.join(self.pipelines)}  {phases}  "
+            f"modules: {', '.join(loaded_heavy_modules()) or 'aucun'}"
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.profile,
+            "pipelines": self.pipelines,
+            "phases": self.phases,
+            "heavyModules": loaded_heavy_modules(),
+        }
@@ -0,0 +1,81 @@
+"""
+Lecture des frames envoyees en `application/octet-stream` (sans multipart).
+
+Le corps est lu par morceaux dans un tampon pre-alloue reutilise entre requetes;
+la lecture s'arrete des que API_FRAME_MAX_SIZE est depasse (ou des l'en-tete
+Content-Length), et le decodeur recoit une memoryview sur le tampon, sans copie.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import List, Optional
+
+from fastapi import HTTPException, Request
+
+
+class BufferPool:
+    """Tampons `bytearray` de taille fixe; un tampon non rendu est simplement ramasse par le GC."""
+
+    def __init__(self, capacity: int, max_buffers: int = 8) -> None:
+        self.capacity = capacity
+        self.max_buffers = max(1, max_buffers)
+        self._lock = threading.Lock()
+        self._free: List[bytearray] = []
+
+    def acquire(self) -> bytearray:
+        with self._lock:
+            if self._free:
+                return self._free.pop()
+        return bytearray(self.capacity)
+
+    def release(self, buffer: bytearray) -> None:
+        with self._lock:
+            if len(self._free) < self.max_buffers:
+                self._free.append(buffer)
+
+
+class FrameBody:
+    """Corps de requete lu dans un tampon du pool; `release()` une fois la frame decodee."""
+
+    def __init__(self, pool: BufferPool, buffer: bytearray, length: int) -> None:
+        self._pool = pool
+        self._buffer: Optional[bytearray] = buffer
+        self.length = length
+
+    @property
+    def view(self) -> memoryview:
+        if self._buffer is None:
+            raise RuntimeError("Tampon deja rendu au pool")
+        return memoryview(self._buffer)[: self.length]
+
+    def release(self) -> None:
+        if self._buffer is not None:
+            self._pool.release(self._buffer)
+            self._buffer = None
+
+
+def _too_large(size: int) -> HTTPException:
+    return HTTPException(status_code=413, detail=f"Frame too large ({size} bytes)")
+
+
+async def read_frame_body(request: Request, max_size: int, pool: BufferPool) -> FrameBody:
+    declared = request.headers.get("content-length")
+    if declared is not None and declared.isdigit() and int(declared) > max_size:
+        raise _too_large(int(declared))
+    buffer = pool.acquire()
+    length = 0
+    try:
+        async for chunk in request.stream():
+            end = length + len(chunk)
+            if end > max_size:
+                raise _too_large(end)
+            buffer[length:end] = chunk
+            length = end
+    except BaseException:
+        pool.release(buffer)
+        raise
+    if length == 0:
+        pool.release(buffer)
+        raise HTTPException(status_code=400, detail="Corps de requete vide")
+    return FrameBody(pool, buffer, length)
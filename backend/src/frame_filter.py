@@ -0,0 +1,75 @@
+"""Pre-filtre de changement de scene: court-circuite les frames quasi identiques."""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .sessions import SessionStore
+
+SIGNATURE_SIZE = (32, 24)
+
+
+def frame_signature(frame: np.ndarray, size: Tuple[int, int] = SIGNATURE_SIZE) -> np.ndarray:
+    """Signature niveaux de gris sous-echantillonnee (32x24 par defaut)."""
+    small = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+    if small.ndim == 3:
+        small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    return small
+
+
+@dataclass
+class _SessionFrames:
+    signatures: Dict[str, np.ndarray] = field(default_factory=dict)
+    results: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+
+class FrameChangeDetector:
+    """
+    Garde, par session et par pipeline, la signature de la derniere frame traitee
+    et le resultat associe. Un seuil <= 0 desactive le filtre.
+    """
+
+    def __init__(self, threshold: float, max_sessions: int = 128) -> None:
+        self.threshold = float(threshold)
+        self.sessions: SessionStore[_SessionFrames] = SessionStore(_SessionFrames, max_sessions=max_sessions)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0
+
+    def check(self, session_id: str, pipeline: str, frame: np.ndarray) -> Tuple[Optional[Dict[str, Any]], Optional[np.ndarray]]:
+        """Retourne (resultat precedent ou None, signature de la frame courante)."""
+        if not self.enabled:
+            return None, None
+        signature = frame_signature(frame)
+        state = self.sessions.get(session_id)
+        previous = state.signatures.get(pipeline)
+        cached = state.results.get(pipeline)
+        if previous is not None and cached is not None and previous.shape == signature.shape:
+            diff = float(cv2.absdiff(previous, signature).mean())
+            if diff < self.threshold:
+                with self._lock:
+                    self.hits += 1
+                return {**cached, "frameReused": True}, signature
+        with self._lock:
+            self.misses += 1
+        return None, signature
+
+    def update(self, session_id: str, pipeline: str, signature: Optional[np.ndarray], result: Dict[str, Any]) -> None:
+        if signature is None:
+            return
+        state = self.sessions.get(session_id)
+        state.signatures[pipeline] = signature
+        state.results[pipeline] = result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"threshold": self.threshold, "hits": self.hits, "misses": self.misses}
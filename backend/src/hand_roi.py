@@ -5,7 +5,7 @@ Détection de la main avec MediaPipe et extraction de la ROI (Region of Interest
 import cv2
 import numpy as np
 import mediapipe as mp
-from typing import Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 
 class HandROIExtractor:
@@ -14,21 +14,36 @@ class HandROIExtractor:
     """
     
     def __init__(self, padding_ratio=0.2, min_detection_confidence=0.5, 
-                 min_tracking_confidence=0.5):
+                 min_tracking_confidence=0.5, max_num_hands=1, hands=None,
+                 oriented_size: Optional[Tuple[int, int]] = None):
         """
         Args:
             padding_ratio: Ratio de padding à ajouter autour du bounding box (0.2 = 20%)
             min_detection_confidence: Confiance minimale pour la détection
             min_tracking_confidence: Confiance minimale pour le tracking
+            max_num_hands: Nombre maximal de mains détectées (1 par défaut pour ASL)
+            hands: Détecteur déjà construit exposant process(rgb) avec des résultats
+                au format mp.solutions.hands (ex: moteur MediaPipe Tasks). Par défaut,
+                un détecteur legacy mp.solutions.hands.Hands est créé.
+            oriented_size: (largeur, hauteur) de l'entrée du modèle. Si fourni,
+                extract_rois produit des ROI orientées (axe poignet -> majeur),
+                déjà en RGB et à cette taille, via un seul warpAffine.
         """
         self.padding_ratio = padding_ratio
+        self.max_num_hands = max(1, int(max_num_hands))
+        self.oriented_size = oriented_size
+        # Un tampon de sortie réutilisé par main (warpAffine écrit dedans)
+        self._warp_buffers: List[np.ndarray] = []
         self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
-            static_image_mode=False,
-            max_num_hands=1,  # Une seule main pour ASL
-            min_detection_confidence=min_detection_confidence,
-            min_tracking_confidence=min_tracking_confidence
-        )
+        if hands is not None:
+            self.hands = hands
+        else:
+            self.hands = self.mp_hands.Hands(
+                static_image_mode=False,
+                max_num_hands=self.max_num_hands,
+                min_detection_confidence=min_detection_confidence,
+                min_tracking_confidence=min_tracking_confidence
+            )
         self.mp_drawing = mp.solutions.drawing_utils
     
     def extract_roi(self, frame: np.ndarray) -> Tuple[Optional[np.ndarray], Optional[Tuple[int, int, int, int]]]:
@@ -51,10 +66,124 @@ class HandROIExtractor:
             return None, None
         
         # Prend la première main détectée
-        hand_landmarks = results.multi_hand_landmarks[0]
+        h, w = frame.shape[:2]
+        bbox = self._padded_bbox(results.multi_hand_landmarks[0], w, h)
+        
+        # Extrait la ROI
+        x_min, y_min, x_max, y_max = bbox
+        roi = frame[y_min:y_max, x_min:x_max]
+        
+        if roi.size == 0:
+            return None, None
+        
+        return roi, bbox
+    
+    def extract_rois(self, frame: np.ndarray, rgb_frame: Optional[np.ndarray] = None,
+                     **process_kwargs) -> List[Dict[str, Any]]:
+        """
+        Détecte toutes les mains (jusqu'à max_num_hands) en un seul passage MediaPipe.
+        
+        Args:
+            frame: Frame BGR depuis OpenCV
+            rgb_frame: Même frame déjà convertie en RGB (évite une conversion)
+            **process_kwargs: Arguments transmis à hands.process (ex: session_id)
+            
+        Returns:
+            Liste de dicts {roi, bbox, landmarks, handedness, handedness_score}, une
+            entrée par main dont la ROI n'est pas vide, dans l'ordre MediaPipe.
+            En mode orienté, roi est en RGB à la taille du modèle (tampon réutilisé,
+            valide jusqu'à l'appel suivant) et le dict contient aussi corners.
+        """
+        if rgb_frame is None:
+            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        results = self.hands.process(rgb_frame, **process_kwargs)
+        
+        if not results.multi_hand_landmarks:
+            return []
         
-        # Calcule le bounding box autour des landmarks
         h, w = frame.shape[:2]
+        handedness = results.multi_handedness or []
+        hands = []
+        for i, hand_landmarks in enumerate(results.multi_hand_landmarks):
+            corners = None
+            if self.oriented_size is not None:
+                roi, corners = self.warp_roi(rgb_frame, hand_landmarks, self._warp_buffer(len(hands)))
+                x_min, y_min = np.clip(corners.min(axis=0), 0, [w, h]).astype(int)
+                x_max, y_max = np.clip(corners.max(axis=0), 0, [w, h]).astype(int)
+                if x_max <= x_min or y_max <= y_min:
+                    continue
+            else:
+                x_min, y_min, x_max, y_max = self._padded_bbox(hand_landmarks, w, h)
+                roi = frame[y_min:y_max, x_min:x_max]
+                if roi.size == 0:
+                    continue
+            label, score = "Unknown", 0.0
+            if i < len(handedness) and handedness[i].classification:
+                label = handedness[i].classification[0].label
+                score = float(handedness[i].classification[0].score)
+            hand = {
+                "roi": roi,
+                "bbox": (int(x_min), int(y_min), int(x_max), int(y_max)),
+                "landmarks": hand_landmarks,
+                "handedness": label,
+                "handedness_score": score,
+            }
+            if corners is not None:
+                hand["corners"] = corners
+            hands.append(hand)
+        return hands
+    
+    def _warp_buffer(self, index: int) -> np.ndarray:
+        width, height = self.oriented_size
+        while len(self._warp_buffers) <= index:
+            self._warp_buffers.append(np.empty((height, width, 3), dtype=np.uint8))
+        return self._warp_buffers[index]
+    
+    def warp_roi(self, rgb_frame: np.ndarray, hand_landmarks,
+                 out: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Découpe, redresse et redimensionne la main en un seul warpAffine.
+        
+        La boîte est alignée sur l'axe poignet (0) -> base du majeur (9), pointé vers le
+        haut dans la sortie, carrée et agrandie de padding_ratio de chaque côté.
+        
+        Args:
+            rgb_frame: Frame RGB complète
+            hand_landmarks: Landmarks MediaPipe de la main
+            out: Tampon (H, W, 3) uint8 de sortie réutilisé (alloué sinon)
+            
+        Returns:
+            Tuple (roi RGB à la taille oriented_size, coins de la boîte (4, 2) en pixels)
+        """
+        width, height = self.oriented_size
+        h, w = rgb_frame.shape[:2]
+        pts = np.array([(lm.x * w, lm.y * h) for lm in hand_landmarks.landmark], dtype=np.float32)
+        axis = pts[9] - pts[0]
+        norm = float(np.hypot(axis[0], axis[1]))
+        up = axis / norm if norm > 1e-6 else np.array([0.0, -1.0], dtype=np.float32)
+        right = np.array([-up[1], up[0]], dtype=np.float32)
+        proj_r = pts @ right
+        proj_u = pts @ up
+        side = max(float(proj_r.max() - proj_r.min()), float(proj_u.max() - proj_u.min()), 1.0)
+        side *= 1.0 + 2.0 * self.padding_ratio
+        center = right * (proj_r.max() + proj_r.min()) / 2.0 + up * (proj_u.max() + proj_u.min()) / 2.0
+        # Matrice sortie -> source (rotation propre): x_out suit right, y_out (vers le bas) suit -up
+        kx, ky = side / width, side / height
+        x_axis = right * kx
+        y_axis = -up * ky
+        origin = center - x_axis * (width / 2.0) - y_axis * (height / 2.0)
+        matrix = np.array([[x_axis[0], y_axis[0], origin[0]], [x_axis[1], y_axis[1], origin[1]]], dtype=np.float64)
+        if out is None:
+            out = np.empty((height, width, 3), dtype=np.uint8)
+        cv2.warpAffine(rgb_frame, matrix, (width, height), dst=out,
+                       flags=cv2.INTER_LINEAR | cv2.WARP_INVERSE_MAP, borderMode=cv2.BORDER_REPLICATE)
+        corners = np.array([origin, origin + x_axis * width, origin + x_axis * width + y_axis * height,
+                            origin + y_axis * height], dtype=np.float32)
+        return out, corners
+    
+    def _padded_bbox(self, hand_landmarks, w: int, h: int) -> Tuple[int, int, int, int]:
+        """Bounding box des landmarks, agrandie de padding_ratio et bornée à la frame."""
+        # Calcule le bounding box autour des landmarks
         x_coords = [landmark.x * w for landmark in hand_landmarks.landmark]
         y_coords = [landmark.y * h for landmark in hand_landmarks.landmark]
         
@@ -74,13 +203,7 @@ class HandROIExtractor:
         x_max = min(w, x_max + padding_x)
         y_max = min(h, y_max + padding_y)
         
-        # Extrait la ROI
-        roi = frame[y_min:y_max, x_min:x_max]
-        
-        if roi.size == 0:
-            return None, None
-        
-        return roi, (x_min, y_min, x_max, y_max)
+        return x_min, y_min, x_max, y_max
     
     def draw_landmarks(self, frame: np.ndarray, bbox: Optional[Tuple[int, int, int, int]] = None):
         """
@@ -0,0 +1,223 @@
+"""
+Backends d'inference interchangeables pour le classifieur ASL.
+
+Chaque backend prend une entree deja pre-traitee (voir TFLiteModel.preprocess) et renvoie
+la sortie brute du modele. `select_backend` peut mesurer les backends disponibles sur des
+ROI synthetiques et garder le plus rapide dont les scores restent proches de la reference
+(TFLite sans delegate).
+"""
+
+from __future__ import annotations
+
+import abc
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from . import tflite_infer
+from .tflite_infer import TFLiteModel
+
+REFERENCE_BACKEND = "tflite-builtin"
+BACKEND_NAMES = ("tflite-xnnpack", "tflite-builtin", "onnxruntime", "opencv-dnn")
+
+
+class InferenceBackend(abc.ABC):
+    name = "base"
+
+    def __init__(self, input_shape: Sequence[int], input_dtype: Any) -> None:
+        self.input_shape = np.array([int(d) if int(d) > 0 else 1 for d in input_shape], dtype=np.int32)
+        self.input_dtype = input_dtype
+
+    @abc.abstractmethod
+    def run(self, input_data: np.ndarray) -> np.ndarray:
+        """Sortie brute pour une entree dont la premiere dimension est le batch."""
+
+    def _run_rows(self, input_data: np.ndarray, run_one: Callable[[np.ndarray], np.ndarray]) -> np.ndarray:
+        """Repli pour les modeles a batch fixe de 1: une inference par ligne."""
+        if input_data.shape[0] == 1:
+            return run_one(input_data)
+        return np.concatenate([run_one(input_data[i : i + 1]) for i in range(input_data.shape[0])], axis=0)
+
+
+def _interpreter_module() -> Any:
+    if getattr(tflite_infer, "tflite", None) is not None:
+        return tflite_infer.tflite
+    if getattr(tflite_infer, "tf", None) is not None:
+        return tflite_infer.tf.lite
+    raise RuntimeError("TFLite n'est pas disponible. Installez tflite-runtime ou tensorflow.")
+
+
+class TFLiteBackend(InferenceBackend):
+    """Interpreteur TFLite, avec ou sans le delegate XNNPACK applique par defaut."""
+
+    def __init__(self, model_content: bytes, use_xnnpack: bool = True, num_threads: Optional[int] = None) -> None:
+        module = _interpreter_module()
+        kwargs: Dict[str, Any] = {"model_content": model_content}
+        if num_threads is not None:
+            kwargs["num_threads"] = num_threads
+        if not use_xnnpack:
+            resolver = getattr(module, "OpResolverType", None) or module.experimental.OpResolverType
+            kwargs["experimental_op_resolver_type"] = resolver.BUILTIN_WITHOUT_DEFAULT_DELEGATES
+        self.interpreter = module.Interpreter(**kwargs)
+        self.interpreter.allocate_tensors()
+        detail = self.interpreter.get_input_details()[0]
+        self._input_index = detail["index"]
+        self._output_index = self.interpreter.get_output_details()[0]["index"]
+        self.name = "tflite-xnnpack" if use_xnnpack else "tflite-builtin"
+        super().__init__(detail["shape"], detail["dtype"])
+        self._batch_size = int(self.input_shape[0]) if len(self.input_shape) == 4 else 0
+
+    def run(self, input_data: np.ndarray) -> np.ndarray:
+        if self._batch_size and input_data.shape[0] != self._batch_size:
+            self._batch_size = int(input_data.shape[0])
+            self.interpreter.resize_tensor_input(self._input_index, [self._batch_size, *self.input_shape[1:]])
+            self.interpreter.allocate_tensors()
+        self.interpreter.set_tensor(self._input_index, input_data)
+        self.interpreter.invoke()
+        return self.interpreter.get_tensor(self._output_index)
+
+
+class OnnxRuntimeBackend(InferenceBackend):
+    name = "onnxruntime"
+
+    def __init__(self, onnx_path: Path, num_threads: Optional[int] = None) -> None:
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        if num_threads is not None:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(str(onnx_path), options, providers=["CPUExecutionProvider"])
+        model_input = self.session.get_inputs()[0]
+        self._input_name = model_input.name
+        dtype = np.uint8 if model_input.type == "tensor(uint8)" else np.float32
+        self._dynamic_batch = bool(model_input.shape) and not isinstance(model_input.shape[0], int)
+        shape = [d if isinstance(d, int) else 1 for d in model_input.shape]
+        super().__init__(shape, dtype)
+
+    def _run_one(self, input_data: np.ndarray) -> np.ndarray:
+        return self.session.run(None, {self._input_name: input_data})[0]
+
+    def run(self, input_data: np.ndarray) -> np.ndarray:
+        if self._dynamic_batch:
+            return self._run_one(input_data)
+        return self._run_rows(input_data, self._run_one)
+
+
+class OpenCVDnnBackend(InferenceBackend):
+    name = "opencv-dnn"
+
+    def __init__(self, onnx_path: Path, input_shape: Sequence[int], input_dtype: Any) -> None:
+        import cv2
+
+        self.net = cv2.dnn.readNetFromONNX(str(onnx_path))
+        self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+        super().__init__(input_shape, input_dtype)
+
+    def _run_one(self, input_data: np.ndarray) -> np.ndarray:
+        self.net.setInput(np.ascontiguousarray(input_data, dtype=np.float32))
+        return self.net.forward()
+
+    def run(self, input_data: np.ndarray) -> np.ndarray:
+        return self._run_rows(input_data, self._run_one)
+
+
+def build_backend(name: str, model_content: bytes, onnx_path: Optional[Path],
+                  reference: Optional[InferenceBackend] = None, num_threads: Optional[int] = None) -> InferenceBackend:
+    if name == "tflite-xnnpack":
+        return TFLiteBackend(model_content, use_xnnpack=True, num_threads=num_threads)
+    if name == "tflite-builtin":
+        return TFLiteBackend(model_content, use_xnnpack=False, num_threads=num_threads)
+    if name in ("onnxruntime", "opencv-dnn"):
+        if onnx_path is None or not onnx_path.exists():
+            raise FileNotFoundError(f"Modele ONNX converti absent: {onnx_path}")
+        if name == "onnxruntime":
+            return OnnxRuntimeBackend(onnx_path, num_threads=num_threads)
+        if reference is None:
+            raise RuntimeError("opencv-dnn a besoin d'un backend de reference pour la shape d'entree")
+        return OpenCVDnnBackend(onnx_path, reference.input_shape, reference.input_dtype)
+    raise ValueError(f"Backend inconnu: {name} (choix: {', '.join(BACKEND_NAMES)}, auto)")
+
+
+def synthetic_rois(count: int = 8, seed: int = 0) -> List[np.ndarray]:
+    """ROI BGR deterministes de tailles variees (bruit + degrade) pour le benchmark."""
+    rng = np.random.default_rng(seed)
+    rois: List[np.ndarray] = []
+    for i in range(count):
+        h, w = 96 + 24 * (i % 4), 80 + 32 * (i % 3)
+        gradient = np.linspace(0, 255, w, dtype=np.float32)[None, :, None]
+        noise = rng.integers(0, 256, size=(h, w, 3)).astype(np.float32)
+        rois.append(np.clip(0.5 * gradient + 0.5 * noise, 0, 255).astype(np.uint8))
+    return rois
+
+
+@dataclass
+class BackendChoice:
+    name: str
+    backend: InferenceBackend
+    results: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    def describe(self) -> Dict[str, Any]:
+        return {"name": self.name, "benchmark": self.results}
+
+
+def benchmark_backends(candidates: Dict[str, InferenceBackend], reference: InferenceBackend,
+                       inputs: List[np.ndarray], runs: int, tolerance: float) -> Dict[str, Dict[str, Any]]:
+    """Mesure la latence moyenne de chaque backend et l'ecart max de ses scores a la reference."""
+    expected = [TFLiteModel.scores_from_output(reference.run(x)) for x in inputs]
+    results: Dict[str, Dict[str, Any]] = {}
+    for name, backend in candidates.items():
+        try:
+            max_diff = 0.0
+            for x, ref_scores in zip(inputs, expected):
+                scores = TFLiteModel.scores_from_output(backend.run(x))
+                max_diff = max(max_diff, float(np.max(np.abs(scores - ref_scores))))
+            started = time.perf_counter()
+            for i in range(runs):
+                backend.run(inputs[i % len(inputs)])
+            mean_ms = (time.perf_counter() - started) * 1000.0 / max(1, runs)
+            results[name] = {"meanMs": round(mean_ms, 3), "maxDiff": round(max_diff, 5), "accepted": max_diff <= tolerance}
+        except Exception as exc:
+            results[name] = {"accepted": False, "error": str(exc)}
+    return results
+
+
+def select_backend(requested: str, model_content: bytes, onnx_path: Optional[Path], runs: int = 20,
+                   tolerance: float = 0.02, num_threads: Optional[int] = None,
+                   log: Callable[[str], None] = print) -> BackendChoice:
+    """
+    Construit le backend demande, ou en mode `auto` benchmarke tous les backends
+    constructibles et retient le plus rapide parmi ceux qui respectent la tolerance.
+    """
+    if requested != "auto":
+        reference = None
+        if requested == "opencv-dnn":
+            reference = build_backend(REFERENCE_BACKEND, model_content, onnx_path, num_threads=num_threads)
+        return BackendChoice(requested, build_backend(requested, model_content, onnx_path, reference, num_threads))
+
+    reference = build_backend(REFERENCE_BACKEND, model_content, onnx_path, num_threads=num_threads)
+    candidates: Dict[str, InferenceBackend] = {REFERENCE_BACKEND: reference}
+    results: Dict[str, Dict[str, Any]] = {}
+    for name in BACKEND_NAMES:
+        if name == REFERENCE_BACKEND:
+            continue
+        try:
+            candidates[name] = build_backend(name, model_content, onnx_path, reference, num_threads)
+        except Exception as exc:
+            results[name] = {"accepted": False, "error": str(exc)}
+
+    probe = TFLiteModel(backend=reference)
+    inputs = [probe.preprocess(roi) for roi in synthetic_rois()]
+    results.update(benchmark_backends(candidates, reference, inputs, runs, tolerance))
+
+    accepted: List[Tuple[float, str]] = [
+        (float(res["meanMs"]), name) for name, res in results.items() if res.get("accepted") and name in candidates
+    ]
+    best = min(accepted)[1] if accepted else REFERENCE_BACKEND
+    for name, res in results.items():
+        log(f"[Inference] {name}: {res}")
+    log(f"[Inference] Backend retenu: {best}")
+    return BackendChoice(best, candidates[best], results)
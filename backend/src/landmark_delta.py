@@ -0,0 +1,123 @@
+"""
+Encodage temporel des points Pose/Face par session (opt-in, `points=delta`).
+
+Coordonnees [0,1] quantifiees en entiers 0..POINT_SCALE (int16, little-endian, base64).
+Le serveur garde par session la derniere reconstruction du client (pas la mesure brute:
+l'erreur reste bornee par le seuil de mouvement, sans derive) et n'envoie que les points
+qui ont bouge d'au moins `min_motion`:
+
+- image cle: `data` = [x0, y0, x1, y1, ...] pour tous les points;
+- delta: `data` = [index, dx, dy, ...] pour les points deplaces seulement.
+
+Le client renvoie `pointsBase` = `seq` de la derniere reponse appliquee. Sans base, base
+differente (reponse perdue), nombre de points change (visage active, palier de qualite)
+ou toutes les `keyframe_interval` frames, le serveur repart d'une image cle.
+"""
+
+from __future__ import annotations
+
+import base64
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .metrics import METRICS
+from .sessions import SessionStore
+
+POINT_SCALE = 10000
+POINT_STREAMS = ("posePoints", "facePoints")
+POINTS_ENCODINGS = ("full", "delta")
+
+
+def quantize(points: List[Dict[str, float]]) -> np.ndarray:
+    """[{x, y}] -> tableau int16 (n, 2) en unites de 1/POINT_SCALE."""
+    if not points:
+        return np.zeros((0, 2), dtype=np.int16)
+    coords = np.array([(p["x"], p["y"]) for p in points], dtype=np.float64)
+    return np.rint(np.clip(coords, 0.0, 1.0) * POINT_SCALE).astype(np.int16)
+
+
+def _pack(values: np.ndarray) -> str:
+    return base64.b64encode(values.astype("<i2", copy=False).tobytes()).decode("ascii")
+
+
+@dataclass
+class _DeltaState:
+    seq: int = 0
+    since_key: int = 0
+    # Derniere reconstruction du client, par flux
+    streams: Dict[str, np.ndarray] = field(default_factory=dict)
+
+
+class LandmarkDeltaEncoder:
+    def __init__(self, keyframe_interval: int = 30, min_motion: float = 0.002) -> None:
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.min_motion_q = max(1, int(round(min_motion * POINT_SCALE)))
+        self.sessions: SessionStore[_DeltaState] = SessionStore(_DeltaState)
+        self._lock = threading.Lock()
+        METRICS.describe("landmark_payload_bytes", "Taille des points encodes par reponse (base64)")
+        METRICS.describe("landmark_keyframes_total", "Images cles de points envoyees, par raison")
+
+    def _key_reason(self, state: _DeltaState, current: Dict[str, np.ndarray], base: Optional[int]) -> Optional[str]:
+        if base is None or not state.streams:
+            return "start"
+        if base != state.seq:
+            return "resync"
+        if any(current[name].shape != state.streams[name].shape for name in POINT_STREAMS):
+            return "shape"
+        if state.since_key >= self.keyframe_interval:
+            return "interval"
+        return None
+
+    def encode(self, session_id: str, result: Dict[str, Any], base: Optional[int]) -> Dict[str, Any]:
+        """Copie de `result` ou posePoints/facePoints sont remplaces par `points` (image cle ou delta)."""
+        if "posePoints" not in result:
+            return result
+        if result.get("superseded"):
+            # Frame remplacee: resultat deja connu du client, l'etat de la session ne bouge pas
+            return {key: value for key, value in result.items() if key not in POINT_STREAMS}
+        current = {name: quantize(result.get(name) or []) for name in POINT_STREAMS}
+        with self._lock:
+            state = self.sessions.get(session_id)
+            reason = self._key_reason(state, current, base)
+            state.seq += 1
+            payload: Dict[str, Any] = {
+                "encoding": "delta",
+                "seq": state.seq,
+                "base": None if reason else base,
+                "key": reason is not None,
+                "scale": POINT_SCALE,
+            }
+            if reason is not None:
+                state.since_key = 0
+                state.streams = {name: values.copy() for name, values in current.items()}
+                for name, values in current.items():
+                    payload[name] = {"count": len(values), "data": _pack(values.ravel())}
+                METRICS.inc("landmark_keyframes_total", reason=reason)
+            else:
+                state.since_key += 1
+                for name, values in current.items():
+                    previous = state.streams[name]
+                    motion = np.abs(values.astype(np.int32) - previous).max(axis=1, initial=0)
+                    moved = np.flatnonzero(motion >= self.min_motion_q)
+                    deltas = values[moved].astype(np.int32) - previous[moved]
+                    previous[moved] = values[moved]
+                    triples = np.column_stack((moved, deltas)) if len(moved) else np.zeros((0, 3), dtype=np.int32)
+                    payload[name] = {"count": len(values), "data": _pack(triples.ravel())}
+        METRICS.observe(
+            "landmark_payload_bytes",
+            sum(len(payload[name]["data"]) for name in POINT_STREAMS),
+            encoding="key" if payload["key"] else "delta",
+        )
+        encoded = {key: value for key, value in result.items() if key not in POINT_STREAMS}
+        encoded["points"] = payload
+        return encoded
+
+    def config(self) -> Dict[str, Any]:
+        return {
+            "scale": POINT_SCALE,
+            "keyframeInterval": self.keyframe_interval,
+            "minMotion": self.min_motion_q / POINT_SCALE,
+        }
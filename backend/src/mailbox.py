@@ -0,0 +1,112 @@
+"""
+Boite aux lettres "derniere frame" par session et par pipeline.
+
+Au plus une frame en cours de traitement et une frame en attente par (session, pipeline).
+Une nouvelle frame remplace celle en attente (pas encore demarree); la requete remplacee
+recoit tout de suite le dernier resultat connu marque `superseded` (mode `latest`; a defaut,
+la reponse vide `empty` fournie par l'appelant, au schema du pipeline) ou attend le resultat
+de la frame qui l'a remplacee (mode `wait`). Une frame remplacee n'est jamais traitee: ses
+ressources sont a liberer par l'appelant au retour de `submit`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .metrics import METRICS
+from .sessions import SessionStore
+
+SUPERSEDED_MODES = ("latest", "wait")
+
+Job = Callable[[], Awaitable[Dict[str, Any]]]
+
+
+@dataclass
+class _Pending:
+    job: Job
+    future: "asyncio.Future[Dict[str, Any]]"
+    followers: List["asyncio.Future[Dict[str, Any]]"] = field(default_factory=list)
+    empty: Optional[Dict[str, Any]] = None
+
+
+@dataclass
+class _MailboxState:
+    running: bool = False
+    waiting: Optional[_Pending] = None
+    latest: Optional[Dict[str, Any]] = None
+
+
+def _resolve(future: "asyncio.Future[Dict[str, Any]]", result: Dict[str, Any]) -> None:
+    if not future.done():
+        future.set_result(result)
+
+
+def _fail(future: "asyncio.Future[Dict[str, Any]]", exc: BaseException) -> None:
+    if not future.done():
+        future.set_exception(exc)
+
+
+class FrameMailbox:
+    """A utiliser depuis la boucle asyncio uniquement (pas de verrou: un seul thread)."""
+
+    def __init__(self, superseded_mode: str = "latest", enabled: bool = True, max_sessions: int = 256) -> None:
+        if superseded_mode not in SUPERSEDED_MODES:
+            raise ValueError(f"MAILBOX_SUPERSEDED invalide: {superseded_mode} (choix: {', '.join(SUPERSEDED_MODES)})")
+        self.superseded_mode = superseded_mode
+        self.enabled = enabled
+        self.states: SessionStore[_MailboxState] = SessionStore(_MailboxState, max_sessions=max_sessions)
+        METRICS.describe("frames_superseded_total", "Frames remplacees dans la boite aux lettres avant traitement")
+
+    async def submit(
+        self,
+        session_id: str,
+        pipeline: str,
+        job: Job,
+        empty: Optional[Dict[str, Any]] = None,
+        label: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        `pipeline`: cle de la boite aux lettres (peut contenir des options du client);
+        `label`: pipeline de base pour les metriques (ensemble borne), `pipeline` par defaut.
+        """
+        if not self.enabled:
+            return await job()
+        state = self.states.get(f"{session_id}:{pipeline}")
+        pending = _Pending(job, asyncio.get_running_loop().create_future(), empty=empty)
+        if state.waiting is not None:
+            self._supersede(state, state.waiting, pending, label or pipeline)
+        state.waiting = pending
+        if not state.running:
+            state.running = True
+            asyncio.get_running_loop().create_task(self._drain(state))
+        return await pending.future
+
+    def _supersede(self, state: _MailboxState, old: _Pending, new: _Pending, pipeline: str) -> None:
+        METRICS.inc("frames_superseded_total", pipeline=pipeline)
+        if self.superseded_mode == "wait":
+            new.followers.append(old.future)
+            new.followers.extend(old.followers)
+            return
+        latest = state.latest if state.latest is not None else (old.empty or {})
+        for future in [old.future, *old.followers]:
+            _resolve(future, {**latest, "superseded": True})
+
+    async def _drain(self, state: _MailboxState) -> None:
+        try:
+            while state.waiting is not None:
+                pending = state.waiting
+                state.waiting = None
+                try:
+                    result = await pending.job()
+                except Exception as exc:
+                    for future in [pending.future, *pending.followers]:
+                        _fail(future, exc)
+                    continue
+                state.latest = result
+                _resolve(pending.future, result)
+                for future in pending.followers:
+                    _resolve(future, {**result, "superseded": True})
+        finally:
+            state.running = False
@@ -0,0 +1,70 @@
+"""Encodage compact du masque de segmentation (grille basse resolution, RLE ou PNG 1 canal)."""
+
+from __future__ import annotations
+
+import base64
+import json
+from typing import Any, Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+MASK_FORMATS = ("rle", "png")
+MASK_GRID_MIN = 8
+MASK_GRID_MAX = 256
+
+
+def _clamp_grid(value: int) -> int:
+    return max(MASK_GRID_MIN, min(MASK_GRID_MAX, value))
+
+
+def parse_mask_grid(spec: str) -> Optional[Tuple[int, int]]:
+    """`"64x48"` -> (64, 48); chaine vide/`off` -> None (masque desactive)."""
+    spec = (spec or "").strip().lower()
+    if spec in ("", "off", "false", "0"):
+        return None
+    width, sep, height = spec.partition("x")
+    try:
+        w = int(width)
+        h = int(height) if sep else w
+    except ValueError:
+        raise ValueError(f"Grille de masque invalide: {spec!r} (attendu: LARGEURxHAUTEUR)")
+    return _clamp_grid(w), _clamp_grid(h)
+
+
+def run_lengths(bits: np.ndarray) -> np.ndarray:
+    """Longueurs de plages en ordre ligne par ligne, la premiere plage etant des 0."""
+    flat = bits.ravel()
+    change = np.flatnonzero(flat[1:] != flat[:-1]) + 1
+    bounds = np.concatenate(([0], change, [flat.size]))
+    counts = np.diff(bounds)
+    if flat.size and flat[0]:
+        counts = np.concatenate(([0], counts))
+    return counts
+
+
+def encode_mask(mask: np.ndarray, grid: Tuple[int, int], fmt: str = "rle", threshold: float = 0.5) -> Dict[str, Any]:
+    """
+    Reduit le masque float [0,1] de MediaPipe a la grille demandee puis l'encode:
+    - rle: {"counts": [...]} plages alternees 0/1 en partant de 0
+    - png: {"data": base64} image 1 canal (0/255)
+    """
+    width, height = grid
+    small = cv2.resize(mask, (width, height), interpolation=cv2.INTER_AREA)
+    bits = (small > threshold).astype(np.uint8)
+    payload: Dict[str, Any] = {"width": width, "height": height, "format": fmt}
+    if fmt == "png":
+        ok, buf = cv2.imencode(".png", bits * 255, [cv2.IMWRITE_PNG_COMPRESSION, 9])
+        if not ok:
+            raise RuntimeError("Encodage PNG du masque impossible")
+        payload["data"] = base64.b64encode(buf.tobytes()).decode("ascii")
+    else:
+        payload["counts"] = run_lengths(bits).tolist()
+    return payload
+
+
+def payload_size(payload: Dict[str, Any]) -> int:
+    """Taille approximative en octets du masque encode dans la reponse JSON."""
+    if "data" in payload:
+        return len(payload["data"])
+    return len(json.dumps(payload.get("counts", []), separators=(",", ":")))
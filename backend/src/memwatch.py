@@ -0,0 +1,230 @@
+"""
+Surveillance memoire longue duree (opt-in, MEMWATCH_ENABLED=true) pour reperer les fuites lentes.
+
+Un thread de fond prend periodiquement:
+- le RSS du processus (/proc/self/statm);
+- un instantane tracemalloc, regroupe par module: nos modules (`web_api`, `hand_roi`,
+  `tflite_infer`... par nom de fichier), les autres par paquet (`starlette`, `mediapipe`...).
+  L'allocation est attribuee a la frame Python qui l'a declenchee, donc un tableau NumPy
+  cree dans web_api.py compte pour `web_api`;
+- le nombre et la taille des buffers NumPy vivants (domaine tracemalloc de NumPy).
+
+Les tendances (pente en octets/heure par regression lineaire sur la fenetre d'historique)
+sont exposees en jauges sur /metrics. Un diff entre deux instantanes (par ligne de code)
+est disponible a la demande. tracemalloc ralentit les allocations: a reserver au diagnostic.
+"""
+
+from __future__ import annotations
+
+import collections
+import os
+import sysconfig
+import threading
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .metrics import METRICS
+
+NUMPY_DOMAIN = np.lib.tracemalloc_domain
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+_STDLIB = sysconfig.get_paths()["stdlib"]
+_IGNORED = (tracemalloc.__file__, "<frozen importlib._bootstrap>", "<frozen importlib._bootstrap_external>", "<unknown>")
+
+
+def read_rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm", "r") as handle:
+            return int(handle.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        import resource
+
+        # ru_maxrss (Ko sous Linux): pic et non valeur courante, faute de mieux
+        return int(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss) * 1024
+
+
+def growth_per_hour(points: Sequence[Tuple[float, float]]) -> float:
+    """Pente (unites/heure) de la regression lineaire de points (horodatage s, valeur)."""
+    if len(points) < 3:
+        return 0.0
+    ts = np.array([p[0] for p in points], dtype=np.float64)
+    values = np.array([p[1] for p in points], dtype=np.float64)
+    if float(ts[-1] - ts[0]) <= 0:
+        return 0.0
+    slope = np.polyfit(ts - ts[0], values, 1)[0]
+    return float(slope * 3600.0)
+
+
+@dataclass
+class MemorySample:
+    ts: float
+    rss: int
+    traced: int
+    numpy_buffers: int
+    numpy_bytes: int
+    modules: Dict[str, int] = field(default_factory=dict)
+
+
+class MemoryWatch:
+    def __init__(
+        self,
+        enabled: bool = False,
+        interval_s: float = 60.0,
+        modules: Sequence[str] = ("web_api", "hand_roi", "tflite_infer"),
+        history: int = 120,
+        top_packages: int = 5,
+        nframes: int = 1,
+    ) -> None:
+        self.enabled = enabled
+        self.interval_s = max(1.0, interval_s)
+        self.modules = tuple(modules)
+        self.top_packages = max(0, top_packages)
+        self.nframes = max(1, nframes)
+        self.samples: Deque[MemorySample] = collections.deque(maxlen=max(3, history))
+        self._baselines: Dict[str, tracemalloc.Snapshot] = {}
+        # Groupes deja exportes: gardes pour ne pas laisser de jauge figee
+        self._exported: Dict[str, None] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        METRICS.describe("memory_rss_bytes", "RSS du processus")
+        METRICS.describe("memory_rss_growth_bytes_per_hour", "Tendance du RSS sur la fenetre d'historique")
+        METRICS.describe("memory_traced_bytes", "Memoire allouee encore vivante (tracemalloc), par module")
+        METRICS.describe("memory_traced_growth_bytes_per_hour", "Tendance de la memoire tracee, par module")
+        METRICS.describe("memory_numpy_buffers", "Buffers NumPy vivants")
+        METRICS.describe("memory_numpy_bytes", "Octets des buffers NumPy vivants")
+
+    @property
+    def active(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> None:
+        """Active tracemalloc et demarre l'echantillonnage (apres fork, par worker)."""
+        if not self.enabled or self._thread is not None:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.nframes)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="memory-watch", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=5.0)
+        self._thread = None
+        tracemalloc.stop()
+        self._baselines.clear()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                self.sample()
+            except Exception as exc:
+                print(f"[MemWatch] echantillon ignore: {exc}")
+            if self._stop.wait(self.interval_s):
+                break
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, pattern) for pattern in _IGNORED]
+        )
+
+    def _group(self, filename: str) -> str:
+        path = Path(filename)
+        if path.stem in self.modules:
+            return path.stem
+        parts = path.parts
+        for marker in ("site-packages", "dist-packages"):
+            if marker in parts:
+                index = parts.index(marker)
+                if index + 1 < len(parts):
+                    return parts[index + 1].split(".")[0]
+        if filename.startswith(_STDLIB):
+            return "stdlib"
+        return "other"
+
+    def sample(self) -> MemorySample:
+        snapshot = self._snapshot()
+        by_module: Dict[str, int] = collections.Counter()
+        for stat in snapshot.statistics("filename"):
+            by_module[self._group(stat.traceback[0].filename)] += stat.size
+        numpy_traces = snapshot.filter_traces([tracemalloc.DomainFilter(True, NUMPY_DOMAIN)]).traces
+        sample = MemorySample(
+            ts=time.time(),
+            rss=read_rss_bytes(),
+            traced=sum(by_module.values()),
+            numpy_buffers=len(numpy_traces),
+            numpy_bytes=sum(trace.size for trace in numpy_traces),
+            modules=dict(by_module),
+        )
+        with self._lock:
+            self._baselines.setdefault("start", snapshot)
+            self.samples.append(sample)
+            self._export(sample)
+        return sample
+
+    def _exported_groups(self, sample: MemorySample) -> List[str]:
+        # Nos modules toujours, plus les `top_packages` plus gros autres groupes (cardinalite bornee)
+        others = sorted((g for g in sample.modules if g not in self.modules), key=sample.modules.get, reverse=True)
+        for group in list(self.modules) + others[: self.top_packages]:
+            self._exported.setdefault(group, None)
+        return list(self._exported)
+
+    def _export(self, sample: MemorySample) -> None:
+        samples = list(self.samples)
+        METRICS.set_gauge("memory_rss_bytes", sample.rss)
+        METRICS.set_gauge("memory_rss_growth_bytes_per_hour", growth_per_hour([(s.ts, s.rss) for s in samples]))
+        METRICS.set_gauge("memory_numpy_buffers", sample.numpy_buffers)
+        METRICS.set_gauge("memory_numpy_bytes", sample.numpy_bytes)
+        for group in self._exported_groups(sample):
+            METRICS.set_gauge("memory_traced_bytes", sample.modules.get(group, 0), module=group)
+            trend = growth_per_hour([(s.ts, s.modules.get(group, 0)) for s in samples])
+            METRICS.set_gauge("memory_traced_growth_bytes_per_hour", trend, module=group)
+
+    def diff(self, against: str = "last", top: int = 25) -> Dict[str, Any]:
+        """
+        Diff par ligne entre un nouvel instantane et la reference `against` (`start`: premier
+        echantillon, `last`: diff precedent). Le nouvel instantane devient la reference `last`.
+        """
+        snapshot = self._snapshot()
+        with self._lock:
+            baseline = self._baselines.get(against) or self._baselines.get("start")
+            self._baselines.setdefault("start", snapshot)
+            self._baselines["last"] = snapshot
+        if baseline is None or baseline is snapshot:
+            return {"against": against, "baseline": False, "top": []}
+        rows: List[Dict[str, Any]] = []
+        for stat in snapshot.compare_to(baseline, "lineno")[: max(1, top)]:
+            frame = stat.traceback[0]
+            rows.append(
+                {
+                    "file": frame.filename,
+                    "line": frame.lineno,
+                    "module": self._group(frame.filename),
+                    "sizeDiff": stat.size_diff,
+                    "size": stat.size,
+                    "countDiff": stat.count_diff,
+                    "count": stat.count,
+                }
+            )
+        return {"against": against, "baseline": True, "top": rows}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            samples = list(self.samples)
+        latest = samples[-1] if samples else None
+        return {
+            "enabled": self.enabled,
+            "intervalS": self.interval_s,
+            "samples": len(samples),
+            "rss": latest.rss if latest else None,
+            "rssGrowthPerHour": round(growth_per_hour([(s.ts, s.rss) for s in samples])),
+            "numpyBuffers": latest.numpy_buffers if latest else None,
+            "modules": {group: latest.modules.get(group, 0) for group in self._exported_groups(latest)} if latest else {},
+        }
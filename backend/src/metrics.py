@@ -0,0 +1,107 @@
+"""Metriques en memoire du processus, exportees au format texte Prometheus sur /metrics."""
+
+from __future__ import annotations
+
+import collections
+import threading
+from typing import Any, Deque, Dict, List, Tuple
+
+import numpy as np
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+SUMMARY_WINDOW = 512
+SUMMARY_QUANTILES = (0.5, 0.95, 0.99)
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in pairs) + "}"
+
+
+class _Summary:
+    __slots__ = ("count", "total", "window")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.window: Deque[float] = collections.deque(maxlen=SUMMARY_WINDOW)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.window.append(value)
+
+    def quantiles(self) -> Dict[float, float]:
+        if not self.window:
+            return {}
+        values = np.quantile(np.fromiter(self.window, dtype=np.float64), SUMMARY_QUANTILES)
+        return dict(zip(SUMMARY_QUANTILES, (float(v) for v in values)))
+
+
+class MetricsRegistry:
+    """Compteurs, jauges et resumes (quantiles sur les 512 dernieres observations)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = collections.defaultdict(dict)
+        self._gauges: Dict[str, Dict[LabelKey, float]] = collections.defaultdict(dict)
+        self._summaries: Dict[str, Dict[LabelKey, _Summary]] = collections.defaultdict(dict)
+        self._help: Dict[str, str] = {}
+
+    def describe(self, name: str, help_text: str) -> None:
+        self._help[name] = help_text
+
+    def inc(self, name: str, value: float = 1.0, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters[name]
+            series[key] = series.get(key, 0.0) + value
+
+    def set_counter(self, name: str, value: float, **labels: Any) -> None:
+        """Total monotone tenu ailleurs (ex: temps CPU du processus), exporte comme compteur."""
+        with self._lock:
+            self._counters[name][_label_key(labels)] = float(value)
+
+    def set_gauge(self, name: str, value: float, **labels: Any) -> None:
+        with self._lock:
+            self._gauges[name][_label_key(labels)] = float(value)
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._summaries[name]
+            summary = series.get(key)
+            if summary is None:
+                summary = series[key] = _Summary()
+            summary.observe(float(value))
+
+    def render_prometheus(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            for kind, store in (("counter", self._counters), ("gauge", self._gauges)):
+                for name in sorted(store):
+                    if name in self._help:
+                        lines.append(f"# HELP {name} {self._help[name]}")
+                    lines.append(f"# TYPE {name} {kind}")
+                    for key, value in store[name].items():
+                        lines.append(f"{name}{_format_labels(key)} {value:g}")
+            for name in sorted(self._summaries):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} summary")
+                for key, summary in self._summaries[name].items():
+                    for q, value in summary.quantiles().items():
+                        lines.append(f"{name}{_format_labels(key, (('quantile', str(q)),))} {value:g}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {summary.total:g}")
+                    lines.append(f"{name}_count{_format_labels(key)} {summary.count}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
@@ -0,0 +1,217 @@
+"""
+Moteur MediaPipe Tasks (HandLandmarker, PoseLandmarker, FaceLandmarker) en mode VIDEO ou LIVE_STREAM.
+
+Alternative aux wrappers legacy `mp.solutions` (MEDIAPIPE_ENGINE=tasks). Chaque session client
+a sa propre instance de landmarker (suivi temporel isole, timestamps strictement croissants).
+En LIVE_STREAM, `submit` rend la main immediatement et le resultat arrive par callback: on peut
+lancer Pose et FaceMesh en parallele puis attendre les deux. Un resultat qui n'arrive pas a
+temps (frame abandonnee par le graphe) compte comme une frame sans detection
+(`mediapipe_stream_timeouts_total`), jamais comme le resultat d'une frame precedente.
+
+Les adaptateurs renvoient des objets de meme forme que les resultats legacy
+(multi_hand_landmarks, pose_landmarks.landmark, multi_face_landmarks...), pour que
+HandROIExtractor et SegmentationService restent inchanges.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import mediapipe as mp
+import numpy as np
+from mediapipe.tasks import python as mp_python
+from mediapipe.tasks.python import vision
+
+from .metrics import METRICS
+from .preload import load_model_buffer
+from .sessions import SessionStore
+
+TASK_MODELS = {
+    "hand": (
+        "hand_landmarker.task",
+        "https://storage.googleapis.com/mediapipe-models/hand_landmarker/hand_landmarker/float16/latest/hand_landmarker.task",
+    ),
+    "pose": (
+        "pose_landmarker_lite.task",
+        "https://storage.googleapis.com/mediapipe-models/pose_landmarker/pose_landmarker_lite/float16/latest/pose_landmarker_lite.task",
+    ),
+    "face": (
+        "face_landmarker.task",
+        "https://storage.googleapis.com/mediapipe-models/face_landmarker/face_landmarker/float16/latest/face_landmarker.task",
+    ),
+}
+RUNNING_MODES = {"video": vision.RunningMode.VIDEO, "live_stream": vision.RunningMode.LIVE_STREAM}
+LIVE_STREAM_TIMEOUT_S = 1.0
+
+
+def task_model_path(models_dir: Path, kind: str) -> Path:
+    return Path(models_dir) / TASK_MODELS[kind][0]
+
+
+def missing_task_models(models_dir: Path, kinds: Tuple[str, ...] = tuple(TASK_MODELS)) -> Dict[str, str]:
+    """Modeles .task absents -> URL de telechargement."""
+    return {
+        TASK_MODELS[kind][0]: TASK_MODELS[kind][1]
+        for kind in kinds
+        if not task_model_path(models_dir, kind).exists()
+    }
+
+
+class _StreamLandmarker:
+    """Un landmarker Tasks pour une session: timestamps monotones, resultats LIVE_STREAM par callback."""
+
+    def __init__(self, create: Callable[[Optional[Callable[..., None]]], Any], live_stream: bool) -> None:
+        self.live_stream = live_stream
+        self.last_ts = -1
+        self._cond = threading.Condition()
+        self._results: Dict[int, Any] = {}
+        self.landmarker = create(self._on_result if live_stream else None)
+
+    def _next_timestamp(self) -> int:
+        self.last_ts = max(self.last_ts + 1, int(time.monotonic() * 1000))
+        return self.last_ts
+
+    def _on_result(self, result: Any, _image: Any, timestamp_ms: int) -> None:
+        with self._cond:
+            self._results[timestamp_ms] = result
+            self._cond.notify_all()
+
+    def submit(self, rgb: np.ndarray) -> Any:
+        image = mp.Image(image_format=mp.ImageFormat.SRGB, data=np.ascontiguousarray(rgb))
+        ts = self._next_timestamp()
+        if not self.live_stream:
+            return ("done", self.landmarker.detect_for_video(image, ts))
+        self.landmarker.detect_async(image, ts)
+        return ("pending", ts)
+
+    def wait(self, handle: Any, timeout: float = LIVE_STREAM_TIMEOUT_S) -> Optional[Any]:
+        """Resultat de la frame, ou None si le callback n'est pas arrive avant `timeout`."""
+        state, value = handle
+        if state == "done":
+            return value
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while value not in self._results:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    # Frame abandonnee par le graphe (occupe): un resultat plus ancien serait faux ici
+                    return None
+                self._cond.wait(remaining)
+            result = self._results.pop(value)
+            # Purge des resultats plus anciens jamais reclames
+            for stale in [ts for ts in self._results if ts < value]:
+                del self._results[stale]
+            return result
+
+    def close(self) -> None:
+        self.landmarker.close()
+
+
+class TasksDetector:
+    """Landmarkers Tasks par session, exposes avec une interface `process` facon legacy."""
+
+    def __init__(
+        self,
+        kind: str,
+        model_buffer: bytes,
+        mode: str,
+        convert: Callable[[Any], Any],
+        options: Dict[str, Any],
+        max_sessions: int = 16,
+    ) -> None:
+        if mode not in RUNNING_MODES:
+            raise ValueError(f"Mode MediaPipe Tasks inconnu: {mode} (choix: {', '.join(RUNNING_MODES)})")
+        self.kind = kind
+        self.model_buffer = model_buffer
+        self.mode = mode
+        self.convert = convert
+        self.options = options
+        self.sessions: SessionStore[_StreamLandmarker] = SessionStore(
+            self._create, max_sessions=max_sessions, ttl_s=120.0, on_evict=lambda lm: lm.close()
+        )
+        METRICS.describe("mediapipe_stream_timeouts_total", "Resultats LIVE_STREAM non recus a temps (frame sans detection)")
+
+    def _create(self) -> _StreamLandmarker:
+        live = self.mode == "live_stream"
+
+        def build(callback: Optional[Callable[..., None]]) -> Any:
+            base = mp_python.BaseOptions(model_asset_buffer=self.model_buffer)
+            kwargs = dict(self.options, base_options=base, running_mode=RUNNING_MODES[self.mode])
+            if callback is not None:
+                kwargs["result_callback"] = callback
+            if self.kind == "hand":
+                return vision.HandLandmarker.create_from_options(vision.HandLandmarkerOptions(**kwargs))
+            if self.kind == "pose":
+                return vision.PoseLandmarker.create_from_options(vision.PoseLandmarkerOptions(**kwargs))
+            return vision.FaceLandmarker.create_from_options(vision.FaceLandmarkerOptions(**kwargs))
+
+        return _StreamLandmarker(build, live)
+
+    def submit(self, rgb: np.ndarray, session_id: str = "default") -> Any:
+        landmarker = self.sessions.get(session_id)
+        return landmarker, landmarker.submit(rgb)
+
+    def wait(self, pending: Any) -> Any:
+        landmarker, handle = pending
+        result = landmarker.wait(handle)
+        if result is None:
+            METRICS.inc("mediapipe_stream_timeouts_total", kind=self.kind)
+        return self.convert(result)
+
+    def process(self, rgb: np.ndarray, session_id: str = "default") -> Any:
+        return self.wait(self.submit(rgb, session_id))
+
+    def close(self) -> None:
+        self.sessions.clear()
+
+
+def _landmark_list(landmarks: Any) -> SimpleNamespace:
+    return SimpleNamespace(landmark=list(landmarks))
+
+
+def hands_result(result: Any) -> SimpleNamespace:
+    if result is None or not result.hand_landmarks:
+        return SimpleNamespace(multi_hand_landmarks=None, multi_handedness=None)
+    handedness = [
+        SimpleNamespace(classification=[SimpleNamespace(label=c.category_name, score=c.score) for c in categories])
+        for categories in result.handedness
+    ]
+    return SimpleNamespace(
+        multi_hand_landmarks=[_landmark_list(hand) for hand in result.hand_landmarks],
+        multi_handedness=handedness,
+    )
+
+
+def pose_result(result: Any) -> SimpleNamespace:
+    if result is None or not result.pose_landmarks:
+        return SimpleNamespace(pose_landmarks=None, segmentation_mask=None)
+    mask = None
+    if result.segmentation_masks:
+        mask = result.segmentation_masks[0].numpy_view()
+    return SimpleNamespace(pose_landmarks=_landmark_list(result.pose_landmarks[0]), segmentation_mask=mask)
+
+
+def face_result(result: Any) -> SimpleNamespace:
+    if result is None or not result.face_landmarks:
+        return SimpleNamespace(multi_face_landmarks=None)
+    return SimpleNamespace(multi_face_landmarks=[_landmark_list(face) for face in result.face_landmarks])
+
+
+def preload_task_models(models_dir: Path, kinds: Tuple[str, ...]) -> None:
+    """Charge les .task presents avant le fork (partages en copy-on-write, voir preload.py)."""
+    for kind in kinds:
+        path = task_model_path(models_dir, kind)
+        if path.exists():
+            load_model_buffer(path)
+
+
+def create_detector(kind: str, models_dir: Path, mode: str, **options: Any) -> TasksDetector:
+    path = task_model_path(models_dir, kind)
+    if not path.exists():
+        raise FileNotFoundError(f"Modele MediaPipe Tasks absent: {path} ({TASK_MODELS[kind][1]})")
+    convert = {"hand": hands_result, "pose": pose_result, "face": face_result}[kind]
+    return TasksDetector(kind, load_model_buffer(path), mode, convert, options)
@@ -0,0 +1,41 @@
+"""
+Prechargement des poids modeles avant le fork des workers.
+
+Avec `gunicorn --preload` (voir backend/gunicorn.conf.py), le processus maitre importe
+l'application une seule fois: les octets des modeles charges ici sont ensuite partages
+en copy-on-write par tous les workers. Les graphes MediaPipe et les interpreteurs TFLite
+(threads, arenas) ne doivent etre construits qu'apres le fork, dans chaque worker.
+"""
+
+from __future__ import annotations
+
+import mmap
+import threading
+from pathlib import Path
+from typing import Dict
+
+_BUFFERS: Dict[str, bytes] = {}
+_LOCK = threading.Lock()
+
+
+def load_model_buffer(path: Path) -> bytes:
+    """
+    Charge un fichier modele une seule fois par processus.
+
+    Le fichier est lu via mmap en un objet `bytes` (type exige par les bindings TFLite);
+    cree avant le fork, il n'est jamais modifie et ses pages restent partagees.
+    """
+    key = str(Path(path).resolve())
+    with _LOCK:
+        cached = _BUFFERS.get(key)
+        if cached is not None:
+            return cached
+        with open(key, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            data = bytes(mapped)
+        _BUFFERS[key] = data
+        return data
+
+
+def preloaded_bytes() -> int:
+    with _LOCK:
+        return sum(len(buf) for buf in _BUFFERS.values())
@@ -0,0 +1,189 @@
+"""
+Profileur par echantillonnage du processus en cours, declenche a la demande.
+
+Un thread daemon dedie (ni la boucle asyncio ni le threadpool) lit `sys._current_frames()` a intervalle fixe
+et compte les piles de tous les autres threads Python (boucle asyncio, threadpool d'inference, enregistreur...). Le
+code natif (graphes MediaPipe, TFLite) apparait sous la fonction Python qui l'appelle.
+
+Garde-fous: une seule capture a la fois, duree plafonnee (`max_seconds`), et budget de
+surcout: si un echantillon coute plus de `max_overhead` de sa periode, l'intervalle est
+double (jusqu'a 1 s); si le budget reste depasse a 1 s, la capture s'arrete
+(`stopReason: "overhead"`).
+
+Sorties: piles repliees (`thread;f1;f2 n`, pretes pour flamegraph.pl / speedscope) et
+table des fonctions les plus presentes (self = en haut de pile, total = n'importe ou).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+Frame = Tuple[str, str, int]
+
+MAX_INTERVAL_S = 1.0
+# Echantillons consecutifs hors budget a l'intervalle maximal avant d'abandonner la capture
+OVERHEAD_STRIKES = 3
+
+
+class ProfilerBusy(RuntimeError):
+    pass
+
+
+def _frame_label(frame: Frame) -> str:
+    name, filename, line = frame
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+class SamplingProfiler:
+    def __init__(
+        self,
+        interval_ms: float = 10.0,
+        max_seconds: float = 30.0,
+        max_overhead: float = 0.02,
+        max_depth: int = 64,
+    ) -> None:
+        self.interval_s = max(0.001, interval_ms / 1000.0)
+        self.max_seconds = max(0.1, max_seconds)
+        self.max_overhead = max(0.001, max_overhead)
+        self.max_depth = max(4, max_depth)
+        self._busy = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._busy.locked()
+
+    async def capture(self, seconds: float, top: int = 30) -> Dict[str, Any]:
+        """
+        Capture de `seconds` (plafonnee) sur un thread daemon dedie; la coroutine attend
+        la fin sans occuper de worker du threadpool. Leve ProfilerBusy si une capture tourne deja.
+        """
+        if not self._busy.acquire(blocking=False):
+            raise ProfilerBusy("Profiling already running")
+        loop = asyncio.get_running_loop()
+        done: asyncio.Future[Dict[str, Any]] = loop.create_future()
+
+        def deliver(report: Optional[Dict[str, Any]], error: Optional[BaseException]) -> None:
+            # Le client a pu se deconnecter entre-temps (future annulee)
+            if done.done():
+                return
+            if error is not None:
+                done.set_exception(error)
+            else:
+                done.set_result(report)
+
+        def worker() -> None:
+            try:
+                report = self._profile(min(max(0.1, seconds), self.max_seconds), max(1, top))
+            except Exception as exc:
+                loop.call_soon_threadsafe(deliver, None, exc)
+            else:
+                loop.call_soon_threadsafe(deliver, report, None)
+            finally:
+                self._busy.release()
+
+        try:
+            threading.Thread(target=worker, name="profiler", daemon=True).start()
+        except BaseException:
+            self._busy.release()
+            raise
+        return await done
+
+    def _profile(self, seconds: float, top: int) -> Dict[str, Any]:
+        own = threading.get_ident()
+        interval = self.interval_s
+        stacks: Counter[Tuple[str, Tuple[Frame, ...]]] = Counter()
+        samples = 0
+        spent = 0.0
+        strikes = 0
+        stop_reason = "duration"
+        started = time.perf_counter()
+        deadline = started + seconds
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack: List[Frame] = []
+                while frame is not None and len(stack) < self.max_depth:
+                    code = frame.f_code
+                    stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                    frame = frame.f_back
+                stacks[(names.get(ident, f"thread-{ident}"), tuple(reversed(stack)))] += 1
+            samples += 1
+            cost = time.perf_counter() - now
+            spent += cost
+            if cost > self.max_overhead * (cost + interval):
+                # Budget de surcout depasse au rythme courant: on echantillonne moins souvent,
+                # puis on abandonne si meme l'intervalle maximal ne suffit pas
+                if interval >= MAX_INTERVAL_S:
+                    strikes += 1
+                    if strikes >= OVERHEAD_STRIKES:
+                        stop_reason = "overhead"
+                        break
+                interval = min(MAX_INTERVAL_S, interval * 2.0)
+            else:
+                strikes = 0
+            time.sleep(max(0.0, min(interval, deadline - time.perf_counter())))
+        elapsed = time.perf_counter() - started
+        return {
+            "durationS": round(elapsed, 3),
+            "samples": samples,
+            "intervalMs": round(interval * 1000.0, 2),
+            "overheadPct": round(100.0 * spent / elapsed, 3) if elapsed > 0 else 0.0,
+            "stopReason": stop_reason,
+            "collapsed": self._collapsed(stacks),
+            "top": self._top(stacks, top),
+        }
+
+    @staticmethod
+    def _collapsed(stacks: Counter[Tuple[str, Tuple[Frame, ...]]]) -> str:
+        lines = [
+            ";".join([thread.replace(";", "_"), *(_frame_label(f) for f in stack)]) + f" {count}"
+            for (thread, stack), count in stacks.most_common()
+        ]
+        return "\n".join(lines)
+
+    @staticmethod
+    def _top(stacks: Counter[Tuple[str, Tuple[Frame, ...]]], limit: int) -> List[Dict[str, Any]]:
+        self_counts: Counter[Frame] = Counter()
+        total_counts: Counter[Frame] = Counter()
+        total = sum(stacks.values()) or 1
+        for (_, stack), count in stacks.items():
+            if not stack:
+                continue
+            self_counts[stack[-1]] += count
+            for frame in set(stack):
+                total_counts[frame] += count
+        rows: List[Dict[str, Any]] = []
+        for frame, count in self_counts.most_common(limit):
+            name, filename, line = frame
+            rows.append(
+                {
+                    "function": name,
+                    "file": filename,
+                    "line": line,
+                    "self": count,
+                    "total": total_counts[frame],
+                    "selfPct": round(100.0 * count / total, 2),
+                    "totalPct": round(100.0 * total_counts[frame] / total, 2),
+                }
+            )
+        return rows
+
+    def config(self) -> Dict[str, Any]:
+        return {
+            "intervalMs": round(self.interval_s * 1000.0, 2),
+            "maxSeconds": self.max_seconds,
+            "maxOverhead": self.max_overhead,
+            "running": self.running,
+        }
+
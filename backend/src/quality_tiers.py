@@ -0,0 +1,126 @@
+"""
+Paliers de qualite de la segmentation, ajustes selon la charge du serveur.
+
+Le controleur suit une moyenne glissante (EWMA) de la latence Pose+FaceMesh et la
+profondeur de la file de l'ordonnanceur. Au-dessus de la cible (ou file trop longue) il
+descend d'un palier, bien en dessous et file vide il remonte: une instance chargee
+allege le travail par frame au lieu de laisser la file grossir.
+
+Hysteresis: il faut `degrade_after` frames consecutives en surcharge pour descendre,
+`upgrade_after` frames calmes pour remonter (plus lent), et au moins `min_dwell_s`
+secondes dans un palier avant tout changement.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .metrics import METRICS
+
+
+@dataclass(frozen=True)
+class QualityTier:
+    name: str
+    pose_complexity: int
+    # FaceMesh une frame sur `face_every` (1 = chaque frame, 0 = desactive)
+    face_every: int
+    # Sous-echantillonnage des points du visage renvoyes
+    face_stride: int
+
+
+def build_tiers(face_stride: int) -> Tuple[QualityTier, ...]:
+    """Paliers du plus riche au plus leger; `face_stride` est la valeur configuree."""
+    return (
+        QualityTier("high", pose_complexity=1, face_every=1, face_stride=face_stride),
+        QualityTier("balanced", pose_complexity=0, face_every=1, face_stride=face_stride),
+        QualityTier("reduced", pose_complexity=0, face_every=3, face_stride=min(10, face_stride * 2)),
+        QualityTier("minimal", pose_complexity=0, face_every=0, face_stride=face_stride),
+    )
+
+
+class QualityController:
+    def __init__(
+        self,
+        tiers: Tuple[QualityTier, ...],
+        enabled: bool = True,
+        initial: str = "balanced",
+        best: str = "high",
+        target_ms: float = 60.0,
+        queue_high: int = 4,
+        degrade_after: int = 5,
+        upgrade_after: int = 60,
+        min_dwell_s: float = 2.0,
+        smoothing: float = 0.2,
+        queue_depth: Optional[Callable[[], int]] = None,
+    ) -> None:
+        names = [tier.name for tier in tiers]
+        self.tiers = tiers
+        self.enabled = enabled
+        self.best_index = names.index(best) if best in names else 0
+        self.index = max(self.best_index, names.index(initial) if initial in names else 0)
+        self.target_ms = max(1.0, target_ms)
+        self.queue_high = max(1, queue_high)
+        self.degrade_after = max(1, degrade_after)
+        self.upgrade_after = max(1, upgrade_after)
+        self.min_dwell_s = max(0.0, min_dwell_s)
+        self.smoothing = min(1.0, max(0.01, smoothing))
+        self.queue_depth = queue_depth or (lambda: 0)
+        self.ewma_ms: Optional[float] = None
+        self.transitions = 0
+        self._over = 0
+        self._under = 0
+        self._since = time.monotonic()
+        self._lock = threading.Lock()
+        METRICS.describe("segmentation_quality_tier", "Palier de qualite actif (0 = le plus riche)")
+        METRICS.describe("segmentation_tier_changes_total", "Changements de palier de qualite, par sens")
+        METRICS.set_gauge("segmentation_quality_tier", self.index)
+
+    @property
+    def tier(self) -> QualityTier:
+        return self.tiers[self.index]
+
+    def observe(self, latency_ms: float) -> QualityTier:
+        """Enregistre la latence d'une frame et renvoie le palier a appliquer a la suivante."""
+        if not self.enabled:
+            return self.tier
+        depth = self.queue_depth()
+        with self._lock:
+            self.ewma_ms = latency_ms if self.ewma_ms is None else (
+                self.smoothing * latency_ms + (1.0 - self.smoothing) * self.ewma_ms
+            )
+            overloaded = self.ewma_ms > self.target_ms or depth >= self.queue_high
+            idle = self.ewma_ms < 0.6 * self.target_ms and depth == 0
+            self._over = self._over + 1 if overloaded else 0
+            self._under = self._under + 1 if idle else 0
+            if time.monotonic() - self._since < self.min_dwell_s:
+                return self.tier
+            if self._over >= self.degrade_after and self.index < len(self.tiers) - 1:
+                self._move(+1, "down")
+            elif self._under >= self.upgrade_after and self.index > self.best_index:
+                self._move(-1, "up")
+            return self.tier
+
+    def _move(self, step: int, direction: str) -> None:
+        previous = self.tier.name
+        self.index += step
+        self.transitions += 1
+        self._over = self._under = 0
+        self._since = time.monotonic()
+        # La latence mesuree correspond a l'ancien palier: on repart de zero
+        self.ewma_ms = None
+        METRICS.set_gauge("segmentation_quality_tier", self.index)
+        METRICS.inc("segmentation_tier_changes_total", direction=direction)
+        print(f"[Quality] segmentation {previous} -> {self.tier.name}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "tier": self.tier.name,
+            "tiers": [tier.name for tier in self.tiers[self.best_index :]],
+            "ewmaMs": round(self.ewma_ms, 2) if self.ewma_ms is not None else None,
+            "targetMs": self.target_ms,
+            "transitions": self.transitions,
+        }
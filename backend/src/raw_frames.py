@@ -0,0 +1,54 @@
+"""
+Frames en pixels bruts (sans JPEG): RGBA (canvas), RGB, niveaux de gris ou NV12.
+
+Le corps de la requete est enveloppe dans une vue NumPy sans copie. Pour `rgb`, cette vue
+est passee telle quelle a MediaPipe et au classifieur (ni decodage ni conversion BGR->RGB);
+les autres formats sont convertis en RGB en une seule passe OpenCV.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Tuple
+
+import cv2
+import numpy as np
+
+# Octets par pixel (NV12: plan Y plein + plan UV entrelace a demi-resolution)
+RAW_FORMATS: Dict[str, float] = {"rgba": 4.0, "rgb": 3.0, "gray": 1.0, "nv12": 1.5}
+ENCODED_FORMAT = "jpeg"
+
+_TO_RGB = {"rgba": cv2.COLOR_RGBA2RGB, "gray": cv2.COLOR_GRAY2RGB, "nv12": cv2.COLOR_YUV2RGB_NV12}
+
+
+def raw_frame_size(fmt: str, width: int, height: int) -> int:
+    return int(width * height * RAW_FORMATS[fmt])
+
+
+def validate_raw_frame(fmt: str, width: int, height: int, max_pixels: int) -> int:
+    """Taille attendue du corps en octets; ValueError si format ou dimensions invalides."""
+    if fmt not in RAW_FORMATS:
+        raise ValueError(f"format invalide (choix: {ENCODED_FORMAT}, {', '.join(RAW_FORMATS)})")
+    if width <= 0 or height <= 0:
+        raise ValueError("width et height sont requis pour un format brut")
+    if width * height > max_pixels:
+        raise ValueError(f"Frame trop grande ({width}x{height} > {max_pixels} pixels)")
+    if fmt == "nv12" and (width % 2 or height % 2):
+        raise ValueError("NV12: width et height doivent etre pairs")
+    return raw_frame_size(fmt, width, height)
+
+
+def wrap_raw_frame(buffer: memoryview, fmt: str, width: int, height: int) -> np.ndarray:
+    """Vue NumPy (sans copie) sur le tampon; la taille doit deja avoir ete verifiee."""
+    data = np.frombuffer(buffer, dtype=np.uint8, count=raw_frame_size(fmt, width, height))
+    if fmt == "nv12":
+        return data.reshape(height * 3 // 2, width)
+    if fmt == "gray":
+        return data.reshape(height, width)
+    return data.reshape(height, width, int(RAW_FORMATS[fmt]))
+
+
+def raw_to_rgb(view: np.ndarray, fmt: str) -> Tuple[np.ndarray, bool]:
+    """(image RGB, partage le tampon d'origine)."""
+    if fmt == "rgb":
+        return view, True
+    return cv2.cvtColor(view, _TO_RGB[fmt]), False
@@ -0,0 +1,220 @@
+"""
+Enregistrement des sessions (opt-in, RECORD_SESSIONS=true) pour rejouer des sequences reelles.
+
+Chaque frame recue (octets JPEG/PNG ou pixels bruts tels qu'envoyes), son horodatage, la
+session, le pipeline et le resultat renvoye sont ajoutes a des segments binaires tournants,
+ecrits par un thread dedie: le handler ne fait qu'un `put_nowait` (frame ignoree si la file
+est pleine, compteur `recorder_dropped_total`).
+
+Format d'un segment `seg-<n>.rec` (little endian):
+    MAGIC
+    puis des enregistrements: <I longueur> <d ts> <I meta> <I payload> <I resultat> meta payload resultat
+`meta` et `resultat` sont en JSON UTF-8. Le fichier `seg-<n>.idx` associe contient une entree
+<Q offset> <d ts> par enregistrement pour un acces direct.
+
+RECORD_MAX_SEGMENTS vaut pour tout le dossier: chaque worker ecrit ses propres segments,
+mais la retention supprime les plus anciens (date de modification) quel que soit l'auteur.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .metrics import METRICS
+
+MAGIC = b"ASLREC1\n"
+LENGTH = struct.Struct("<I")
+HEADER = struct.Struct("<dIII")
+INDEX_ENTRY = struct.Struct("<Qd")
+
+
+@dataclass
+class Record:
+    ts: float
+    meta: Dict[str, Any]
+    payload: memoryview
+    result: Dict[str, Any]
+
+
+def encode_record(ts: float, meta: Dict[str, Any], payload: bytes, result: Dict[str, Any]) -> bytes:
+    meta_raw = json.dumps(meta, separators=(",", ":")).encode("utf-8")
+    result_raw = json.dumps(result, separators=(",", ":"), default=str).encode("utf-8")
+    body = HEADER.pack(ts, len(meta_raw), len(payload), len(result_raw)) + meta_raw + payload + result_raw
+    return LENGTH.pack(len(body)) + body
+
+
+class SessionRecorder:
+    def __init__(
+        self,
+        directory: str,
+        enabled: bool = False,
+        segment_bytes: int = 64 * 1024 * 1024,
+        max_segments: int = 20,
+        queue_size: int = 256,
+    ) -> None:
+        self.directory = Path(directory)
+        self.enabled = enabled
+        self.segment_bytes = max(1024, segment_bytes)
+        self.max_segments = max(1, max_segments)
+        self._queue: "queue.Queue[Optional[Tuple[float, Dict[str, Any], bytes, Dict[str, Any]]]]" = queue.Queue(
+            maxsize=max(1, queue_size)
+        )
+        self._thread: Optional[threading.Thread] = None
+        self._segment_no = 0
+        self._rec = None
+        self._idx = None
+        self._rec_size = 0
+        self.written = 0
+        METRICS.describe("recorder_dropped_total", "Frames non enregistrees (file de l'enregistreur pleine)")
+        METRICS.describe("recorder_written_total", "Frames ecrites dans les segments d'enregistrement")
+
+    @property
+    def active(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> None:
+        """Demarre le thread d'ecriture (apres fork: un thread et des segments par worker)."""
+        if not self.enabled or self._thread is not None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="session-recorder", daemon=True)
+        self._thread.start()
+
+    def record(self, session_id: str, pipeline: str, payload: bytes, meta: Dict[str, Any], result: Dict[str, Any]) -> None:
+        if not self.active:
+            return
+        entry = (time.time(), {"session": session_id, "pipeline": pipeline, **meta}, payload, result)
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            METRICS.inc("recorder_dropped_total")
+
+    def close(self) -> None:
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout=5.0)
+        self._thread = None
+
+    def _run(self) -> None:
+        prefix = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        try:
+            while True:
+                entry = self._queue.get()
+                if entry is None:
+                    break
+                data = encode_record(*entry)
+                if self._rec is None or self._rec_size + len(data) > self.segment_bytes:
+                    self._rotate(prefix)
+                self._idx.write(INDEX_ENTRY.pack(self._rec_size, entry[0]))
+                self._rec.write(data)
+                self._rec_size += len(data)
+                self.written += 1
+                METRICS.inc("recorder_written_total")
+                if self._queue.empty():
+                    self._rec.flush()
+                    self._idx.flush()
+        finally:
+            self._close_segment()
+
+    def _rotate(self, prefix: str) -> None:
+        self._close_segment()
+        self._segment_no += 1
+        base = self.directory / f"seg-{prefix}-{self._segment_no:05d}"
+        self._rec = open(base.with_suffix(".rec"), "wb")
+        self._idx = open(base.with_suffix(".idx"), "wb")
+        self._rec.write(MAGIC)
+        self._rec_size = len(MAGIC)
+        self._prune(base.with_suffix(".rec"))
+
+    def _prune(self, current: Path) -> None:
+        """Garde max_segments segments dans le dossier (tous processus confondus), plus anciens supprimes d'abord."""
+        segments: List[Tuple[float, str, Path]] = []
+        for path in self.directory.glob("seg-*.rec"):
+            if path == current:
+                continue
+            try:
+                segments.append((path.stat().st_mtime, path.name, path))
+            except FileNotFoundError:
+                # Supprime entre-temps par un autre worker
+                continue
+        segments.sort()
+        for _, _, old in segments[: max(0, len(segments) + 1 - self.max_segments)]:
+            old.unlink(missing_ok=True)
+            old.with_suffix(".idx").unlink(missing_ok=True)
+        # Index sans segment (suppression interrompue): le .rec est toujours cree avant le .idx
+        for index in self.directory.glob("seg-*.idx"):
+            if not index.with_suffix(".rec").exists():
+                index.unlink(missing_ok=True)
+
+    def _close_segment(self) -> None:
+        for handle in (self._rec, self._idx):
+            if handle is not None:
+                handle.close()
+        self._rec = None
+        self._idx = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "directory": str(self.directory),
+            "written": self.written,
+            "queued": self._queue.qsize(),
+        }
+
+
+def list_segments(directory: Path) -> List[Path]:
+    return sorted(Path(directory).glob("seg-*.rec"))
+
+
+def read_index(segment: Path) -> List[Tuple[int, float]]:
+    idx = Path(segment).with_suffix(".idx")
+    if not idx.exists():
+        return []
+    raw = idx.read_bytes()
+    usable = len(raw) - len(raw) % INDEX_ENTRY.size
+    return [INDEX_ENTRY.unpack_from(raw, off) for off in range(0, usable, INDEX_ENTRY.size)]
+
+
+def iter_records(segment: Path, start_offset: int = 0) -> Iterator[Record]:
+    """
+    Lit un segment via mmap a partir de `start_offset` (voir read_index); les payloads sont
+    des vues sur le fichier, valides seulement jusqu'a l'enregistrement suivant.
+    """
+    with open(segment, "rb") as handle:
+        if Path(segment).stat().st_size <= len(MAGIC):
+            return
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                if bytes(view[: len(MAGIC)]) != MAGIC:
+                    raise ValueError(f"Segment invalide: {segment}")
+                offset = max(len(MAGIC), start_offset)
+                while offset + LENGTH.size <= len(view):
+                    (length,) = LENGTH.unpack_from(view, offset)
+                    start = offset + LENGTH.size
+                    if start + length > len(view):
+                        # Dernier enregistrement tronque (arret brutal pendant l'ecriture)
+                        break
+                    ts, meta_len, payload_len, result_len = HEADER.unpack_from(view, start)
+                    pos = start + HEADER.size
+                    meta = json.loads(bytes(view[pos : pos + meta_len]))
+                    pos += meta_len
+                    result = json.loads(bytes(view[pos + payload_len : pos + payload_len + result_len]))
+                    payload = view[pos : pos + payload_len]
+                    try:
+                        yield Record(ts, meta, payload, result)
+                    finally:
+                        payload.release()
+                    offset = start + length
+            finally:
+                view.release()
@@ -0,0 +1,99 @@
+"""
+Filtre qualite des ROI de main, applique apres la detection et avant le classifieur.
+
+Une main minuscule, coupee par le bord de l'image, en partie hors champ ou floue donne
+presque toujours un score sous ASL_MIN_CONFIDENCE: on saute alors l'appel TFLite et on
+renvoie un code raison. Les controles vont du moins cher au plus cher; la nettete
+(variance du laplacien) est mesuree sur la boite de la main decoupee dans la frame source
+(pas sur la ROI orientee, deja agrandie a la taille du modele), reduite a `sharpness_size`
+pixels de cote.
+
+Codes raison: too_small, clipped, occluded, blurry.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+
+import cv2
+import numpy as np
+
+from .metrics import METRICS
+
+REASONS = ("too_small", "clipped", "occluded", "blurry")
+
+
+class RoiQualityGate:
+    def __init__(
+        self,
+        enabled: bool = True,
+        min_size: int = 32,
+        max_clipped: float = 0.35,
+        min_visible: float = 0.8,
+        min_sharpness: float = 15.0,
+        padding_ratio: float = 0.2,
+        sharpness_size: int = 64,
+    ) -> None:
+        self.enabled = enabled
+        self.min_size = max(0, min_size)
+        self.max_clipped = max(0.0, min(1.0, max_clipped))
+        self.min_visible = max(0.0, min(1.0, min_visible))
+        self.min_sharpness = max(0.0, min_sharpness)
+        self.padding_ratio = padding_ratio
+        self.sharpness_size = max(8, sharpness_size)
+        self._gray = np.empty((self.sharpness_size, self.sharpness_size), dtype=np.uint8)
+        METRICS.describe("roi_checked_total", "ROI de main passees par le filtre qualite")
+        METRICS.describe("roi_rejected_total", "ROI de main rejetees avant classification, par raison")
+
+    def check(self, hand: Dict[str, Any], frame: np.ndarray, is_rgb: bool = False) -> Optional[str]:
+        """
+        Code raison si la ROI est inexploitable, None sinon (et toujours None si desactive).
+        `frame`: frame source de la detection, BGR ou RGB (`is_rgb`, ingest brut).
+        """
+        if not self.enabled:
+            return None
+        METRICS.inc("roi_checked_total")
+        reason = self._reason(hand, frame, is_rgb)
+        if reason is not None:
+            METRICS.inc("roi_rejected_total", reason=reason)
+        return reason
+
+    def _reason(self, hand: Dict[str, Any], frame: np.ndarray, is_rgb: bool) -> Optional[str]:
+        h, w = frame.shape[:2]
+        points = np.array([(lm.x, lm.y) for lm in hand["landmarks"].landmark], dtype=np.float32)
+        lo = points.min(axis=0)
+        hi = points.max(axis=0)
+        span = (hi - lo) * (w, h)
+        if float(span.min()) < self.min_size:
+            return "too_small"
+        # Part de la boite paddee (non rognee) qui sort de l'image
+        pad = (hi - lo) * self.padding_ratio
+        box_lo, box_hi = lo - pad, hi + pad
+        inside = np.clip(np.minimum(box_hi, 1.0) - np.maximum(box_lo, 0.0), 0.0, None)
+        area = float(np.prod(box_hi - box_lo))
+        if area > 0 and 1.0 - float(np.prod(inside)) / area > self.max_clipped:
+            return "clipped"
+        visible = np.all((points >= 0.0) & (points <= 1.0), axis=1)
+        if float(visible.mean()) < self.min_visible:
+            return "occluded"
+        if self.min_sharpness > 0:
+            x_min, y_min, x_max, y_max = hand["bbox"]
+            if self.sharpness(frame[y_min:y_max, x_min:x_max], is_rgb) < self.min_sharpness:
+                return "blurry"
+        return None
+
+    def sharpness(self, roi: np.ndarray, is_rgb: bool = False) -> float:
+        """Variance du laplacien sur la ROI (BGR, ou RGB si `is_rgb`) en niveaux de gris, reduite (cout constant)."""
+        small = cv2.resize(roi, (self.sharpness_size, self.sharpness_size), interpolation=cv2.INTER_AREA)
+        code = cv2.COLOR_RGB2GRAY if is_rgb else cv2.COLOR_BGR2GRAY
+        gray = cv2.cvtColor(small, code, dst=self._gray) if small.ndim == 3 else small
+        return float(cv2.Laplacian(gray, cv2.CV_32F).var())
+
+    def config(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "minSize": self.min_size,
+            "maxClipped": self.max_clipped,
+            "minVisible": self.min_visible,
+            "minSharpness": self.min_sharpness,
+        }
@@ -0,0 +1,183 @@
+"""
+Ordonnanceur equitable entre les handlers HTTP et les services d'inference.
+
+- Admission par session (seau a jetons): les frames au-dela de SESSION_MAX_FPS sont
+  rejetees avant le decodage.
+- L'identifiant de session (X-Session-Id) est choisi par le client: l'adresse du client a
+  aussi son seau, plafonne a PEER_MAX_SESSIONS sessions au debit maximal, et le tourniquet
+  est fait par adresse. Changer d'en-tete a chaque frame ne donne ni plus de debit ni plus
+  de tours.
+- Au plus INFERENCE_CONCURRENCY frames traitees en meme temps; les suivantes attendent
+  dans une file par client et les creneaux liberes sont attribues en tourniquet
+  (round-robin) entre clients, pour qu'un client a 30 FPS n'affame pas un client a 5 FPS.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import collections
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+from .metrics import METRICS
+from .sessions import SessionStore
+
+T = TypeVar("T")
+
+
+@dataclass
+class _TokenBucket:
+    tokens: float
+    updated: float
+
+
+@dataclass
+class _Client:
+    peer: str = ""
+
+
+def _refill(bucket: _TokenBucket, rate: float, burst: float, now: float) -> None:
+    bucket.tokens = min(burst, bucket.tokens + (now - bucket.updated) * rate)
+    bucket.updated = now
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str, retry_after_s: float) -> None:
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after_s = retry_after_s
+
+
+class FairScheduler:
+    """A utiliser depuis la boucle asyncio uniquement (comme FrameMailbox)."""
+
+    def __init__(
+        self,
+        concurrency: int = 2,
+        session_max_fps: float = 15.0,
+        session_burst: int = 5,
+        max_queue: int = 64,
+        max_sessions: int = 256,
+        peer_max_sessions: int = 4,
+    ) -> None:
+        self.concurrency = max(1, concurrency)
+        self.session_max_fps = session_max_fps
+        self.session_burst = max(1, session_burst)
+        self.peer_max_sessions = max(0, peer_max_sessions)
+        self.max_queue = max(1, max_queue)
+        self.running = 0
+        self.queued = 0
+        self._queues: "collections.OrderedDict[str, Deque[asyncio.Future[None]]]" = collections.OrderedDict()
+        self._buckets: SessionStore[_TokenBucket] = SessionStore(
+            lambda: _TokenBucket(float(self.session_burst), time.monotonic()), max_sessions=max_sessions
+        )
+        # Seaux par adresse client (PEER_MAX_SESSIONS fois le quota d'une session)
+        self._peer_buckets: SessionStore[_TokenBucket] = SessionStore(
+            lambda: _TokenBucket(float(self.session_burst * self.peer_max_sessions), time.monotonic()),
+            max_sessions=max_sessions,
+        )
+        # Session -> adresse, pour placer ses frames dans la file du client
+        self._clients: SessionStore[_Client] = SessionStore(_Client, max_sessions=max_sessions)
+        METRICS.describe(
+            "frames_rejected_total",
+            "Frames refusees a l'admission (rate: quota session, peer: quota de l'adresse client, queue: file pleine)",
+        )
+        METRICS.describe("scheduler_wait_ms", "Attente d'un creneau d'inference dans l'ordonnanceur")
+
+    def admit(self, session_id: str, peer: Optional[str] = None) -> None:
+        """
+        Consomme un jeton de la session et un de l'adresse `peer`; leve AdmissionRejected
+        si un quota ou la file est depasse (aucun jeton consomme dans ce cas).
+        """
+        if self.queued >= self.max_queue:
+            METRICS.inc("frames_rejected_total", reason="queue")
+            raise AdmissionRejected("queue", 1.0 / max(1.0, self.session_max_fps))
+        if peer is not None:
+            self._clients.get(session_id).peer = peer
+        if self.session_max_fps <= 0:
+            return
+        now = time.monotonic()
+        bucket = self._buckets.get(session_id)
+        _refill(bucket, self.session_max_fps, float(self.session_burst), now)
+        if bucket.tokens < 1.0:
+            METRICS.inc("frames_rejected_total", reason="rate")
+            raise AdmissionRejected("rate", (1.0 - bucket.tokens) / self.session_max_fps)
+        if peer is not None and self.peer_max_sessions > 0:
+            peer_rate = self.session_max_fps * self.peer_max_sessions
+            peer_bucket = self._peer_buckets.get(peer)
+            _refill(peer_bucket, peer_rate, float(self.session_burst * self.peer_max_sessions), now)
+            if peer_bucket.tokens < 1.0:
+                METRICS.inc("frames_rejected_total", reason="peer")
+                raise AdmissionRejected("peer", (1.0 - peer_bucket.tokens) / peer_rate)
+            peer_bucket.tokens -= 1.0
+        bucket.tokens -= 1.0
+
+    def _queue_key(self, session_id: str) -> str:
+        """File du tourniquet: l'adresse du client si connue, sinon la session."""
+        client = self._clients.peek(session_id)
+        return f"peer:{client.peer}" if client is not None and client.peer else session_id
+
+    async def run(self, session_id: str, job: Callable[[], Awaitable[T]]) -> T:
+        started = time.perf_counter()
+        await self._acquire(self._queue_key(session_id))
+        METRICS.observe("scheduler_wait_ms", (time.perf_counter() - started) * 1000.0)
+        try:
+            return await job()
+        finally:
+            self._release()
+
+    async def _acquire(self, key: str) -> None:
+        if self.running < self.concurrency and not self.queued:
+            self.running += 1
+            return
+        waiter: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(key, collections.deque()).append(waiter)
+        self.queued += 1
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Creneau deja attribue: on le rend
+                self._release()
+            else:
+                self._forget(key, waiter)
+            raise
+
+    def _forget(self, key: str, waiter: "asyncio.Future[None]") -> None:
+        queue = self._queues.get(key)
+        if queue is not None and waiter in queue:
+            queue.remove(waiter)
+            self.queued -= 1
+            if not queue:
+                del self._queues[key]
+
+    def _release(self) -> None:
+        self.running -= 1
+        while self._queues and self.running < self.concurrency:
+            # Tourniquet: le client servi passe en fin de file
+            key, queue = next(iter(self._queues.items()))
+            waiter = queue.popleft()
+            self.queued -= 1
+            del self._queues[key]
+            if queue:
+                self._queues[key] = queue
+            if waiter.done():
+                continue
+            self.running += 1
+            waiter.set_result(None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "concurrency": self.concurrency,
+            "running": self.running,
+            "queued": self.queued,
+            "waitingClients": len(self._queues),
+            "sessionMaxFps": self.session_max_fps,
+            "sessionBurst": self.session_burst,
+            "peerMaxSessions": self.peer_max_sessions,
+        }
+
+
+def retry_after_header(exc: AdmissionRejected) -> Dict[str, str]:
+    return {"Retry-After": str(max(1, int(exc.retry_after_s + 0.999)))}
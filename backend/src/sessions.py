@@ -0,0 +1,107 @@
+"""Etat par session client (identifiee par l'en-tete X-Session-Id)."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, List, Optional, Tuple, TypeVar
+
+from fastapi import Request
+
+T = TypeVar("T")
+
+SESSION_HEADER = "X-Session-Id"
+_SESSION_ID_MAX_LEN = 64
+
+
+def session_id_from_request(request: Request) -> str:
+    raw = (request.headers.get(SESSION_HEADER) or "").strip()
+    if raw:
+        return raw[:_SESSION_ID_MAX_LEN]
+    client = request.client
+    return f"ip:{client.host}" if client is not None else "anonymous"
+
+
+def peer_from_request(request: Request) -> str:
+    """Adresse du client (non choisie par lui, contrairement a X-Session-Id)."""
+    client = request.client
+    return client.host if client is not None else "anonymous"
+
+
+class SessionStore(Generic[T]):
+    """
+    Dictionnaire LRU borne, avec expiration des sessions inactives.
+    `on_evict` est appele (hors verrou) sur chaque valeur evincee ou expiree.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], T],
+        max_sessions: int = 64,
+        ttl_s: float = 300.0,
+        on_evict: Optional[Callable[[T], None]] = None,
+    ) -> None:
+        self.factory = factory
+        self.max_sessions = max(1, max_sessions)
+        self.ttl_s = ttl_s
+        self.on_evict = on_evict
+        self._lock = threading.Lock()
+        self._items: "OrderedDict[str, Tuple[float, T]]" = OrderedDict()
+
+    def get(self, session_id: str) -> T:
+        now = time.monotonic()
+        evicted: List[T] = []
+        with self._lock:
+            entry = self._items.pop(session_id, None)
+            if entry is None or (self.ttl_s > 0 and now - entry[0] > self.ttl_s):
+                if entry is not None:
+                    evicted.append(entry[1])
+                value = self.factory()
+            else:
+                value = entry[1]
+            self._items[session_id] = (now, value)
+            evicted.extend(self._evict(now))
+        self._release(evicted)
+        return value
+
+    def peek(self, session_id: str) -> Optional[T]:
+        with self._lock:
+            entry = self._items.get(session_id)
+            return entry[1] if entry is not None else None
+
+    def drop(self, session_id: str) -> None:
+        with self._lock:
+            entry = self._items.pop(session_id, None)
+        if entry is not None:
+            self._release([entry[1]])
+
+    def clear(self) -> None:
+        with self._lock:
+            values = [entry[1] for entry in self._items.values()]
+            self._items.clear()
+        self._release(values)
+
+    def _evict(self, now: float) -> List[T]:
+        evicted: List[T] = []
+        while len(self._items) > self.max_sessions:
+            evicted.append(self._items.popitem(last=False)[1][1])
+        if self.ttl_s <= 0:
+            return evicted
+        while self._items:
+            key, (ts, value) = next(iter(self._items.items()))
+            if now - ts <= self.ttl_s:
+                break
+            del self._items[key]
+            evicted.append(value)
+        return evicted
+
+    def _release(self, values: List[T]) -> None:
+        if self.on_evict is None:
+            return
+        for value in values:
+            self.on_evict(value)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._items)
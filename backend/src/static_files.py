@@ -0,0 +1,159 @@
+"""
+Service du frontend compile (backend/static) depuis un manifeste en memoire.
+
+Le manifeste est construit une fois au demarrage (avant le fork en multi-workers): contenu,
+type MIME, ETag fort et variantes gzip/brotli precompressees. Une requete ne fait donc
+aucun appel au systeme de fichiers. Les fichiers haches de `assets/` sont servis avec
+`Cache-Control: immutable`, le reste (index.html...) avec `no-cache` et revalidation par ETag.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import mimetypes
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional
+
+from fastapi import Response
+
+try:
+    import brotli
+except Exception:
+    brotli = None
+
+IMMUTABLE_PREFIX = "assets/"
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+MIN_COMPRESS_SIZE = 512
+# Ordre de preference quand le client accepte plusieurs encodages
+ENCODINGS = ("br", "gzip")
+_ETAG_SUFFIX = {"identity": "", "gzip": "-gz", "br": "-br"}
+_PRECOMPRESSED_EXT = {".br": "br", ".gz": "gzip"}
+_COMPRESSIBLE = ("text/", "application/javascript", "application/json", "image/svg+xml", "application/wasm")
+
+
+def _is_compressible(content_type: str) -> bool:
+    return content_type.startswith(_COMPRESSIBLE) or content_type.endswith("+json")
+
+
+def _compress(data: bytes, encoding: str) -> Optional[bytes]:
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(data, quality=11)
+    return None
+
+
+def accepted_encodings(header: str) -> List[str]:
+    """Encodages de `Accept-Encoding` avec q > 0 (`*` accepte tout)."""
+    accepted: List[str] = []
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name and q > 0:
+            accepted.append(name)
+    return accepted
+
+
+@dataclass
+class StaticAsset:
+    content_type: str
+    etag_base: str
+    cache_control: str
+    variants: Dict[str, bytes] = field(default_factory=dict)
+
+    def etag(self, encoding: str) -> str:
+        return f'"{self.etag_base}{_ETAG_SUFFIX[encoding]}"'
+
+    def matches(self, if_none_match: str) -> bool:
+        if if_none_match.strip() == "*":
+            return True
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return any(self.etag(encoding) in tags for encoding in self.variants)
+
+    def pick(self, accept_encoding: str) -> str:
+        accepted = accepted_encodings(accept_encoding)
+        for encoding in ENCODINGS:
+            if encoding in self.variants and (encoding in accepted or "*" in accepted):
+                return encoding
+        return "identity"
+
+
+class StaticManifest:
+    def __init__(self, assets: Dict[str, StaticAsset]) -> None:
+        self.assets = assets
+
+    @classmethod
+    def build(cls, root: Path, compress: bool = True) -> "StaticManifest":
+        root = Path(root)
+        files = sorted(p for p in root.rglob("*") if p.is_file())
+        known = set(files)
+        precompressed = {p for p in files if p.suffix in _PRECOMPRESSED_EXT and p.with_suffix("") in known}
+        assets: Dict[str, StaticAsset] = {}
+        for path in files:
+            if path in precompressed:
+                continue
+            rel = path.relative_to(root).as_posix()
+            data = path.read_bytes()
+            content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+            if content_type.startswith("text/") or content_type == "application/javascript":
+                content_type += "; charset=utf-8"
+            asset = StaticAsset(
+                content_type=content_type,
+                etag_base=hashlib.sha256(data).hexdigest()[:32],
+                cache_control=IMMUTABLE_CACHE if rel.startswith(IMMUTABLE_PREFIX) else REVALIDATE_CACHE,
+                variants={"identity": data},
+            )
+            for ext, encoding in _PRECOMPRESSED_EXT.items():
+                sibling = path.with_name(path.name + ext)
+                if sibling in precompressed:
+                    asset.variants[encoding] = sibling.read_bytes()
+            if compress and len(data) >= MIN_COMPRESS_SIZE and _is_compressible(content_type):
+                for encoding in ENCODINGS:
+                    if encoding in asset.variants:
+                        continue
+                    packed = _compress(data, encoding)
+                    if packed is not None and len(packed) < len(data):
+                        asset.variants[encoding] = packed
+            assets[rel] = asset
+        return cls(assets)
+
+    def get(self, rel_path: str) -> Optional[StaticAsset]:
+        return self.assets.get(rel_path)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "files": len(self.assets),
+            "bytes": sum(len(a.variants["identity"]) for a in self.assets.values()),
+            "compressedBytes": sum(
+                len(data) for a in self.assets.values() for enc, data in a.variants.items() if enc != "identity"
+            ),
+        }
+
+    def response(self, asset: StaticAsset, headers: Mapping[str, str], method: str = "GET") -> Response:
+        encoding = asset.pick(headers.get("accept-encoding", ""))
+        out_headers = {
+            "ETag": asset.etag(encoding),
+            "Cache-Control": asset.cache_control,
+            "Vary": "Accept-Encoding",
+        }
+        if encoding != "identity":
+            out_headers["Content-Encoding"] = encoding
+        if_none_match = headers.get("if-none-match")
+        if if_none_match and asset.matches(if_none_match):
+            return Response(status_code=304, headers=out_headers)
+        body = asset.variants[encoding]
+        if method == "HEAD":
+            out_headers["Content-Length"] = str(len(body))
+            body = b""
+        return Response(content=body, media_type=asset.content_type, headers=out_headers)
+
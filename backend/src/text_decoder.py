@@ -0,0 +1,177 @@
+"""
+Decodeur lettres -> texte en flux, a partir des vecteurs de scores du classifieur ASL.
+
+Recherche en faisceau facon CTC (prefix beam search): NOTHING (ou aucune main) joue le
+role du symbole blanc, une lettre tenue sur plusieurs frames n'est emise qu'une fois
+(une lettre doublee demande un blanc entre les deux), SPACE insere un espace et
+DELETE efface le dernier caractere. Une main absente ne compte comme blanc qu'apres
+`min_blank_frames` frames consecutives: une perte de detection isolee est ignoree. Un petit lexique optionnel favorise les mots connus.
+
+Cout par frame borne: `beam_width` hypotheses x `top_k` symboles, et la partie commune
+a toutes les hypotheses est validee (`committed`) au fil de l'eau, ce qui garde les
+suffixes en attente courts (au plus `max_pending` evenements).
+"""
+
+from __future__ import annotations
+
+import math
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+NEG_INF = -math.inf
+BLANK_LABEL = "NOTHING"
+SPACE_EVENT = " "
+DELETE_EVENT = "\b"
+_CONTROL_LABELS = {"SPACE": SPACE_EVENT, "DELETE": DELETE_EVENT}
+
+Tail = Tuple[str, ...]
+
+
+def _logaddexp(a: float, b: float) -> float:
+    if a == NEG_INF:
+        return b
+    if b == NEG_INF:
+        return a
+    hi, lo = (a, b) if a > b else (b, a)
+    return hi + math.log1p(math.exp(lo - hi))
+
+
+def apply_events(text: str, events: Iterable[str]) -> str:
+    chars = list(text)
+    for event in events:
+        if event == DELETE_EVENT:
+            if chars:
+                chars.pop()
+        else:
+            chars.append(event)
+    return "".join(chars)
+
+
+def load_lexicon(path: Optional[str]) -> FrozenSet[str]:
+    """Un mot par ligne (insensible a la casse); ensemble vide si pas de fichier."""
+    if not path or not Path(path).exists():
+        return frozenset()
+    words = (line.strip().upper() for line in Path(path).read_text(encoding="utf-8").splitlines())
+    return frozenset(word for word in words if word and " " not in word)
+
+
+class StreamingTextDecoder:
+    def __init__(
+        self,
+        labels: Sequence[str],
+        beam_width: int = 8,
+        top_k: int = 4,
+        lexicon: FrozenSet[str] = frozenset(),
+        lexicon_weight: float = 2.0,
+        max_pending: int = 32,
+        max_committed: int = 500,
+        min_blank_frames: int = 3,
+    ) -> None:
+        self.beam_width = max(1, beam_width)
+        self.top_k = max(1, top_k)
+        self.lexicon = lexicon
+        self.lexicon_prefixes = frozenset(word[:i] for word in lexicon for i in range(1, len(word) + 1))
+        self.lexicon_weight = lexicon_weight
+        self.max_pending = max(1, max_pending)
+        self.max_committed = max_committed
+        self.min_blank_frames = max(1, min_blank_frames)
+        self.blank = labels.index(BLANK_LABEL) if BLANK_LABEL in labels else None
+        # Evenement emis par chaque classe (lettre, espace, effacement); None pour le blanc
+        self.events: List[Optional[str]] = []
+        for idx, label in enumerate(labels):
+            if idx == self.blank:
+                self.events.append(None)
+            else:
+                self.events.append(_CONTROL_LABELS.get(label, label[:1].upper() if label else None))
+        self.reset()
+
+    def reset(self) -> None:
+        self.committed = ""
+        self.last_event: Optional[str] = None
+        self.missing_frames = 0
+        # suffixe en attente -> (log p fin sur blanc, log p fin sur symbole)
+        self.beams: Dict[Tail, Tuple[float, float]] = {(): (0.0, NEG_INF)}
+
+    def _lexicon_score(self, tail: Tail, event: str) -> float:
+        if not self.lexicon:
+            return 0.0
+        text = apply_events(self.committed[-64:], tail)
+        word = text.rsplit(" ", 1)[-1]
+        if event == SPACE_EVENT:
+            if not word:
+                return 0.0
+            return self.lexicon_weight if word in self.lexicon else -self.lexicon_weight
+        if event == DELETE_EVENT:
+            return 0.0
+        return 0.0 if (word + event) in self.lexicon_prefixes else -0.5 * self.lexicon_weight
+
+    def step(self, scores: Optional[np.ndarray]) -> None:
+        """Consomme une frame: vecteur de scores du classifieur, ou None si aucune main."""
+        if scores is None:
+            self.missing_frames += 1
+            if self.missing_frames < self.min_blank_frames:
+                # Perte de detection trop courte pour separer deux lettres: frame sautee
+                return
+            self.beams = {tail: (_logaddexp(pb, pnb), NEG_INF) for tail, (pb, pnb) in self.beams.items()}
+            return
+        self.missing_frames = 0
+        probs = np.asarray(scores, dtype=np.float64).reshape(-1)[: len(self.events)]
+        total = float(probs.sum())
+        log_probs = np.log(np.clip(probs / total if total > 0 else probs, 1e-12, 1.0))
+        blank_lp = float(log_probs[self.blank]) if self.blank is not None else NEG_INF
+        k = min(self.top_k, len(log_probs))
+        candidates = [int(i) for i in np.argpartition(-log_probs, k - 1)[:k] if self.events[int(i)] is not None]
+
+        nxt: Dict[Tail, List[float]] = {}
+
+        def add(tail: Tail, blank_part: float, symbol_part: float) -> None:
+            entry = nxt.setdefault(tail, [NEG_INF, NEG_INF])
+            entry[0] = _logaddexp(entry[0], blank_part)
+            entry[1] = _logaddexp(entry[1], symbol_part)
+
+        for tail, (pb, pnb) in self.beams.items():
+            p_total = _logaddexp(pb, pnb)
+            add(tail, p_total + blank_lp, NEG_INF)
+            last = tail[-1] if tail else self.last_event
+            for idx in candidates:
+                event = self.events[idx]
+                lp = float(log_probs[idx])
+                extended = tail + (event,)
+                if event == last:
+                    # Meme symbole tenu: pas de nouvelle emission, sauf apres un blanc
+                    add(tail, NEG_INF, pnb + lp)
+                    add(extended, NEG_INF, pb + lp + self._lexicon_score(tail, event))
+                else:
+                    add(extended, NEG_INF, p_total + lp + self._lexicon_score(tail, event))
+
+        ranked = sorted(nxt.items(), key=lambda item: _logaddexp(*item[1]), reverse=True)[: self.beam_width]
+        self.beams = {tail: (entry[0], entry[1]) for tail, entry in ranked}
+        self._commit()
+
+    def _commit(self) -> None:
+        tails = list(self.beams)
+        best = tails[0]
+        if len(best) > self.max_pending:
+            # Borne memoire: on fige le plus ancien evenement de la meilleure hypothese
+            head = best[0]
+            self.beams = {tail: value for tail, value in self.beams.items() if tail[:1] == (head,)}
+            tails = list(self.beams)
+        common = 0
+        shortest = min(len(tail) for tail in tails)
+        while common < shortest and all(tail[common] == best[common] for tail in tails):
+            common += 1
+        if common == 0:
+            return
+        self.committed = apply_events(self.committed, best[:common])[-self.max_committed :]
+        self.last_event = best[common - 1]
+        self.beams = {tail[common:]: value for tail, value in self.beams.items()}
+
+    @property
+    def hypothesis(self) -> str:
+        best = max(self.beams.items(), key=lambda item: _logaddexp(*item[1]))[0]
+        return apply_events(self.committed, best)
+
+    def state(self) -> Dict[str, str]:
+        return {"committed": self.committed, "hypothesis": self.hypothesis}
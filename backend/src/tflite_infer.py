@@ -5,18 +5,20 @@ Wrapper pour l'inférence TFLite avec gestion automatique des formats d'entrée.
 import os
 import numpy as np
 import cv2
-from typing import Tuple, Optional, Dict, Any
+from typing import Tuple, Optional, Dict, Any, List
 
+# tflite_runtime d'abord: quelques Mo contre toute la pile TensorFlow si les deux sont installés
 try:
-    import tensorflow as tf
+    import tflite_runtime.interpreter as tflite
     TFLITE_AVAILABLE = True
+    tf = None
 except ImportError:
-    TFLITE_AVAILABLE = False
+    tflite = None
     try:
-        import tflite_runtime.interpreter as tflite
+        import tensorflow as tf
         TFLITE_AVAILABLE = True
-        tf = None
     except ImportError:
+        tf = None
         TFLITE_AVAILABLE = False
 
 
@@ -26,29 +28,46 @@ class TFLiteModel:
     des formats d'entrée (shape, type, normalisation).
     """
     
-    def __init__(self, model_path: str):
+    def __init__(self, model_path: Optional[str] = None, model_content: Optional[bytes] = None,
+                 backend: Optional[Any] = None):
         """
         Args:
             model_path: Chemin vers le fichier .tflite
+            model_content: Contenu du modèle déjà chargé en mémoire (prioritaire sur
+                model_path). Un buffer chargé avant le fork des workers reste
+                partagé en copy-on-write entre les processus.
+            backend: Backend d'inférence déjà construit (voir inference_backends.py).
+                Si fourni, remplace l'interpréteur TFLite interne.
             
         Raises:
             FileNotFoundError: Si le modèle n'existe pas
             RuntimeError: Si TFLite n'est pas disponible ou si le modèle est invalide
         """
+        self.backend = backend
+        if backend is not None:
+            self.interpreter = None
+            self._init_input_format(backend.input_shape, backend.input_dtype)
+            print(f"[Inference] Backend: {backend.name}, input {self.input_width}x{self.input_height}")
+            return
+        
         if not TFLITE_AVAILABLE:
             raise RuntimeError(
                 "TFLite n'est pas disponible. Installez tensorflow ou tflite-runtime."
             )
         
-        if not os.path.exists(model_path):
-            raise FileNotFoundError(f"Modèle non trouvé: {model_path}")
+        if model_content is None:
+            if model_path is None:
+                raise ValueError("model_path ou model_content requis")
+            if not os.path.exists(model_path):
+                raise FileNotFoundError(f"Modèle non trouvé: {model_path}")
         
         # Charge le modèle
         try:
-            if tf is not None:
-                self.interpreter = tf.lite.Interpreter(model_path=model_path)
+            interpreter_cls = tflite.Interpreter if tflite is not None else tf.lite.Interpreter
+            if model_content is not None:
+                self.interpreter = interpreter_cls(model_content=model_content)
             else:
-                self.interpreter = tflite.Interpreter(model_path=model_path)
+                self.interpreter = interpreter_cls(model_path=model_path)
             self.interpreter.allocate_tensors()
         except Exception as e:
             raise RuntimeError(f"Erreur lors du chargement du modèle: {e}")
@@ -56,12 +75,24 @@ class TFLiteModel:
         # Récupère les détails d'entrée et de sortie
         self.input_details = self.interpreter.get_input_details()
         self.output_details = self.interpreter.get_output_details()
+        self._batch_size = 1
         
         # Analyse les détails d'entrée
         input_detail = self.input_details[0]
-        self.input_shape = input_detail['shape']
-        self.input_dtype = input_detail['dtype']
         self.input_name = input_detail['name']
+        self._init_input_format(input_detail['shape'], input_detail['dtype'])
+        
+        source = f"buffer partagé ({len(model_content)} octets)" if model_content is not None else model_path
+        print(f"[TFLite] Modèle chargé: {source}")
+        print(f"[TFLite] Input shape: {self.input_shape}")
+        print(f"[TFLite] Input dtype: {self.input_dtype}")
+        print(f"[TFLite] Input size: {self.input_width}x{self.input_height}")
+        print(f"[TFLite] Normalisation: {'uint8 (pas de normalisation)' if self.is_uint8 else 'float32 ([0,1])'}")
+    
+    def _init_input_format(self, input_shape, input_dtype):
+        """Déduit taille, type et normalisation d'entrée depuis la shape et le dtype."""
+        self.input_shape = input_shape
+        self.input_dtype = input_dtype
         
         # Détermine la taille d'entrée (ignore la dimension batch)
         if len(self.input_shape) == 4:  # [batch, height, width, channels]
@@ -78,32 +109,30 @@ class TFLiteModel:
         # Détermine le type et la normalisation nécessaires
         self.is_uint8 = self.input_dtype == np.uint8
         self.is_float32 = self.input_dtype == np.float32
-        
-        print(f"[TFLite] Modèle chargé: {model_path}")
-        print(f"[TFLite] Input shape: {self.input_shape}")
-        print(f"[TFLite] Input dtype: {self.input_dtype}")
-        print(f"[TFLite] Input size: {self.input_width}x{self.input_height}")
-        print(f"[TFLite] Normalisation: {'uint8 (pas de normalisation)' if self.is_uint8 else 'float32 ([0,1])'}")
     
-    def preprocess(self, image: np.ndarray) -> np.ndarray:
+    def preprocess(self, image: np.ndarray, is_rgb: bool = False) -> np.ndarray:
         """
         Pré-traite une image pour correspondre aux exigences du modèle.
         
         Args:
             image: Image BGR (OpenCV) de forme (H, W, 3)
+            is_rgb: L'image est déjà en RGB (pas de conversion)
             
         Returns:
             Image pré-traitée prête pour l'inférence
         """
         # Convertit en RGB si nécessaire (MediaPipe utilise RGB)
-        if len(image.shape) == 3 and image.shape[2] == 3:
+        if not is_rgb and len(image.shape) == 3 and image.shape[2] == 3:
             # Assume BGR depuis OpenCV, convertit en RGB
             image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
         else:
             image_rgb = image
         
-        # Redimensionne à la taille d'entrée du modèle
-        resized = cv2.resize(image_rgb, (self.input_width, self.input_height))
+        # Redimensionne à la taille d'entrée du modèle (sauf ROI déjà à la bonne taille)
+        if image_rgb.shape[:2] == (self.input_height, self.input_width):
+            resized = image_rgb
+        else:
+            resized = cv2.resize(image_rgb, (self.input_width, self.input_height))
         
         # Ajoute la dimension batch si nécessaire
         if len(self.input_shape) == 4:
@@ -124,12 +153,13 @@ class TFLiteModel:
         
         return input_data
     
-    def predict(self, image: np.ndarray) -> Tuple[int, float, np.ndarray]:
+    def predict(self, image: np.ndarray, is_rgb: bool = False) -> Tuple[int, float, np.ndarray]:
         """
         Effectue une prédiction sur une image.
         
         Args:
             image: Image BGR (OpenCV) de forme (H, W, 3)
+            is_rgb: L'image est déjà en RGB
             
         Returns:
             Tuple (class_index, confidence, all_scores):
@@ -138,7 +168,57 @@ class TFLiteModel:
             - all_scores: Tableau de tous les scores
         """
         # Pré-traite l'image
-        input_data = self.preprocess(image)
+        input_data = self.preprocess(image, is_rgb)
+        
+        scores = self.scores_from_output(self.run(input_data))
+        
+        # Trouve la classe prédite
+        class_index = int(np.argmax(scores))
+        confidence = float(scores[class_index])
+        
+        return class_index, confidence, scores
+    
+    def predict_batch(self, images: List[np.ndarray], is_rgb: bool = False) -> List[Tuple[int, float, np.ndarray]]:
+        """
+        Classifie plusieurs images en une seule invocation de l'interpréteur.
+        
+        Args:
+            images: Liste d'images BGR (OpenCV)
+            is_rgb: Les images sont déjà en RGB
+            
+        Returns:
+            Liste de tuples (class_index, confidence, all_scores), dans l'ordre des images
+        """
+        if not images:
+            return []
+        if len(self.input_shape) != 4:
+            # Pas de dimension batch dans le modèle: inférences successives
+            return [self.predict(image, is_rgb) for image in images]
+        
+        batch = np.concatenate([self.preprocess(image, is_rgb) for image in images], axis=0)
+        output_data = self.run(batch)
+        
+        results = []
+        for row in output_data.reshape(len(images), -1):
+            scores = self.scores_from_output(row)
+            class_index = int(np.argmax(scores))
+            results.append((class_index, float(scores[class_index]), scores))
+        return results
+    
+    def run(self, input_data: np.ndarray) -> np.ndarray:
+        """
+        Lance l'inférence sur une entrée pré-traitée et retourne la sortie brute.
+        La taille de batch de l'interpréteur suit la première dimension de l'entrée.
+        """
+        if self.backend is not None:
+            return self.backend.run(input_data)
+        
+        if len(self.input_shape) == 4 and input_data.shape[0] != self._batch_size:
+            self._batch_size = int(input_data.shape[0])
+            self.interpreter.resize_tensor_input(
+                self.input_details[0]['index'], [self._batch_size, *self.input_shape[1:]]
+            )
+            self.interpreter.allocate_tensors()
         
         # Définit l'entrée
         self.interpreter.set_tensor(self.input_details[0]['index'], input_data)
@@ -147,8 +227,11 @@ class TFLiteModel:
         self.interpreter.invoke()
         
         # Récupère la sortie
-        output_data = self.interpreter.get_tensor(self.output_details[0]['index'])
-        
+        return self.interpreter.get_tensor(self.output_details[0]['index'])
+    
+    @staticmethod
+    def scores_from_output(output_data: np.ndarray) -> np.ndarray:
+        """Aplatit la sortie brute et la normalise en probabilités si besoin."""
         # Aplatit si nécessaire (gère batch dimension)
         if len(output_data.shape) > 1:
             scores = output_data[0] if output_data.shape[0] == 1 else output_data.flatten()
@@ -162,11 +245,7 @@ class TFLiteModel:
             exp_scores = np.exp(scores - np.max(scores))  # Pour stabilité numérique
             scores = exp_scores / np.sum(exp_scores)
         
-        # Trouve la classe prédite
-        class_index = int(np.argmax(scores))
-        confidence = float(scores[class_index])
-        
-        return class_index, confidence, scores
+        return scores
     
     def get_input_size(self) -> Tuple[int, int]:
         """Retourne la taille d'entrée attendue (width, height)."""
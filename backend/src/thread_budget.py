@@ -0,0 +1,154 @@
+"""
+Budget de threads CPU partage entre OpenCV, TFLite, MediaPipe et le pool de threads serveur.
+
+Le nombre de coeurs disponibles tient compte de l'affinite CPU et des quotas cgroup
+(v1 et v2) du conteneur, puis est divise entre les workers (WEB_CONCURRENCY).
+"""
+
+from __future__ import annotations
+
+import math
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+
+_mediapipe_threads: Optional[int] = None
+
+
+def _cgroup_cpu_limit(root: Path = CGROUP_ROOT) -> Optional[float]:
+    """Quota CPU en nombre de coeurs (fractionnaire), ou None si illimite/inconnu."""
+    try:
+        v2 = root / "cpu.max"
+        if v2.exists():
+            quota, period = v2.read_text().split()[:2]
+            if quota != "max" and int(period) > 0:
+                return int(quota) / int(period)
+            return None
+        quota_file = root / "cpu" / "cpu.cfs_quota_us"
+        period_file = root / "cpu" / "cpu.cfs_period_us"
+        if quota_file.exists() and period_file.exists():
+            quota = int(quota_file.read_text().strip())
+            period = int(period_file.read_text().strip())
+            if quota > 0 and period > 0:
+                return quota / period
+    except (OSError, ValueError):
+        return None
+    return None
+
+
+def available_cpus() -> Dict[str, Any]:
+    try:
+        affinity = len(os.sched_getaffinity(0))
+    except AttributeError:
+        affinity = os.cpu_count() or 1
+    quota = _cgroup_cpu_limit()
+    cpus = affinity if quota is None else max(1, min(affinity, math.ceil(quota)))
+    return {"cpus": cpus, "affinity": affinity, "cgroupQuota": quota}
+
+
+@dataclass
+class ThreadBudget:
+    opencv: int
+    tflite: int
+    mediapipe: int
+    server: int
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+    def as_env(self) -> str:
+        return ",".join(f"{key}={value}" for key, value in self.as_dict().items())
+
+
+def auto_budget(cpus: int) -> ThreadBudget:
+    """Repartition par defaut: ~1/2 TFLite, ~1/4 OpenCV, le reste reserve aux graphes MediaPipe."""
+    cpus = max(1, cpus)
+    tflite = max(1, cpus // 2)
+    opencv = max(1, cpus // 4)
+    mediapipe = max(1, cpus - tflite - opencv)
+    return ThreadBudget(opencv=opencv, tflite=tflite, mediapipe=mediapipe, server=max(4, 2 * cpus))
+
+
+def parse_budget(spec: str, cpus: int) -> ThreadBudget:
+    """`auto` ou `opencv=1,tflite=2,mediapipe=1,server=8` (cles absentes: valeur auto)."""
+    budget = auto_budget(cpus)
+    spec = (spec or "auto").strip().lower()
+    if spec == "auto":
+        return budget
+    values = budget.as_dict()
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        key, _, raw = part.partition("=")
+        key = key.strip()
+        if key not in values:
+            raise ValueError(f"THREAD_BUDGET: cle inconnue '{key}' (attendu: {', '.join(values)})")
+        values[key] = max(1, int(raw))
+    return ThreadBudget(**values)
+
+
+def resolve_thread_budget(spec: str, workers: Optional[int] = None) -> ThreadBudget:
+    workers = workers if workers is not None else max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+    cpus = max(1, available_cpus()["cpus"] // max(1, workers))
+    return parse_budget(spec, cpus)
+
+
+def apply_process_threads(budget: ThreadBudget) -> None:
+    """Applique la partie OpenCV du budget (les autres sont passees a la construction des modeles)."""
+    import cv2
+
+    cv2.setNumThreads(budget.opencv)
+
+
+def apply_server_threads(budget: ThreadBudget) -> bool:
+    """Dimensionne le pool de threads anyio utilise par Starlette pour les handlers sync."""
+    try:
+        import anyio.to_thread
+
+        anyio.to_thread.current_default_thread_limiter().total_tokens = budget.server
+        return True
+    except Exception:
+        return False
+
+
+def limit_mediapipe_threads(num_threads: int) -> bool:
+    """
+    Fixe la taille de l'executeur par defaut des graphes MediaPipe (solutions legacy)
+    crees ensuite. L'API Python n'expose pas ce reglage: on complete la configuration
+    canonique du graphe avant sa construction.
+    Renvoie False (sans rien modifier) si MediaPipe ou le point d'accroche manque.
+    """
+    global _mediapipe_threads
+    try:
+        from mediapipe.framework import thread_pool_executor_pb2
+        from mediapipe.python import solution_base
+    except ImportError:
+        return False
+    original = getattr(solution_base.SolutionBase, "_initialize_graph_interface", None)
+    if original is None:
+        # Methode privee: absente ou renommee selon la version de MediaPipe
+        print("[Threads] MediaPipe: SolutionBase._initialize_graph_interface introuvable, budget de threads non applique")
+        return False
+    already_patched = _mediapipe_threads is not None
+    _mediapipe_threads = max(1, num_threads)
+    if already_patched:
+        return True
+
+    def _with_thread_budget(self: Any, *args: Any, **kwargs: Any) -> Any:
+        config = original(self, *args, **kwargs)
+        default = next((e for e in config.executor if not e.name), None) or config.executor.add()
+        default.type = "ThreadPoolExecutor"
+        default.options.Extensions[thread_pool_executor_pb2.ThreadPoolExecutorOptions.ext].num_threads = (
+            _mediapipe_threads
+        )
+        return config
+
+    solution_base.SolutionBase._initialize_graph_interface = _with_thread_budget
+    return True
+
+
+def describe(budget: ThreadBudget) -> Dict[str, Any]:
+    return {**available_cpus(), "workers": max(1, int(os.getenv("WEB_CONCURRENCY", "1"))), **budget.as_dict()}
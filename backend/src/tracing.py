@@ -0,0 +1,237 @@
+"""
+Traces par requete (echantillonnees) pour expliquer les frames lentes une par une.
+
+Chaque requete tracee recoit un identifiant et une liste de spans (receive, decode,
+queue, hands, classifier, pose, face, serialize), en millisecondes relatives au debut
+de la trace. Une trace terminee est poussee telle quelle dans un anneau en memoire
+(`deque` borne, append sans verrou): le chemin critique ne fait ni I/O ni JSON.
+Un thread de fond vide l'anneau par lots et ecrit des fichiers JSONL tournants
+`traces-<date>-<pid>-NNNNN.jsonl`; si l'anneau deborde, les traces les plus anciennes
+sont perdues (`traces_dropped_total`). TRACE_MAX_FILES vaut pour tout TRACE_DIR: la
+rotation supprime les fichiers les plus anciens, quel que soit le worker qui les a ecrits.
+
+Dans les jobs d'inference (threadpool), la trace de la frame est rendue courante via
+`activate()`: le code des services ajoute ses spans avec `record_span()` sans la recevoir
+en parametre.
+
+Analyse hors ligne: `python -m backend.tools.trace_report backend/traces`.
+"""
+
+from __future__ import annotations
+
+import collections
+import contextvars
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from .metrics import METRICS
+
+SPAN_NAMES = ("receive", "decode", "queue", "hands", "classifier", "pose", "face", "serialize")
+
+Span = Tuple[str, float, float]
+
+
+class Trace:
+    __slots__ = ("tracer", "trace_id", "endpoint", "session_id", "sampled", "ts", "origin", "spans", "attrs")
+
+    def __init__(self, tracer: Optional["Tracer"], endpoint: str, session_id: str, sampled: bool) -> None:
+        self.tracer = tracer
+        self.trace_id = os.urandom(8).hex() if sampled else ""
+        self.endpoint = endpoint
+        self.session_id = session_id
+        self.sampled = sampled
+        self.ts = time.time()
+        self.origin = time.perf_counter()
+        self.spans: List[Span] = []
+        self.attrs: Dict[str, Any] = {}
+
+    def add(self, name: str, started: float, ended: Optional[float] = None) -> None:
+        """Ajoute un span a partir d'horodatages `time.perf_counter()`."""
+        if not self.sampled:
+            return
+        ended = time.perf_counter() if ended is None else ended
+        self.spans.append((name, started, ended))
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, started)
+
+    def finish(self, **attrs: Any) -> None:
+        if not self.sampled or self.tracer is None:
+            return
+        self.attrs.update(attrs)
+        self.tracer.submit(self)
+        # Une trace n'est soumise qu'une fois
+        self.sampled = False
+
+    def to_record(self) -> Dict[str, Any]:
+        spans = sorted(self.spans, key=lambda span: span[1])
+        end = max((span[2] for span in spans), default=self.origin)
+        return {
+            "traceId": self.trace_id,
+            "endpoint": self.endpoint,
+            "session": self.session_id,
+            "ts": round(self.ts, 6),
+            "durationMs": round((end - self.origin) * 1000.0, 3),
+            "spans": [
+                {
+                    "name": name,
+                    "startMs": round((started - self.origin) * 1000.0, 3),
+                    "durationMs": round((ended - started) * 1000.0, 3),
+                }
+                for name, started, ended in spans
+            ],
+            "attrs": self.attrs,
+        }
+
+
+NOOP_TRACE = Trace(None, "", "", sampled=False)
+_CURRENT: contextvars.ContextVar[Trace] = contextvars.ContextVar("current_trace", default=NOOP_TRACE)
+
+
+@contextmanager
+def activate(trace: Trace) -> Iterator[Trace]:
+    """Rend `trace` courante pour le thread (job d'inference) le temps du bloc."""
+    token = _CURRENT.set(trace)
+    try:
+        yield trace
+    finally:
+        _CURRENT.reset(token)
+
+
+def record_span(name: str, started: float) -> None:
+    """Ajoute un span a la trace courante (sans effet si la requete n'est pas tracee)."""
+    trace = _CURRENT.get()
+    if trace.sampled:
+        trace.add(name, started)
+
+
+class Tracer:
+    def __init__(
+        self,
+        directory: str,
+        sample_rate: float = 0.0,
+        ring_size: int = 4096,
+        file_bytes: int = 16 * 1024 * 1024,
+        max_files: int = 10,
+        flush_interval_s: float = 1.0,
+    ) -> None:
+        self.directory = Path(directory)
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+        self.ring: Deque[Trace] = collections.deque(maxlen=max(16, ring_size))
+        self.file_bytes = max(64 * 1024, file_bytes)
+        self.max_files = max(1, max_files)
+        self.flush_interval_s = max(0.05, flush_interval_s)
+        self.written = 0
+        self.dropped = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._file = None
+        self._file_size = 0
+        self._file_no = 0
+        METRICS.describe("traces_written_total", "Traces de requete ecrites en JSONL")
+        METRICS.describe("traces_dropped_total", "Traces perdues (anneau plein avant ecriture)")
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0
+
+    def start_trace(self, endpoint: str, session_id: str) -> Trace:
+        if not self.enabled or self._thread is None or random.random() >= self.sample_rate:
+            return NOOP_TRACE
+        return Trace(self, endpoint, session_id, sampled=True)
+
+    def submit(self, trace: Trace) -> None:
+        if len(self.ring) == self.ring.maxlen:
+            # deque(maxlen) evince la plus ancienne
+            self.dropped += 1
+            METRICS.inc("traces_dropped_total")
+        self.ring.append(trace)
+
+    def start(self) -> None:
+        """Demarre le thread d'ecriture (apres fork: un thread et des fichiers par worker)."""
+        if not self.enabled or self._thread is not None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="trace-writer", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=5.0)
+        self._thread = None
+
+    def _run(self) -> None:
+        prefix = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        try:
+            while not self._stop.wait(self.flush_interval_s):
+                self._flush(prefix)
+            self._flush(prefix)
+        finally:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _flush(self, prefix: str) -> None:
+        lines: List[str] = []
+        while True:
+            try:
+                trace = self.ring.popleft()
+            except IndexError:
+                break
+            lines.append(json.dumps(trace.to_record(), separators=(",", ":"), default=str))
+        if not lines:
+            return
+        data = ("\n".join(lines) + "\n").encode("utf-8")
+        if self._file is None or self._file_size + len(data) > self.file_bytes:
+            self._rotate(prefix)
+        self._file.write(data)
+        self._file.flush()
+        self._file_size += len(data)
+        self.written += len(lines)
+        METRICS.inc("traces_written_total", len(lines))
+
+    def _rotate(self, prefix: str) -> None:
+        if self._file is not None:
+            self._file.close()
+        self._file_no += 1
+        self._file = open(self.directory / f"traces-{prefix}-{self._file_no:05d}.jsonl", "wb")
+        self._file_size = 0
+        self._prune(Path(self._file.name))
+
+    def _prune(self, current: Path) -> None:
+        """Garde max_files fichiers dans le dossier (tous processus confondus), plus anciens supprimes d'abord."""
+        files: List[Tuple[float, str, Path]] = []
+        for path in self.directory.glob("traces-*.jsonl"):
+            if path == current:
+                continue
+            try:
+                files.append((path.stat().st_mtime, path.name, path))
+            except FileNotFoundError:
+                # Supprime entre-temps par un autre worker
+                continue
+        files.sort()
+        for _, _, old in files[: max(0, len(files) + 1 - self.max_files)]:
+            old.unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sampleRate": self.sample_rate,
+            "directory": str(self.directory),
+            "buffered": len(self.ring),
+            "written": self.written,
+            "dropped": self.dropped,
+        }
@@ -2,43 +2,137 @@
 
 from __future__ import annotations
 
+import asyncio
+import hmac
+import math
 import os
 import shutil
 import threading
 import time
+import traceback
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+# Debut de l'import de l'app (phase `import` du rapport d'empreinte)
+_IMPORT_STARTED = time.perf_counter()
 
 import cv2
-import mediapipe as mp
 import numpy as np
-from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+from fastapi import APIRouter, File, Form, HTTPException, Query, Request, UploadFile
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
 
-from .hand_roi import HandROIExtractor
+from .deploy_profiles import FootprintReport, import_pipeline_modules, resolve_profile
+from .frame_body import BufferPool, FrameBody, read_frame_body
+from .frame_filter import FrameChangeDetector
 from .labels import get_label, load_labels
-from .tflite_infer import TFLiteModel
+from .landmark_delta import POINTS_ENCODINGS, LandmarkDeltaEncoder
+from .mailbox import FrameMailbox
+from .mask_codec import MASK_FORMATS, encode_mask, parse_mask_grid, payload_size
+from .memwatch import MemoryWatch, read_rss_bytes
+from .metrics import METRICS
+from .preload import load_model_buffer, preloaded_bytes
+from .profiler import ProfilerBusy, SamplingProfiler
+from .quality_tiers import QualityController, QualityTier, build_tiers
+from .raw_frames import ENCODED_FORMAT, raw_to_rgb, validate_raw_frame, wrap_raw_frame
+from .recorder import SessionRecorder
+from .roi_quality import RoiQualityGate
+from .scheduler import AdmissionRejected, FairScheduler, retry_after_header
+from .sessions import SessionStore, peer_from_request, session_id_from_request
+from .thread_budget import (
+    apply_process_threads,
+    apply_server_threads,
+    describe as describe_threads,
+    limit_mediapipe_threads,
+    resolve_thread_budget,
+)
+from .text_decoder import StreamingTextDecoder, load_lexicon
+from .tracing import NOOP_TRACE, Trace, Tracer, activate, record_span
 from .utils import FPSCounter, PredictionSmoother
 
-try:
-    import kagglehub
-except Exception:
-    kagglehub = None
+if TYPE_CHECKING:
+    # Modules du pipeline ASL: importes seulement si le profil le contient (deploy_profiles.py)
+    from .hand_roi import HandROIExtractor
+    from .inference_backends import BackendChoice
+    from .tflite_infer import TFLiteModel
 
 class AppConfig:
     def __init__(self) -> None:
+        self.deploy_profile = os.getenv("DEPLOY_PROFILE", "all")
         self.asl_model_path = os.getenv("ASL_MODEL_PATH", "backend/assets/model.tflite")
         self.asl_labels_path = os.getenv("ASL_LABELS_PATH", "backend/assets/labels.txt")
+        self.asl_backend = os.getenv("ASL_BACKEND", "tflite-xnnpack").strip().lower()
+        self.asl_onnx_model_path = os.getenv("ASL_ONNX_MODEL_PATH", str(Path(self.asl_model_path).with_suffix(".onnx")))
+        self.asl_backend_benchmark_runs = int(os.getenv("ASL_BACKEND_BENCHMARK_RUNS", "20"))
+        self.asl_backend_tolerance = float(os.getenv("ASL_BACKEND_TOLERANCE", "0.02"))
         self.asl_smoothing = int(os.getenv("ASL_SMOOTHING_WINDOW", "5"))
         self.asl_padding = float(os.getenv("ASL_PADDING", "0.2"))
+        self.asl_roi_mode = os.getenv("ASL_ROI_MODE", "bbox").strip().lower()
         self.asl_min_confidence = float(os.getenv("ASL_MIN_CONFIDENCE", "0.7"))
+        self.asl_quality_gate = os.getenv("ASL_QUALITY_GATE", "true").strip().lower() == "true"
+        self.asl_roi_min_size = int(os.getenv("ASL_ROI_MIN_SIZE", "32"))
+        self.asl_roi_max_clipped = float(os.getenv("ASL_ROI_MAX_CLIPPED", "0.35"))
+        self.asl_roi_min_visible = float(os.getenv("ASL_ROI_MIN_VISIBLE", "0.8"))
+        self.asl_roi_min_sharpness = float(os.getenv("ASL_ROI_MIN_SHARPNESS", "15"))
+        self.asl_max_hands = int(os.getenv("ASL_MAX_HANDS", "1"))
+        self.asl_text_beam = int(os.getenv("ASL_TEXT_BEAM", "8"))
+        self.asl_text_min_blank_frames = int(os.getenv("ASL_TEXT_MIN_BLANK_FRAMES", "3"))
+        self.asl_lexicon_path = os.getenv("ASL_LEXICON_PATH", "")
+        self.asl_lexicon_weight = float(os.getenv("ASL_LEXICON_WEIGHT", "2.0"))
         self.api_frame_max_size = int(os.getenv("API_FRAME_MAX_SIZE", str(900 * 1024)))
+        self.record_sessions = os.getenv("RECORD_SESSIONS", "false").strip().lower() == "true"
+        self.record_dir = os.getenv("RECORD_DIR", "backend/recordings")
+        self.record_segment_mb = int(os.getenv("RECORD_SEGMENT_MB", "64"))
+        self.record_max_segments = int(os.getenv("RECORD_MAX_SEGMENTS", "20"))
+        self.api_raw_frame_max_pixels = int(os.getenv("API_RAW_FRAME_MAX_PIXELS", str(640 * 480)))
         self.segmentation_face_stride = int(os.getenv("SEGMENTATION_FACE_STRIDE", "6"))
+        self.segmentation_adaptive = os.getenv("SEGMENTATION_ADAPTIVE", "true").strip().lower() == "true"
+        self.segmentation_tier = os.getenv("SEGMENTATION_TIER", "balanced").strip().lower()
+        self.segmentation_best_tier = os.getenv("SEGMENTATION_BEST_TIER", "high").strip().lower()
+        self.segmentation_target_ms = float(os.getenv("SEGMENTATION_TARGET_MS", "60"))
+        self.segmentation_queue_high = int(os.getenv("SEGMENTATION_QUEUE_HIGH", "4"))
+        self.landmark_delta_keyframe = int(os.getenv("LANDMARK_DELTA_KEYFRAME", "30"))
+        self.landmark_delta_min_motion = float(os.getenv("LANDMARK_DELTA_MIN_MOTION", "0.002"))
+        self.frame_change_threshold = float(os.getenv("FRAME_CHANGE_THRESHOLD", "2.0"))
+        self.frame_mailbox = os.getenv("FRAME_MAILBOX", "true").strip().lower() == "true"
+        self.mailbox_superseded = os.getenv("MAILBOX_SUPERSEDED", "latest").strip().lower()
+        self.inference_concurrency = int(os.getenv("INFERENCE_CONCURRENCY", "2"))
+        self.session_max_fps = float(os.getenv("SESSION_MAX_FPS", "15"))
+        self.session_burst = int(os.getenv("SESSION_BURST", "5"))
+        self.peer_max_sessions = int(os.getenv("PEER_MAX_SESSIONS", "4"))
+        self.scheduler_max_queue = int(os.getenv("SCHEDULER_MAX_QUEUE", "64"))
+        self.thread_budget = os.getenv("THREAD_BUDGET", "auto")
+        self.trace_sample_rate = float(os.getenv("TRACE_SAMPLE_RATE", "0"))
+        self.trace_ring_size = int(os.getenv("TRACE_RING_SIZE", "4096"))
+        self.trace_dir = os.getenv("TRACE_DIR", "backend/traces")
+        self.trace_file_mb = int(os.getenv("TRACE_FILE_MB", "16"))
+        self.trace_max_files = int(os.getenv("TRACE_MAX_FILES", "10"))
+        self.admin_token = os.getenv("ADMIN_TOKEN", "")
+        self.memwatch_enabled = os.getenv("MEMWATCH_ENABLED", "false").strip().lower() == "true"
+        self.memwatch_interval_s = float(os.getenv("MEMWATCH_INTERVAL_S", "60"))
+        self.memwatch_modules = [
+            name.strip() for name in os.getenv("MEMWATCH_MODULES", "web_api,hand_roi,tflite_infer").split(",") if name.strip()
+        ]
+        self.profiler_enabled = os.getenv("PROFILER_ENABLED", "false").strip().lower() == "true"
+        self.profiler_interval_ms = float(os.getenv("PROFILER_INTERVAL_MS", "10"))
+        self.profiler_max_seconds = float(os.getenv("PROFILER_MAX_SECONDS", "30"))
+        self.profiler_max_overhead = float(os.getenv("PROFILER_MAX_OVERHEAD", "0.02"))
+        self.mediapipe_engine = os.getenv("MEDIAPIPE_ENGINE", "legacy").strip().lower()
+        self.mediapipe_tasks_mode = os.getenv("MEDIAPIPE_TASKS_MODE", "video").strip().lower()
+        self.mediapipe_tasks_dir = os.getenv("MEDIAPIPE_TASKS_DIR", "backend/assets/mediapipe")
 
 
 CFG = AppConfig()
+THREADS = resolve_thread_budget(CFG.thread_budget)
+PROFILE, PIPELINES = resolve_profile(CFG.deploy_profile)
+FOOTPRINT = FootprintReport(PROFILE, PIPELINES)
+import_pipeline_modules(PIPELINES)
 
 
-def _decode_image_bytes(raw: bytes, max_size: int) -> np.ndarray:
+def _decode_image_bytes(raw: Union[bytes, memoryview], max_size: int) -> np.ndarray:
     if len(raw) > max_size:
         raise HTTPException(status_code=413, detail=f"Frame too large ({len(raw)} bytes)")
     arr = np.frombuffer(raw, np.uint8)
@@ -48,12 +142,63 @@ def _decode_image_bytes(raw: bytes, max_size: int) -> np.ndarray:
     return frame
 
 
+def _resolve_mediapipe_engine(cfg: AppConfig, kinds: Tuple[str, ...]) -> Tuple[str, str]:
+    """Moteur effectif (legacy/tasks) + message; repli sur legacy si des modeles .task manquent."""
+    if cfg.mediapipe_engine != "tasks":
+        return "legacy", ""
+    from .mp_tasks import missing_task_models, preload_task_models
+
+    missing = missing_task_models(Path(cfg.mediapipe_tasks_dir), kinds)
+    if missing:
+        urls = ", ".join(f"{name} <{url}>" for name, url in missing.items())
+        return "legacy", f"MediaPipe Tasks models missing in {cfg.mediapipe_tasks_dir}, using legacy engine: {urls}"
+    preload_task_models(Path(cfg.mediapipe_tasks_dir), kinds)
+    return "tasks", ""
+
+
+def _observe_stage(stage: str, engine: str, started: float) -> None:
+    METRICS.observe("mediapipe_stage_ms", (time.perf_counter() - started) * 1000.0, stage=stage, engine=engine)
+    record_span(stage, started)
+
+
+def _parse_mask_options(mask: str, mask_format: str) -> Tuple[Optional[Tuple[int, int]], str]:
+    try:
+        mask_grid = parse_mask_grid(mask)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    mask_format = mask_format.lower()
+    if mask_format not in MASK_FORMATS:
+        raise HTTPException(status_code=400, detail=f"maskFormat invalide (choix: {', '.join(MASK_FORMATS)})")
+    return mask_grid, mask_format
+
+
+def _parse_points_encoding(points: str) -> str:
+    points = points.lower()
+    if points not in POINTS_ENCODINGS:
+        raise HTTPException(status_code=400, detail=f"points invalide (choix: {', '.join(POINTS_ENCODINGS)})")
+    return points
+
+
 def _norm_point(x: float, y: float, width: int, height: int) -> Dict[str, float]:
     if width <= 0 or height <= 0:
         return {"x": 0.0, "y": 0.0}
     return {"x": float(max(0.0, min(1.0, x / width))), "y": float(max(0.0, min(1.0, y / height)))}
 
 
+def _hand_landmarks_json(landmarks: Any) -> List[Dict[str, float]]:
+    """Landmarks de main MediaPipe -> [{x, y}] normalises (reponse ASL)."""
+    return [{"x": float(p.x), "y": float(p.y)} for p in landmarks.landmark]
+
+
+def _points_json(landmarks: Any, width: int, height: int, stride: int = 1) -> List[Dict[str, float]]:
+    """Landmarks Pose/FaceMesh -> [{x, y}] bornes a [0, 1], un point sur `stride`."""
+    return [
+        _norm_point(lm.x * width, lm.y * height, width, height)
+        for idx, lm in enumerate(landmarks.landmark)
+        if idx % stride == 0
+    ]
+
+
 def _ensure_parent(path: Path) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
 
@@ -61,10 +206,13 @@ def _ensure_parent(path: Path) -> None:
 def _try_download_asl_model(model_path: Path) -> tuple[bool, str]:
     if model_path.exists():
         return True, "model_exists"
-    if kagglehub is None:
-        return False, "kagglehub_not_available"
     if not (os.getenv("KAGGLE_USERNAME") and os.getenv("KAGGLE_KEY")):
         return False, "kaggle_credentials_missing"
+    # Importe seulement s'il faut vraiment telecharger (~200 ms et plusieurs Mo sinon perdus)
+    try:
+        import kagglehub
+    except Exception:
+        return False, "kagglehub_not_available"
     try:
         _ensure_parent(model_path)
         model_dir = Path(kagglehub.model_download("sayannath235/american-sign-language/tfLite/american-sign-language"))
@@ -77,16 +225,95 @@ def _try_download_asl_model(model_path: Path) -> tuple[bool, str]:
         return False, f"download_error:{exc}"
 
 
+@dataclass
+class _HandTrack:
+    track_id: int
+    wrist: Tuple[float, float]
+    smoother: PredictionSmoother
+
+
+@dataclass
+class _HandTracks:
+    """Mains suivies d'une session: un lisseur par main, associe d'une frame a l'autre par le poignet."""
+
+    tracks: List[_HandTrack] = field(default_factory=list)
+    next_id: int = 0
+
+
+# Distance max du poignet (coordonnees normalisees) entre deux frames pour rester la meme main
+HAND_MATCH_DISTANCE = 0.2
+
+
+def _match_hands(
+    state: _HandTracks, wrists: List[Tuple[float, float]], window: int
+) -> List[_HandTrack]:
+    """
+    Associe chaque main a la piste la plus proche (glouton, paires triees par distance);
+    les mains sans piste en ouvrent une, les pistes sans main sont abandonnees.
+    """
+    pairs = sorted(
+        (math.dist(wrist, track.wrist), hand_idx, track_idx)
+        for hand_idx, wrist in enumerate(wrists)
+        for track_idx, track in enumerate(state.tracks)
+    )
+    matched: Dict[int, _HandTrack] = {}
+    used: Set[int] = set()
+    for distance, hand_idx, track_idx in pairs:
+        if distance > HAND_MATCH_DISTANCE:
+            break
+        if hand_idx in matched or track_idx in used:
+            continue
+        matched[hand_idx] = state.tracks[track_idx]
+        used.add(track_idx)
+    result: List[_HandTrack] = []
+    for hand_idx, wrist in enumerate(wrists):
+        track = matched.get(hand_idx)
+        if track is None:
+            track = _HandTrack(state.next_id, wrist, PredictionSmoother(window_size=window))
+            state.next_id += 1
+        track.wrist = wrist
+        result.append(track)
+    state.tracks = result
+    return result
+
+
 class ASLService:
-    def __init__(self, cfg: AppConfig) -> None:
+    def __init__(self, cfg: AppConfig, num_threads: Optional[int] = None) -> None:
         self.lock = threading.Lock()
         self.model_path = Path(cfg.asl_model_path)
         self.labels = load_labels(cfg.asl_labels_path if Path(cfg.asl_labels_path).exists() else None)
-        self.roi_extractor = HandROIExtractor(padding_ratio=cfg.asl_padding)
-        self.smoother = PredictionSmoother(window_size=cfg.asl_smoothing)
+        self.padding = cfg.asl_padding
+        self.roi_mode = cfg.asl_roi_mode
+        self.backend_name = cfg.asl_backend
+        self.onnx_path = Path(cfg.asl_onnx_model_path)
+        self.backend_benchmark_runs = cfg.asl_backend_benchmark_runs
+        self.backend_tolerance = cfg.asl_backend_tolerance
+        self.backend_choice: Optional[BackendChoice] = None
+        self.num_threads = num_threads
+        self.tasks_dir = Path(cfg.mediapipe_tasks_dir)
+        self.tasks_mode = cfg.mediapipe_tasks_mode
+        self.engine, self.engine_message = _resolve_mediapipe_engine(cfg, ("hand",))
+        self.roi_extractor: Optional[HandROIExtractor] = None
+        self.max_hands = max(1, min(4, cfg.asl_max_hands))
+        self.smoothing_window = cfg.asl_smoothing
+        self.hand_tracks: SessionStore[_HandTracks] = SessionStore(_HandTracks)
         self.min_confidence = max(0.0, min(1.0, cfg.asl_min_confidence))
+        self.quality_gate = RoiQualityGate(
+            enabled=cfg.asl_quality_gate,
+            min_size=cfg.asl_roi_min_size,
+            max_clipped=cfg.asl_roi_max_clipped,
+            min_visible=cfg.asl_roi_min_visible,
+            min_sharpness=cfg.asl_roi_min_sharpness,
+            padding_ratio=cfg.asl_padding,
+        )
         self.fps_counter = FPSCounter()
+        self.text_beam = cfg.asl_text_beam
+        self.text_min_blank_frames = cfg.asl_text_min_blank_frames
+        self.lexicon = load_lexicon(cfg.asl_lexicon_path)
+        self.lexicon_weight = cfg.asl_lexicon_weight
+        self.text_decoders: SessionStore[StreamingTextDecoder] = SessionStore(self._new_text_decoder)
         self.model: Optional[TFLiteModel] = None
+        self.model_buffer: Optional[bytes] = None
         self.model_status = "initializing"
         self.model_message = ""
         self.current_label = "No hand"
@@ -94,9 +321,10 @@ class ASLService:
         self.last_emit_ts = 0.0
         self.letters_count_current_second = 0
         self.letters_per_second = 0
-        self._load_model()
+        self._preload_model()
 
-    def _load_model(self) -> None:
+    def _preload_model(self) -> None:
+        """Telechargement eventuel + lecture des poids: sur a executer avant fork."""
         ok, reason = _try_download_asl_model(self.model_path)
         if not ok and not self.model_path.exists():
             self.model_status = "model_missing"
@@ -106,15 +334,72 @@ class ASLService:
             )
             return
         try:
-            self.model = TFLiteModel(str(self.model_path))
+            self.model_buffer = load_model_buffer(self.model_path)
+        except Exception as exc:
+            self.model_status = "error"
+            self.model_message = f"ASL model load error: {exc}"
+
+    def _new_text_decoder(self) -> StreamingTextDecoder:
+        return StreamingTextDecoder(
+            self.labels,
+            beam_width=self.text_beam,
+            lexicon=self.lexicon,
+            lexicon_weight=self.lexicon_weight,
+            min_blank_frames=self.text_min_blank_frames,
+        )
+
+    def start(self) -> None:
+        """Construit MediaPipe Hands et l'interpreteur TFLite (apres fork, une fois par worker)."""
+        with self.lock:
+            self._start_locked()
+
+    def _start_locked(self) -> None:
+        if self.roi_extractor is not None:
+            return
+        from .hand_roi import HandROIExtractor
+        from .inference_backends import select_backend
+        from .tflite_infer import TFLiteModel
+
+        hands = None
+        if self.engine == "tasks":
+            from .mp_tasks import create_detector
+
+            hands = create_detector(
+                "hand",
+                self.tasks_dir,
+                self.tasks_mode,
+                num_hands=self.max_hands,
+                min_hand_detection_confidence=0.5,
+                min_tracking_confidence=0.5,
+            )
+        self.roi_extractor = HandROIExtractor(padding_ratio=self.padding, max_num_hands=self.max_hands, hands=hands)
+        if self.model_buffer is None:
+            return
+        try:
+            self.backend_choice = select_backend(
+                self.backend_name,
+                self.model_buffer,
+                self.onnx_path,
+                runs=self.backend_benchmark_runs,
+                tolerance=self.backend_tolerance,
+                num_threads=self.num_threads,
+            )
+            self.model = TFLiteModel(str(self.model_path), backend=self.backend_choice.backend)
+            if self.roi_mode == "oriented":
+                # ROI redressees et deja a la taille d'entree du modele (un seul warpAffine)
+                self.roi_extractor.oriented_size = self.model.get_input_size()
             self.model_status = "loaded"
             self.model_message = "ASL model loaded"
         except Exception as exc:
             self.model_status = "error"
             self.model_message = f"ASL model load error: {exc}"
 
-    def predict(self, frame: np.ndarray) -> Dict[str, Any]:
+    def predict(
+        self, frame: Optional[np.ndarray], rgb: Optional[np.ndarray] = None, session_id: str = "default"
+    ) -> Dict[str, Any]:
+        """`frame` BGR, ou None si seul `rgb` est fourni (frames brutes, voir raw_frames.py)."""
         with self.lock:
+            self._start_locked()
             if self.model is None:
                 return {
                     "label": "Model unavailable",
@@ -123,32 +408,69 @@ class ASLService:
                     "lettersPerSecond": 0,
                     "handLandmarks": [],
                     "bbox": None,
+                    "hands": [],
                     "modelStatus": self.model_status,
                     "message": self.model_message,
                 }
-            roi, bbox = self.roi_extractor.extract_roi(frame)
-            hand_points: List[Dict[str, float]] = []
-            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = self.roi_extractor.hands.process(rgb)
-            if results.multi_hand_landmarks:
-                hand = results.multi_hand_landmarks[0]
-                hand_points = [{"x": float(p.x), "y": float(p.y)} for p in hand.landmark]
-            if roi is not None and bbox is not None:
-                class_idx, confidence, _ = self.model.predict(roi)
-                self.smoother.add_prediction(class_idx, confidence)
-                smoothed_idx, smoothed_conf = self.smoother.get_smoothed_prediction()
-                if smoothed_idx is not None:
-                    if float(smoothed_conf) >= self.min_confidence:
-                        self.current_label = get_label(smoothed_idx, self.labels)
-                        self.current_confidence = float(smoothed_conf)
-                    else:
-                        self.current_label = "No hand"
-                        self.current_confidence = float(smoothed_conf)
+            is_rgb = frame is None
+            if is_rgb:
+                # Ingest brut: ROI decoupees directement dans le buffer RGB
+                frame = rgb
+            elif rgb is None:
+                rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            started = time.perf_counter()
+            if self.engine == "tasks":
+                hands = self.roi_extractor.extract_rois(frame, rgb, session_id=session_id)
+            else:
+                hands = self.roi_extractor.extract_rois(frame, rgb)
+            _observe_stage("hands", self.engine, started)
+            # Filtre qualite: les ROI inexploitables ne passent pas par le classifieur
+            rejections = [self.quality_gate.check(hand, frame, is_rgb) for hand in hands]
+            accepted = [hand for hand, reason in zip(hands, rejections) if reason is None]
+            # Une seule invocation de l'interpreteur pour toutes les mains retenues
+            rois_rgb = is_rgb or self.roi_extractor.oriented_size is not None
+            started = time.perf_counter()
+            batch = iter(self.model.predict_batch([hand["roi"] for hand in accepted], is_rgb=rois_rgb))
+            if accepted:
+                record_span("classifier", started)
+            predictions = [None if reason else next(batch) for reason in rejections]
+            # Un lisseur par main suivie (par session, associee par le poignet et non par le rang
+            # MediaPipe, instable); une ROI rejetee garde sa piste et son lissage (flou passager)
+            wrists = [(hand["landmarks"].landmark[0].x, hand["landmarks"].landmark[0].y) for hand in hands]
+            tracks = _match_hands(self.hand_tracks.get(session_id), wrists, self.smoothing_window)
+            # Main principale = piste la plus ancienne: stable pour la reponse et le texte
+            ordered = sorted(zip(tracks, hands, rejections, predictions), key=lambda item: item[0].track_id)
+            predictions = [prediction for _, _, _, prediction in ordered]
+            hand_results: List[Dict[str, Any]] = []
+            for track, hand, reason, prediction in ordered:
+                if prediction is None:
+                    label, smoothed_conf = "No hand", 0.0
                 else:
-                    self.current_label = "No hand"
-                    self.current_confidence = 0.0
+                    label, smoothed_conf = self._smoothed_label(track.smoother, prediction[0], prediction[1])
+                hand_results.append(
+                    {
+                        "label": label,
+                        "confidence": round(smoothed_conf, 4),
+                        "handedness": hand["handedness"],
+                        "handednessScore": round(hand["handedness_score"], 4),
+                        "bbox": hand["bbox"],
+                        "landmarks": _hand_landmarks_json(hand["landmarks"]),
+                        "rejected": reason,
+                        "trackId": track.track_id,
+                    }
+                )
+            # Texte: vecteur de scores complet de la main principale, blanc si aucune main.
+            # ROI principale rejetee (flou passager): frame sautee, comme pour le lissage
+            decoder = self.text_decoders.get(session_id)
+            if not predictions:
+                decoder.step(None)
+            elif predictions[0] is not None:
+                decoder.step(predictions[0][2])
+            primary = hand_results[0] if hand_results else None
+            if primary is not None:
+                self.current_label = primary["label"]
+                self.current_confidence = float(primary["confidence"])
             else:
-                self.smoother.reset()
                 self.current_label = "No hand"
                 self.current_confidence = 0.0
             now = time.time()
@@ -164,24 +486,102 @@ class ASLService:
                 "confidence": round(self.current_confidence, 4),
                 "fps": round(fps, 1),
                 "lettersPerSecond": self.letters_per_second,
-                "handLandmarks": hand_points,
-                "bbox": bbox if bbox is not None else None,
+                "handLandmarks": primary["landmarks"] if primary else [],
+                "bbox": primary["bbox"] if primary else None,
+                "hands": hand_results,
+                "rejected": primary["rejected"] if primary else None,
+                "text": decoder.state(),
                 "modelStatus": self.model_status,
                 "message": self.model_message,
             }
 
+    def empty_result(self, session_id: str) -> Dict[str, Any]:
+        """Reponse sans main au schema de `predict` (frame non traitee), texte de la session inchange."""
+        decoder = self.text_decoders.peek(session_id)
+        return {
+            "label": "No hand",
+            "confidence": 0.0,
+            "fps": 0.0,
+            "lettersPerSecond": self.letters_per_second,
+            "handLandmarks": [],
+            "bbox": None,
+            "hands": [],
+            "rejected": None,
+            "text": decoder.state() if decoder is not None else {"committed": "", "hypothesis": ""},
+            "modelStatus": self.model_status,
+            "message": self.model_message,
+        }
+
+    def _smoothed_label(self, smoother: PredictionSmoother, class_idx: int, confidence: float) -> Tuple[str, float]:
+        smoother.add_prediction(class_idx, confidence)
+        smoothed_idx, smoothed_conf = smoother.get_smoothed_prediction()
+        if smoothed_idx is None:
+            return "No hand", 0.0
+        if float(smoothed_conf) >= self.min_confidence:
+            return get_label(smoothed_idx, self.labels), float(smoothed_conf)
+        return "No hand", float(smoothed_conf)
+
     def close(self) -> None:
         with self.lock:
-            self.roi_extractor.release()
+            if self.roi_extractor is not None:
+                self.roi_extractor.release()
+                self.roi_extractor = None
+
+
+@dataclass
+class _FaceSchedule:
+    count: int = 0
+    face_points: List[Dict[str, float]] = field(default_factory=list)
 
 
 class SegmentationService:
-    def __init__(self, face_stride: int) -> None:
+    def __init__(
+        self,
+        face_stride: int,
+        engine: str = "legacy",
+        engine_message: str = "",
+        tasks_dir: str = "backend/assets/mediapipe",
+        tasks_mode: str = "video",
+        quality: Optional[QualityController] = None,
+    ) -> None:
         self.lock = threading.Lock()
-        self.model_status = "loaded"
-        self.model_message = "MediaPipe Pose + FaceMesh loaded"
+        self.model_status = "initializing"
+        self.model_message = ""
         self.face_stride = max(2, min(10, face_stride))
+        # Sans controleur: palier fixe "balanced" (Pose complexite 0, FaceMesh a chaque frame)
+        self.quality = quality or QualityController(build_tiers(self.face_stride), enabled=False)
+        self.face_frames: SessionStore[_FaceSchedule] = SessionStore(_FaceSchedule)
+        self.engine = engine
+        self.engine_message = engine_message
+        self.tasks_dir = Path(tasks_dir)
+        self.tasks_mode = tasks_mode
+        import mediapipe as mp
+
         self.mp_pose = mp.solutions.pose
+        self.mp_face = mp.solutions.face_mesh
+        self.pose: Any = None
+        # Pose model_complexity=1 (palier "high", moteur legacy), creee au premier besoin
+        self.pose_full: Any = None
+        self.face: Any = None
+        # Instance Pose avec segmentation, creee seulement au premier masque demande
+        self.pose_mask: Any = None
+
+    def start(self) -> None:
+        """Cree les graphes MediaPipe (apres fork: ils demarrent leurs propres threads)."""
+        with self.lock:
+            self._start_locked()
+
+    def _start_locked(self) -> None:
+        if self.pose is not None:
+            return
+        if self.engine == "tasks":
+            self.pose = self._tasks_pose(segmentation=False)
+            self.face = self._tasks_detector(
+                "face", num_faces=1, min_face_detection_confidence=0.5, min_tracking_confidence=0.5
+            )
+            self.model_status = "loaded"
+            self.model_message = f"MediaPipe Tasks Pose + Face landmarkers loaded ({self.tasks_mode})"
+            return
         self.pose = self.mp_pose.Pose(
             static_image_mode=False,
             model_complexity=0,
@@ -189,7 +589,6 @@ class SegmentationService:
             min_detection_confidence=0.5,
             min_tracking_confidence=0.5,
         )
-        self.mp_face = mp.solutions.face_mesh
         self.face = self.mp_face.FaceMesh(
             static_image_mode=False,
             max_num_faces=1,
@@ -197,82 +596,842 @@ class SegmentationService:
             min_detection_confidence=0.5,
             min_tracking_confidence=0.5,
         )
+        self.model_status = "loaded"
+        self.model_message = "MediaPipe Pose + FaceMesh loaded"
+
+    def _tasks_detector(self, kind: str, **options: Any) -> Any:
+        from .mp_tasks import create_detector
+
+        return create_detector(kind, self.tasks_dir, self.tasks_mode, **options)
+
+    def _tasks_pose(self, segmentation: bool) -> Any:
+        return self._tasks_detector(
+            "pose",
+            num_poses=1,
+            min_pose_detection_confidence=0.5,
+            min_tracking_confidence=0.5,
+            output_segmentation_masks=segmentation,
+        )
+
+    def _pose_locked(self, tier: QualityTier) -> Any:
+        if tier.pose_complexity == 0 or self.engine == "tasks":
+            # Tasks: un seul modele (lite), seul FaceMesh suit le palier
+            return self.pose
+        if self.pose_full is None:
+            self.pose_full = self.mp_pose.Pose(
+                static_image_mode=False,
+                model_complexity=1,
+                smooth_landmarks=True,
+                min_detection_confidence=0.5,
+                min_tracking_confidence=0.5,
+            )
+        return self.pose_full
 
-    def predict(self, frame: np.ndarray, with_face: bool = True) -> Dict[str, Any]:
-        h, w = frame.shape[:2]
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    def _mask_pose_locked(self) -> Any:
+        if self.pose_mask is None and self.engine == "tasks":
+            self.pose_mask = self._tasks_pose(segmentation=True)
+        elif self.pose_mask is None:
+            self.pose_mask = self.mp_pose.Pose(
+                static_image_mode=False,
+                model_complexity=0,
+                smooth_landmarks=True,
+                enable_segmentation=True,
+                smooth_segmentation=True,
+                min_detection_confidence=0.5,
+                min_tracking_confidence=0.5,
+            )
+        return self.pose_mask
+
+    def predict(
+        self,
+        frame: Optional[np.ndarray],
+        with_face: bool = True,
+        mask_grid: Optional[Tuple[int, int]] = None,
+        mask_format: str = "rle",
+        rgb: Optional[np.ndarray] = None,
+        session_id: str = "default",
+    ) -> Dict[str, Any]:
+        if rgb is None:
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        h, w = rgb.shape[:2]
+        mask: Optional[Dict[str, Any]] = None
+        tier = self.quality.tier
+        schedule = self.face_frames.get(session_id)
+        wants_face = with_face
+        if with_face:
+            # FaceMesh une frame sur face_every: entre deux passages, points precedents de la session
+            schedule.count += 1
+            with_face = tier.face_every > 0 and (schedule.count - 1) % tier.face_every == 0
         with self.lock:
-            pose_res = self.pose.process(rgb)
-            face_res = self.face.process(rgb) if with_face else None
+            self._start_locked()
+            pose_model = self._mask_pose_locked() if mask_grid is not None else self._pose_locked(tier)
+            started = time.perf_counter()
+            if self.engine == "tasks":
+                # Pose et Face soumis ensemble: en LIVE_STREAM les deux graphes tournent en parallele
+                pending_pose = pose_model.submit(rgb, session_id)
+                pending_face = self.face.submit(rgb, session_id) if with_face else None
+                pose_res = pose_model.wait(pending_pose)
+                _observe_stage("pose", self.engine, started)
+                face_res = self.face.wait(pending_face) if pending_face is not None else None
+                if with_face:
+                    # Mesure depuis la soumission commune (etapes chevauchantes)
+                    _observe_stage("face", self.engine, started)
+            else:
+                pose_res = pose_model.process(rgb)
+                _observe_stage("pose", self.engine, started)
+                face_started = time.perf_counter()
+                face_res = self.face.process(rgb) if with_face else None
+                if with_face:
+                    _observe_stage("face", self.engine, face_started)
+            if mask_grid is not None and pose_res.segmentation_mask is not None:
+                # Le masque pointe dans la memoire du graphe: encode avant la frame suivante
+                encode_started = time.perf_counter()
+                mask = encode_mask(pose_res.segmentation_mask, mask_grid, mask_format)
+                METRICS.observe(
+                    "segmentation_mask_encode_ms", (time.perf_counter() - encode_started) * 1000.0, format=mask_format
+                )
+                METRICS.observe("segmentation_mask_payload_bytes", payload_size(mask), format=mask_format)
+            # Palier de qualite: latence complete de la frame (pose, face et masque)
+            self.quality.observe((time.perf_counter() - started) * 1000.0)
         pose_points: List[Dict[str, float]] = []
         if pose_res.pose_landmarks:
-            pose_points = [_norm_point(lm.x * w, lm.y * h, w, h) for lm in pose_res.pose_landmarks.landmark]
+            pose_points = _points_json(pose_res.pose_landmarks, w, h)
         face_points: List[Dict[str, float]] = []
         if with_face and face_res and face_res.multi_face_landmarks:
-            face_landmarks = face_res.multi_face_landmarks[0].landmark
-            face_points = [
-                _norm_point(lm.x * w, lm.y * h, w, h) for idx, lm in enumerate(face_landmarks) if idx % self.face_stride == 0
-            ]
+            face_points = _points_json(face_res.multi_face_landmarks[0], w, h, tier.face_stride)
+        if with_face:
+            schedule.face_points = face_points
+        elif wants_face and tier.face_every > 0:
+            face_points = schedule.face_points
         return {
             "posePoints": pose_points,
             "facePoints": face_points,
+            "mask": mask,
+            "qualityTier": tier.name,
+            "modelStatus": self.model_status,
+            "message": self.model_message,
+        }
+
+    def empty_result(self) -> Dict[str, Any]:
+        """Reponse sans points au schema de `predict` (frame non traitee)."""
+        return {
+            "posePoints": [],
+            "facePoints": [],
+            "mask": None,
+            "qualityTier": self.quality.tier.name,
             "modelStatus": self.model_status,
             "message": self.model_message,
         }
 
     def close(self) -> None:
         with self.lock:
-            self.pose.close()
-            self.face.close()
+            if self.pose is not None:
+                self.pose.close()
+                self.face.close()
+                self.pose = None
+                self.face = None
+            if self.pose_full is not None:
+                self.pose_full.close()
+                self.pose_full = None
+            if self.pose_mask is not None:
+                self.pose_mask.close()
+                self.pose_mask = None
+
+
+asl_service: Optional[ASLService] = ASLService(CFG, num_threads=THREADS.tflite) if "asl" in PIPELINES else None
+change_detector = FrameChangeDetector(threshold=CFG.frame_change_threshold)
+mailbox = FrameMailbox(superseded_mode=CFG.mailbox_superseded, enabled=CFG.frame_mailbox)
+scheduler = FairScheduler(
+    concurrency=CFG.inference_concurrency,
+    session_max_fps=CFG.session_max_fps,
+    session_burst=CFG.session_burst,
+    max_queue=CFG.scheduler_max_queue,
+    peer_max_sessions=CFG.peer_max_sessions,
+)
+
 
+def _build_segmentation_service() -> SegmentationService:
+    engine, engine_message = _resolve_mediapipe_engine(CFG, ("pose", "face"))
+    return SegmentationService(
+        face_stride=CFG.segmentation_face_stride,
+        engine=engine,
+        engine_message=engine_message,
+        tasks_dir=CFG.mediapipe_tasks_dir,
+        tasks_mode=CFG.mediapipe_tasks_mode,
+        quality=QualityController(
+            build_tiers(max(2, min(10, CFG.segmentation_face_stride))),
+            enabled=CFG.segmentation_adaptive,
+            initial=CFG.segmentation_tier,
+            best=CFG.segmentation_best_tier,
+            target_ms=CFG.segmentation_target_ms,
+            queue_high=CFG.segmentation_queue_high,
+            queue_depth=lambda: scheduler.queued,
+        ),
+    )
 
-asl_service = ASLService(CFG)
-seg_service = SegmentationService(face_stride=CFG.segmentation_face_stride)
+
+seg_service: Optional[SegmentationService] = _build_segmentation_service() if "segmentation" in PIPELINES else None
+landmark_encoder = LandmarkDeltaEncoder(
+    keyframe_interval=CFG.landmark_delta_keyframe,
+    min_motion=CFG.landmark_delta_min_motion,
+)
+frame_buffers = BufferPool(CFG.api_frame_max_size)
+raw_frame_buffers = BufferPool(CFG.api_raw_frame_max_pixels * 4)
+recorder = SessionRecorder(
+    CFG.record_dir,
+    enabled=CFG.record_sessions,
+    segment_bytes=CFG.record_segment_mb * 1024 * 1024,
+    max_segments=CFG.record_max_segments,
+)
+tracer = Tracer(
+    CFG.trace_dir,
+    sample_rate=CFG.trace_sample_rate,
+    ring_size=CFG.trace_ring_size,
+    file_bytes=CFG.trace_file_mb * 1024 * 1024,
+    max_files=CFG.trace_max_files,
+)
+memwatch = MemoryWatch(
+    enabled=CFG.memwatch_enabled,
+    interval_s=CFG.memwatch_interval_s,
+    modules=CFG.memwatch_modules,
+)
+profiler = SamplingProfiler(
+    interval_ms=CFG.profiler_interval_ms,
+    max_seconds=CFG.profiler_max_seconds,
+    max_overhead=CFG.profiler_max_overhead,
+)
+FOOTPRINT.mark("import", _IMPORT_STARTED)
 
 api_router = APIRouter(prefix="/api", tags=["api"])
 
 
+def _require_pipeline(pipeline: str) -> None:
+    """404 pour les routes d'un pipeline absent du profil de deploiement."""
+    if pipeline not in PIPELINES:
+        raise HTTPException(status_code=404, detail=f"Pipeline {pipeline} disabled (DEPLOY_PROFILE={PROFILE})")
+
+
+def _require_admin(request: Request, enabled: bool) -> None:
+    """Routes d'admin: 404 si la fonction est desactivee ou sans ADMIN_TOKEN, 403 si mauvais jeton."""
+    if not enabled or not CFG.admin_token:
+        raise HTTPException(status_code=404, detail="Not found")
+    provided = request.headers.get("x-admin-token", "")
+    if not hmac.compare_digest(provided.encode("utf-8"), CFG.admin_token.encode("utf-8")):
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+
+ADMISSION_ERRORS = {
+    "rate": (429, "Too many frames for this session"),
+    "peer": (429, "Too many frames from this client"),
+    "queue": (503, "Inference queue full"),
+}
+
+
+def _admit(session_id: str, request: Request) -> None:
+    """
+    Admission avant lecture/decodage: 429 si quota de la session ou de l'adresse client
+    depasse, 503 si file pleine.
+    """
+    try:
+        scheduler.admit(session_id, peer_from_request(request))
+    except AdmissionRejected as exc:
+        status, detail = ADMISSION_ERRORS[exc.reason]
+        raise HTTPException(status_code=status, detail=detail, headers=retry_after_header(exc))
+
+
+def _after_queue(trace: Trace, job: Any) -> Any:
+    """Span `queue`: de la soumission a la boite aux lettres jusqu'au creneau d'inference."""
+    queued = time.perf_counter()
+
+    def run() -> Any:
+        trace.add("queue", queued)
+        return job()
+
+    return run
+
+
+async def _schedule(
+    session_id: str,
+    pipeline: str,
+    job: Any,
+    source: Optional[_FrameSource] = None,
+    empty: Optional[Dict[str, Any]] = None,
+    label: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Boite aux lettres de la session, puis creneau d'inference attribue en tourniquet.
+    `empty`: reponse d'une frame remplacee avant tout resultat de la session.
+    `label`: pipeline de base des metriques, sans les options du client (grille du masque...).
+    """
+    if source is not None:
+        job = _after_queue(source.trace, job)
+    try:
+        result = await mailbox.submit(session_id, pipeline, lambda: scheduler.run(session_id, job), empty, label)
+    finally:
+        # Frame remplacee (jamais traitee) ou en erreur: le tampon du pool est rendu ici
+        if source is not None:
+            source.close()
+    if source is not None:
+        source.record(session_id, pipeline, result)
+    return result
+
+
+class _FrameSource:
+    """Frame a decoder dans le job d'inference (hors boucle asyncio); `close()` rend le tampon au pool."""
+
+    def __init__(
+        self, raw: Union[bytes, FrameBody], raw_format: Optional[Tuple[str, int, int]] = None, trace: Trace = NOOP_TRACE
+    ) -> None:
+        self.raw = raw
+        self.raw_format = raw_format
+        self.trace = trace
+        # Copie pour l'enregistreur: le tampon du corps retourne au pool des le decodage
+        self.recorded: Optional[bytes] = None
+        if recorder.active:
+            self.recorded = raw if isinstance(raw, bytes) else bytes(raw.view)
+
+    def record(self, session_id: str, pipeline: str, result: Dict[str, Any]) -> None:
+        if self.recorded is None:
+            return
+        meta: Dict[str, Any] = {"format": ENCODED_FORMAT}
+        if self.raw_format is not None:
+            fmt, width, height = self.raw_format
+            meta = {"format": fmt, "width": width, "height": height}
+        recorder.record(session_id, pipeline, self.recorded, meta, result)
+
+    def load(self) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """(image BGR, None) pour une image encodee, (None, image RGB) pour des pixels bruts."""
+        with self.trace.span("decode"):
+            return self._load()
+
+    def _load(self) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        if self.raw_format is not None:
+            fmt, width, height = self.raw_format
+            rgb, shares_buffer = raw_to_rgb(wrap_raw_frame(self.raw.view, fmt, width, height), fmt)
+            if not shares_buffer:
+                self.close()
+            return None, rgb
+        data = self.raw.view if isinstance(self.raw, FrameBody) else self.raw
+        try:
+            return _decode_image_bytes(data, CFG.api_frame_max_size), None
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        if isinstance(self.raw, FrameBody):
+            self.raw.release()
+
+
+async def _read_binary_frame(
+    request: Request, pixel_format: str, width: int, height: int, trace: Trace = NOOP_TRACE
+) -> _FrameSource:
+    pixel_format = pixel_format.lower()
+    if pixel_format == ENCODED_FORMAT:
+        with trace.span("receive"):
+            body = await read_frame_body(request, CFG.api_frame_max_size, frame_buffers)
+        return _FrameSource(body, trace=trace)
+    try:
+        expected = validate_raw_frame(pixel_format, width, height, CFG.api_raw_frame_max_pixels)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    with trace.span("receive"):
+        body = await read_frame_body(request, expected, raw_frame_buffers)
+    if body.length != expected:
+        body.release()
+        raise HTTPException(
+            status_code=400,
+            detail=f"Corps de {body.length} octets, {expected} attendus pour {pixel_format} {width}x{height}",
+        )
+    return _FrameSource(body, (pixel_format, width, height), trace=trace)
+
+
+def _segmentation_pipeline(with_face: bool, mask_grid: Optional[Tuple[int, int]], mask_format: str) -> str:
+    pipeline = "pose+face" if with_face else "pose"
+    if mask_grid is not None:
+        pipeline = f"{pipeline}+mask:{mask_grid[0]}x{mask_grid[1]}:{mask_format}"
+    return pipeline
+
+
+def _asl_job(session_id: str, source: _FrameSource) -> Dict[str, Any]:
+    try:
+        image, rgb = source.load()
+        cached, signature = change_detector.check(session_id, "asl", image if image is not None else rgb)
+        if cached is not None:
+            return cached
+        with activate(source.trace):
+            result = asl_service.predict(image, rgb=rgb, session_id=session_id)
+    finally:
+        source.close()
+    change_detector.update(session_id, "asl", signature, result)
+    return result
+
+
+def _segmentation_job(
+    session_id: str,
+    pipeline: str,
+    source: _FrameSource,
+    with_face: bool,
+    mask_grid: Optional[Tuple[int, int]],
+    mask_format: str,
+) -> Dict[str, Any]:
+    try:
+        image, rgb = source.load()
+        cached, signature = change_detector.check(session_id, pipeline, image if image is not None else rgb)
+        if cached is not None:
+            return cached
+        with activate(source.trace):
+            result = seg_service.predict(
+                image, with_face=with_face, mask_grid=mask_grid, mask_format=mask_format, rgb=rgb, session_id=session_id
+            )
+    finally:
+        source.close()
+    change_detector.update(session_id, pipeline, signature, result)
+    return result
+
+
+async def _run_asl(session_id: str, source: _FrameSource) -> Dict[str, Any]:
+    return await _schedule(
+        session_id,
+        "asl",
+        lambda: run_in_threadpool(_asl_job, session_id, source),
+        source,
+        asl_service.empty_result(session_id),
+    )
+
+
+async def _run_segmentation(
+    session_id: str, source: _FrameSource, with_face: bool, mask_grid: Optional[Tuple[int, int]], mask_format: str
+) -> Dict[str, Any]:
+    pipeline = _segmentation_pipeline(with_face, mask_grid, mask_format)
+    return await _schedule(
+        session_id,
+        pipeline,
+        lambda: run_in_threadpool(_segmentation_job, session_id, pipeline, source, with_face, mask_grid, mask_format),
+        source,
+        seg_service.empty_result(),
+        "pose+face" if with_face else "pose",
+    )
+
+
+@contextmanager
+def _trace_request(trace: Trace) -> Iterator[None]:
+    """
+    Soumet la trace quelle que soit l'issue de la requete, avec `status` (code HTTP) et
+    `error` en cas d'echec; la reponse d'erreur d'une requete tracee porte aussi X-Trace-Id.
+    """
+    try:
+        yield
+    except HTTPException as exc:
+        if trace.sampled:
+            trace.attrs.update(status=exc.status_code, error=str(exc.detail))
+            exc.headers = {**(exc.headers or {}), "X-Trace-Id": trace.trace_id}
+        raise
+    except Exception as exc:
+        if not trace.sampled:
+            raise
+        trace.attrs.update(status=500, error=f"{type(exc).__name__}: {exc}")
+        print(f"[Trace] {trace.trace_id} {trace.endpoint}: erreur interne")
+        traceback.print_exc()
+        raise HTTPException(
+            status_code=500, detail="Internal Server Error", headers={"X-Trace-Id": trace.trace_id}
+        ) from exc
+    finally:
+        trace.finish()
+
+
+def _traced_response(trace: Trace, result: Dict[str, Any]) -> Any:
+    """Requete tracee: serialisation mesuree (span `serialize`), en-tete X-Trace-Id, trace soumise."""
+    if not trace.sampled:
+        return result
+    with trace.span("serialize"):
+        response = JSONResponse(jsonable_encoder(result), headers={"X-Trace-Id": trace.trace_id})
+    trace.finish(
+        status=response.status_code,
+        superseded=bool(result.get("superseded")),
+        frameReused=bool(result.get("frameReused")),
+    )
+    return response
+
+
 @api_router.post("/asl/predict")
-async def asl_predict(frame: UploadFile = File(...)) -> Dict[str, Any]:
-    raw = await frame.read()
-    image = _decode_image_bytes(raw, CFG.api_frame_max_size)
-    return asl_service.predict(image)
+async def asl_predict(request: Request, frame: UploadFile = File(...)) -> Any:
+    _require_pipeline("asl")
+    session_id = session_id_from_request(request)
+    _admit(session_id, request)
+    trace = tracer.start_trace("asl/predict", session_id)
+    with _trace_request(trace):
+        with trace.span("receive"):
+            raw = await frame.read()
+        return _traced_response(trace, await _run_asl(session_id, _FrameSource(raw, trace=trace)))
+
+
+@api_router.post("/asl/predict/binary")
+async def asl_predict_binary(
+    request: Request,
+    pixel_format: str = Query(ENCODED_FORMAT, alias="format"),
+    width: int = Query(0),
+    height: int = Query(0),
+) -> Any:
+    """
+    Variante `application/octet-stream`: le corps est l'image encodee (JPEG/PNG), ou des
+    pixels bruts avec `format=rgba|rgb|gray|nv12&width=..&height=..`.
+    """
+    _require_pipeline("asl")
+    session_id = session_id_from_request(request)
+    _admit(session_id, request)
+    trace = tracer.start_trace("asl/predict/binary", session_id)
+    with _trace_request(trace):
+        source = await _read_binary_frame(request, pixel_format, width, height, trace)
+        return _traced_response(trace, await _run_asl(session_id, source))
+
+
+@api_router.post("/asl/text/reset")
+async def asl_text_reset(request: Request) -> Dict[str, Any]:
+    """Efface le texte decode de la session."""
+    _require_pipeline("asl")
+    asl_service.text_decoders.drop(session_id_from_request(request))
+    return {"committed": "", "hypothesis": ""}
 
 
 @api_router.post("/segmentation/predict")
-async def segmentation_predict(frame: UploadFile = File(...), withFace: str = Form("true")) -> Dict[str, Any]:
+async def segmentation_predict(
+    request: Request,
+    frame: UploadFile = File(...),
+    withFace: str = Form("true"),
+    mask: str = Form(""),
+    maskFormat: str = Form("rle"),
+    points: str = Form("full"),
+    pointsBase: Optional[int] = Form(None),
+) -> Any:
+    """
+    `points=delta`: points Pose/Face en deltas int16 par rapport a la reponse `pointsBase`
+    de la session (voir landmark_delta.py); `full` (defaut): listes [{x, y}] completes.
+    """
+    _require_pipeline("segmentation")
+    mask_grid, mask_format = _parse_mask_options(mask, maskFormat)
+    encoding = _parse_points_encoding(points)
+    session_id = session_id_from_request(request)
+    _admit(session_id, request)
+    trace = tracer.start_trace("segmentation/predict", session_id)
+    with _trace_request(trace):
+        with trace.span("receive"):
+            raw = await frame.read()
+        with_face = withFace.lower() == "true"
+        result = await _run_segmentation(session_id, _FrameSource(raw, trace=trace), with_face, mask_grid, mask_format)
+        if encoding == "delta":
+            result = landmark_encoder.encode(session_id, result, pointsBase)
+        return _traced_response(trace, result)
+
+
+@api_router.post("/segmentation/predict/binary")
+async def segmentation_predict_binary(
+    request: Request,
+    withFace: str = Query("true"),
+    mask: str = Query(""),
+    maskFormat: str = Query("rle"),
+    pixel_format: str = Query(ENCODED_FORMAT, alias="format"),
+    width: int = Query(0),
+    height: int = Query(0),
+    points: str = Query("full"),
+    pointsBase: Optional[int] = Query(None),
+) -> Any:
+    """Variante `application/octet-stream`; les options passent en parametres de requete."""
+    _require_pipeline("segmentation")
+    mask_grid, mask_format = _parse_mask_options(mask, maskFormat)
+    encoding = _parse_points_encoding(points)
+    session_id = session_id_from_request(request)
+    _admit(session_id, request)
+    trace = tracer.start_trace("segmentation/predict/binary", session_id)
+    with _trace_request(trace):
+        source = await _read_binary_frame(request, pixel_format, width, height, trace)
+        with_face = withFace.lower() == "true"
+        result = await _run_segmentation(session_id, source, with_face, mask_grid, mask_format)
+        if encoding == "delta":
+            result = landmark_encoder.encode(session_id, result, pointsBase)
+        return _traced_response(trace, result)
+
+
+ANALYZE_TASKS = ("asl", "pose", "face")
+
+
+def _timed(fn: Any, *args: Any, **kwargs: Any) -> Tuple[Any, float]:
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, round((time.perf_counter() - started) * 1000.0, 2)
+
+
+def _default_analyze_tasks() -> Set[str]:
+    """Taches disponibles dans le profil de deploiement (`tasks` absent de la requete)."""
+    selected: Set[str] = set()
+    if "asl" in PIPELINES:
+        selected.add("asl")
+    if "segmentation" in PIPELINES:
+        selected |= {"pose", "face"}
+    return selected
+
+
+def _parse_analyze_tasks(tasks: Optional[str]) -> Set[str]:
+    """`tasks` absent: pipelines du profil; taches demandees hors profil: 404."""
+    if tasks is None:
+        return _default_analyze_tasks()
+    selected = {task.strip().lower() for task in tasks.split(",") if task.strip()}
+    unknown = selected - set(ANALYZE_TASKS)
+    if unknown or not selected:
+        raise HTTPException(status_code=400, detail=f"tasks invalide (choix: {', '.join(ANALYZE_TASKS)})")
+    if "asl" in selected:
+        _require_pipeline("asl")
+    if selected & {"pose", "face"}:
+        _require_pipeline("segmentation")
+    return selected
+
+
+async def _run_analyze(
+    session_id: str,
+    source: _FrameSource,
+    selected: Set[str],
+    mask_grid: Optional[Tuple[int, int]],
+    mask_format: str,
+) -> Dict[str, Any]:
+    label = "analyze:" + "+".join(sorted(selected))
+    pipeline = label
+    if mask_grid is not None:
+        pipeline = f"{pipeline}+mask:{mask_grid[0]}x{mask_grid[1]}:{mask_format}"
+
+    def load_rgb() -> Tuple[Optional[np.ndarray], np.ndarray]:
+        image, rgb = source.load()
+        return image, rgb if rgb is not None else cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+    async def job() -> Dict[str, Any]:
+        try:
+            (image, rgb), decode_ms = await run_in_threadpool(_timed, load_rgb)
+            timings: Dict[str, float] = {"decode": decode_ms}
+            cached, signature = change_detector.check(session_id, pipeline, image if image is not None else rgb)
+            if cached is not None:
+                return cached
+
+            names: List[str] = []
+            jobs = []
+            if "asl" in selected:
+                names.append("asl")
+                jobs.append(run_in_threadpool(_timed, asl_service.predict, image, rgb=rgb, session_id=session_id))
+            if selected & {"pose", "face"}:
+                names.append("segmentation")
+                jobs.append(
+                    run_in_threadpool(
+                        _timed,
+                        seg_service.predict,
+                        image,
+                        with_face="face" in selected,
+                        mask_grid=mask_grid,
+                        mask_format=mask_format,
+                        rgb=rgb,
+                        session_id=session_id,
+                    )
+                )
+            response: Dict[str, Any] = {}
+            for name, (result, elapsed_ms) in zip(names, await asyncio.gather(*jobs)):
+                response[name] = result
+                timings[name] = elapsed_ms
+        finally:
+            source.close()
+        response["timingsMs"] = timings
+        change_detector.update(session_id, pipeline, signature, response)
+        return response
+
+    empty: Dict[str, Any] = {}
+    if "asl" in selected:
+        empty["asl"] = asl_service.empty_result(session_id)
+    if selected & {"pose", "face"}:
+        empty["segmentation"] = seg_service.empty_result()
+    empty["timingsMs"] = {}
+    return await _schedule(session_id, pipeline, job, source, empty, label)
+
+
+@api_router.post("/analyze")
+async def analyze(
+    request: Request,
+    frame: UploadFile = File(...),
+    tasks: Optional[str] = Form(None),
+    mask: str = Form(""),
+    maskFormat: str = Form("rle"),
+) -> Dict[str, Any]:
+    """
+    Decode et convertit la frame une seule fois, puis lance les pipelines demandes
+    (asl, pose, face) en parallele sur le meme buffer RGB. `face` implique `pose`.
+    Sans `tasks`: toutes les taches du profil de deploiement.
+    """
+    selected = _parse_analyze_tasks(tasks)
+    mask_grid, mask_format = _parse_mask_options(mask, maskFormat)
+    session_id = session_id_from_request(request)
+    _admit(session_id, request)
     raw = await frame.read()
-    image = _decode_image_bytes(raw, CFG.api_frame_max_size)
-    with_face = withFace.lower() == "true"
-    return seg_service.predict(image, with_face=with_face)
+    return await _run_analyze(session_id, _FrameSource(raw), selected, mask_grid, mask_format)
+
+
+@api_router.post("/analyze/binary")
+async def analyze_binary(
+    request: Request,
+    tasks: Optional[str] = Query(None),
+    mask: str = Query(""),
+    maskFormat: str = Query("rle"),
+    pixel_format: str = Query(ENCODED_FORMAT, alias="format"),
+    width: int = Query(0),
+    height: int = Query(0),
+) -> Dict[str, Any]:
+    selected = _parse_analyze_tasks(tasks)
+    mask_grid, mask_format = _parse_mask_options(mask, maskFormat)
+    session_id = session_id_from_request(request)
+    _admit(session_id, request)
+    source = await _read_binary_frame(request, pixel_format, width, height)
+    return await _run_analyze(session_id, source, selected, mask_grid, mask_format)
+
+
+@api_router.post("/admin/profile")
+async def admin_profile(
+    request: Request,
+    seconds: float = Query(5.0, gt=0),
+    top: int = Query(30, ge=1, le=200),
+    output: str = Query("json", alias="format"),
+) -> Any:
+    """
+    Profil par echantillonnage de tous les threads pendant `seconds` (plafonne a
+    PROFILER_MAX_SECONDS, arretee plus tot si le surcout reste hors budget: `stopReason`).
+    `format=collapsed` renvoie seulement les piles repliees.
+    """
+    _require_admin(request, CFG.profiler_enabled)
+    try:
+        # Capture sur le thread du profileur: ni la boucle ni le threadpool d'inference ne sont occupes
+        report = await profiler.capture(seconds, top)
+    except ProfilerBusy as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    print(
+        f"[Profiler] {report['samples']} echantillons en {report['durationS']} s "
+        f"(surcout {report['overheadPct']}%, arret: {report['stopReason']})"
+    )
+    if output == "collapsed":
+        return PlainTextResponse(report["collapsed"])
+    return report
+
+
+@api_router.post("/admin/memory/diff")
+async def admin_memory_diff(
+    request: Request,
+    against: str = Query("last"),
+    top: int = Query(25, ge=1, le=200),
+) -> Dict[str, Any]:
+    """
+    Diff par ligne de code entre un nouvel instantane tracemalloc et `against`: `start`
+    (premier echantillon) ou `last` (appel precedent, qui devient la nouvelle reference).
+    """
+    _require_admin(request, CFG.memwatch_enabled)
+    if against not in ("last", "start"):
+        raise HTTPException(status_code=400, detail="against invalide (choix: last, start)")
+    if not memwatch.active:
+        raise HTTPException(status_code=503, detail="Memory watch not running")
+    return await run_in_threadpool(memwatch.diff, against, top)
+
+
+def _service_status(service: Any) -> Dict[str, Any]:
+    if service is None:
+        return {"status": "disabled", "message": f"Not in DEPLOY_PROFILE={PROFILE}"}
+    return {"status": service.model_status, "message": service.model_message}
 
 
 def get_runtime_status() -> Dict[str, Any]:
     return {
-        "asl": {"status": asl_service.model_status, "message": asl_service.model_message},
-        "mediapipe": {"status": seg_service.model_status, "message": seg_service.model_message},
+        "asl": _service_status(asl_service),
+        "mediapipe": _service_status(seg_service),
     }
 
 
+def _asl_meta() -> Dict[str, Any]:
+    if asl_service is None:
+        return _service_status(None)
+    return {
+        "path": str(asl_service.model_path),
+        "status": asl_service.model_status,
+        "labels": len(asl_service.labels),
+        "qualityGate": asl_service.quality_gate.config(),
+        "backend": asl_service.backend_choice.describe() if asl_service.backend_choice else None,
+    }
+
+
+def _segmentation_meta() -> Dict[str, Any]:
+    if seg_service is None:
+        return _service_status(None)
+    return {
+        "pose": "enabled",
+        "faceMesh": "enabled",
+        "faceDownsample": seg_service.face_stride,
+        "quality": seg_service.quality.stats(),
+        "segmentationMask": "loaded" if seg_service.pose_mask is not None else "on_demand",
+        "pointsDelta": landmark_encoder.config(),
+    }
+
+
+def _services() -> List[Any]:
+    return [service for service in (asl_service, seg_service) if service is not None]
+
+
 def get_meta_info() -> Dict[str, Any]:
     return {
         "api": {"name": "AI Playground API", "version": "1.0.0"},
         "models": {
-            "asl": {
-                "path": str(asl_service.model_path),
-                "status": asl_service.model_status,
-                "labels": len(asl_service.labels),
-            },
+            "asl": _asl_meta(),
             "mediapipe": {
-                "pose": "enabled",
-                "faceMesh": "enabled",
-                "faceDownsample": seg_service.face_stride,
+                **_segmentation_meta(),
+                "engine": {
+                    "requested": CFG.mediapipe_engine,
+                    "asl": asl_service.engine if asl_service else None,
+                    "segmentation": seg_service.engine if seg_service else None,
+                    "tasksMode": CFG.mediapipe_tasks_mode,
+                    "message": next((s.engine_message for s in _services() if s.engine_message), ""),
+                },
             },
         },
-        "config": {"API_FRAME_MAX_SIZE": CFG.api_frame_max_size},
+        "profile": FOOTPRINT.stats(),
+        "config": {
+            "API_FRAME_MAX_SIZE": CFG.api_frame_max_size,
+            "API_RAW_FRAME_MAX_PIXELS": CFG.api_raw_frame_max_pixels,
+            "FRAME_CHANGE_THRESHOLD": CFG.frame_change_threshold,
+            "FRAME_MAILBOX": CFG.frame_mailbox,
+            "MAILBOX_SUPERSEDED": CFG.mailbox_superseded,
+        },
+        "frameFilter": change_detector.stats(),
+        "scheduler": scheduler.stats(),
+        "recorder": recorder.stats(),
+        "tracing": tracer.stats(),
+        "memory": memwatch.stats(),
+        "threads": describe_threads(THREADS),
     }
 
 
+def startup_services() -> None:
+    started = time.perf_counter()
+    rss_before = read_rss_bytes()
+    apply_process_threads(THREADS)
+    limit_mediapipe_threads(THREADS.mediapipe)
+    apply_server_threads(THREADS)
+    print(f"[Threads] pid={os.getpid()} budget: {describe_threads(THREADS)}")
+    for message in {service.engine_message for service in _services()} - {""}:
+        print(f"[MediaPipe] {message}")
+    for service in _services():
+        service.start()
+    recorder.start()
+    tracer.start()
+    memwatch.start()
+    elapsed_ms = (time.perf_counter() - started) * 1000.0
+    print(
+        f"[Startup] pid={os.getpid()} services prets en {elapsed_ms:.0f} ms "
+        f"(poids precharges: {preloaded_bytes()} octets)"
+    )
+    FOOTPRINT.mark("startup", started, rss_before)
+    print(f"[Profile] pid={os.getpid()} {FOOTPRINT.summary()}")
+
+
 def shutdown_services() -> None:
-    asl_service.close()
-    seg_service.close()
+    recorder.close()
+    tracer.close()
+    memwatch.close()
+    for service in _services():
+        service.close()
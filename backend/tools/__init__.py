@@ -0,0 +1 @@
+"""Outils hors ligne (benchmarks, sweeps) pour le backend."""
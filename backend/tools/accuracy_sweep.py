@@ -0,0 +1,469 @@
+"""
+Balayage precision / latence des reglages ASL (et du sous-echantillonnage FaceMesh).
+
+Chaque echantillon etiquete est rejoue comme un signe tenu `--repeats` frames (leger
+decalage, rotation et luminosite aleatoires, graine fixe), les signes s'enchainant dans
+une meme session. Chaque combinaison de resolution de traitement (largeur de frame),
+ASL_ROI_MODE, ASL_PADDING, ASL_SMOOTHING_WINDOW et ASL_MIN_CONFIDENCE construit un
+`ASLService` a partir d'un AppConfig (les autres reglages viennent de l'environnement) et
+rejoue le flux par `ASLService.predict`: detection, extract_rois, filtre qualite,
+predict_batch, suivi des mains et lissage, comme en production. Resultats: precision
+(frames dont le label emis est le bon, "No hand" compte faux), couverture, taux de ROI
+rejetees, matrice de confusion et latence par frame. Les configurations Pareto-optimales
+(aucune autre n'est a la fois plus precise et plus rapide) sont marquees `*`.
+
+Jeux de donnees:
+- par defaut, les 26 lettres de assets/alphabet.jpg. Ce sont des silhouettes que MediaPipe
+  ne detecte pas: le detecteur du service est alors remplace (`--roi-fallback silhouette`)
+  par des landmarks tires du contour des pixels sombres, le reste du pipeline est inchange;
+- `--dataset DIR`: un sous-dossier par label (`DIR/A/*.jpg`, `DIR/B/*.png`...).
+
+SEGMENTATION_FACE_STRIDE ne change pas l'inference FaceMesh mais le nombre de points
+envoyes: `--face-dataset DIR` (images avec un visage) mesure, par pas, l'erreur de
+reconstruction du maillage complet, la taille de la charge utile et la serialisation.
+
+    python -m backend.tools.accuracy_sweep
+    python -m backend.tools.accuracy_sweep --dataset data/asl --widths 320,640 --json --output sweep.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import copy
+import io
+import itertools
+import json
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import mediapipe as mp
+import numpy as np
+from mediapipe.framework.formats import classification_pb2, landmark_pb2
+
+from backend.src.labels import load_labels
+from backend.src.web_api import ASLService, AppConfig, _points_json
+
+ROOT = Path(__file__).resolve().parents[2]
+NO_HAND = "No hand"
+IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+ROI_MODES = ("bbox", "oriented")
+SESSION_ID = "sweep"
+
+# assets/alphabet.jpg (1300x1300): par rangee, bande verticale des mains (sans la lettre
+# imprimee dessous) et centre horizontal de chaque main
+ALPHABET_ROWS: Tuple[Tuple[int, int, Tuple[Tuple[str, int], ...]], ...] = (
+    (75, 290, (("A", 178), ("B", 325), ("C", 490), ("D", 655), ("E", 800), ("F", 963), ("G", 1143))),
+    (370, 590, (("H", 178), ("I", 380), ("J", 580), ("K", 780), ("L", 955), ("M", 1140))),
+    (650, 860, (("N", 178), ("O", 370), ("P", 565), ("Q", 775), ("R", 965), ("S", 1140))),
+    (930, 1165, (("T", 178), ("U", 333), ("V", 488), ("W", 655), ("X", 800), ("Y", 963), ("Z", 1140))),
+)
+TILE_HALF_WIDTH = 100
+
+
+@dataclass
+class Sample:
+    label: str
+    frame: np.ndarray
+    source: str
+
+
+@dataclass
+class FrameResult:
+    label: str
+    latency_ms: float
+    detected: bool
+    rejected: bool
+
+
+def _parse_list(value: str, cast: Any) -> List[Any]:
+    return [cast(item) for item in value.split(",") if item.strip()]
+
+
+def alphabet_samples(image: Path) -> List[Sample]:
+    """Une frame par lettre: la main decoupee, centree sur un fond blanc (marge = 50%)."""
+    sheet = cv2.imread(str(image))
+    if sheet is None:
+        raise SystemExit(f"Image introuvable: {image}")
+    samples: List[Sample] = []
+    for top, bottom, letters in ALPHABET_ROWS:
+        for letter, center in letters:
+            tile = sheet[top:bottom, max(0, center - TILE_HALF_WIDTH) : center + TILE_HALF_WIDTH]
+            margin = max(tile.shape[:2]) // 2
+            frame = cv2.copyMakeBorder(tile, margin, margin, margin, margin, cv2.BORDER_CONSTANT, value=(255, 255, 255))
+            samples.append(Sample(letter, frame, f"{image.name}#{letter}"))
+    return samples
+
+
+def folder_samples(root: Path) -> List[Sample]:
+    if not root.is_dir():
+        raise SystemExit(f"Dossier introuvable: {root}")
+    samples: List[Sample] = []
+    for folder in sorted(p for p in root.iterdir() if p.is_dir()):
+        for path in sorted(folder.iterdir()):
+            if path.suffix.lower() not in IMAGE_SUFFIXES:
+                continue
+            frame = cv2.imread(str(path))
+            if frame is None:
+                print(f"[Sweep] image illisible ignoree: {path}")
+                continue
+            samples.append(Sample(folder.name, frame, str(path.relative_to(root))))
+    if not samples:
+        raise SystemExit(f"Aucune image dans {root}/<label>/")
+    return samples
+
+
+def jittered(frame: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Petite variation plausible entre deux frames d'un meme signe (decalage, rotation, luminosite)."""
+    h, w = frame.shape[:2]
+    angle = float(rng.uniform(-5.0, 5.0))
+    matrix = cv2.getRotationMatrix2D((w / 2.0, h / 2.0), angle, 1.0)
+    matrix[:, 2] += rng.uniform(-0.03, 0.03, size=2) * (w, h)
+    moved = cv2.warpAffine(frame, matrix, (w, h), borderMode=cv2.BORDER_REPLICATE)
+    return cv2.convertScaleAbs(moved, alpha=float(rng.uniform(0.85, 1.15)), beta=0)
+
+
+def silhouette_landmarks(frame: np.ndarray) -> Optional[landmark_pb2.NormalizedLandmarkList]:
+    """
+    21 landmarks normalises sur la silhouette sombre (seuil d'Otsu): poignet (0) en bas au
+    centre, base du majeur (9) au centre (axe vertical pour le mode oriente), les autres
+    repartis sur le contour; leur boite est celle de la silhouette, sans padding.
+    """
+    gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
+    _, mask = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
+    if not contours:
+        return None
+    outline = np.concatenate(contours).reshape(-1, 2).astype(np.float64)
+    x, y, bw, bh = cv2.boundingRect(outline.astype(np.int32))
+    extremes = [outline[outline[:, 0].argmin()], outline[outline[:, 0].argmax()], outline[outline[:, 1].argmin()]]
+    spread = outline[np.linspace(0, len(outline) - 1, 21 - 2 - len(extremes)).astype(int)]
+    others = iter(extremes + list(spread))
+    h, w = gray.shape
+    points = landmark_pb2.NormalizedLandmarkList()
+    for index in range(21):
+        if index == 0:
+            px, py = x + bw / 2.0, y + bh - 1
+        elif index == 9:
+            px, py = x + bw / 2.0, y + bh / 2.0
+        else:
+            px, py = next(others)
+        points.landmark.add(x=float(px) / w, y=float(py) / h, z=0.0)
+    return points
+
+
+class SilhouetteHands:
+    """Detecteur injecte dans le HandROIExtractor du service (format mp.solutions.hands)."""
+
+    def __init__(self) -> None:
+        self.handedness = classification_pb2.ClassificationList()
+        self.handedness.classification.add(index=0, score=1.0, label="Right")
+
+    def process(self, rgb_frame: np.ndarray, **kwargs: Any) -> SimpleNamespace:
+        landmarks = silhouette_landmarks(rgb_frame)
+        if landmarks is None:
+            return SimpleNamespace(multi_hand_landmarks=None, multi_handedness=None)
+        return SimpleNamespace(multi_hand_landmarks=[landmarks], multi_handedness=[self.handedness])
+
+    def close(self) -> None:
+        pass
+
+
+def resize_to_width(frame: np.ndarray, width: int) -> np.ndarray:
+    if width <= 0 or width == frame.shape[1]:
+        return frame
+    height = max(1, int(round(frame.shape[0] * width / frame.shape[1])))
+    interpolation = cv2.INTER_AREA if width < frame.shape[1] else cv2.INTER_LINEAR
+    return cv2.resize(frame, (width, height), interpolation=interpolation)
+
+
+def service_config(base: AppConfig, **overrides: Any) -> AppConfig:
+    """Copie de la configuration de l'app avec quelques champs remplaces (asl_padding=...)."""
+    cfg = copy.copy(base)
+    for name, value in overrides.items():
+        if not hasattr(cfg, name):
+            raise AttributeError(f"AppConfig n'a pas de champ {name}")
+        setattr(cfg, name, value)
+    return cfg
+
+
+def run_setting(stream: Sequence[Tuple[str, np.ndarray]], cfg: AppConfig, width: int, fallback: str) -> List[FrameResult]:
+    """Rejoue le flux dans un ASLService neuf (une session), latence = redimensionnement + predict."""
+    # Les traces de chargement (labels, modele) se repeteraient a chaque configuration
+    with contextlib.redirect_stdout(io.StringIO()):
+        service = ASLService(cfg, num_threads=1)
+        service.start()
+    if service.model is None:
+        raise SystemExit(f"[Sweep] modele ASL indisponible: {service.model_message}")
+    if fallback == "silhouette":
+        service.roi_extractor.hands.close()
+        service.roi_extractor.hands = SilhouetteHands()
+    frames: List[FrameResult] = []
+    try:
+        for _, source in stream:
+            started = time.perf_counter()
+            result = service.predict(resize_to_width(source, width), session_id=SESSION_ID)
+            latency_ms = (time.perf_counter() - started) * 1000.0
+            hands = result["hands"]
+            frames.append(FrameResult(result["label"], latency_ms, bool(hands), bool(hands) and bool(hands[0]["rejected"])))
+    finally:
+        service.close()
+    return frames
+
+
+def confusion_matrix(truth: Sequence[str], predicted: Sequence[str]) -> Dict[str, Any]:
+    classes = sorted(set(truth))
+    columns = classes + sorted(set(predicted) - set(classes) - {NO_HAND}) + [NO_HAND]
+    index = {name: i for i, name in enumerate(columns)}
+    matrix = np.zeros((len(classes), len(columns)), dtype=np.int64)
+    rows = {name: i for i, name in enumerate(classes)}
+    for expected, got in zip(truth, predicted):
+        matrix[rows[expected], index[got]] += 1
+    return {"rows": classes, "columns": columns, "matrix": matrix.tolist()}
+
+
+def pareto_front(points: Sequence[Tuple[float, float]]) -> List[bool]:
+    """Points non domines, les deux coordonnees etant a minimiser."""
+    front: List[bool] = []
+    for i, (a, b) in enumerate(points):
+        dominated = any(
+            c <= a and d <= b and (c < a or d < b) for j, (c, d) in enumerate(points) if j != i
+        )
+        front.append(not dominated)
+    return front
+
+
+def sweep_asl(
+    samples: List[Sample],
+    base: AppConfig,
+    widths: Sequence[int],
+    roi_modes: Sequence[str],
+    paddings: Sequence[float],
+    windows: Sequence[int],
+    min_confidences: Sequence[float],
+    repeats: int,
+    seed: int,
+    fallback: str,
+) -> List[Dict[str, Any]]:
+    rng = np.random.default_rng(seed)
+    stream = [(sample.label, jittered(sample.frame, rng)) for sample in samples for _ in range(max(1, repeats))]
+    truth = [label for label, _ in stream]
+    rows: List[Dict[str, Any]] = []
+    for width, roi_mode, padding, window, min_confidence in itertools.product(
+        widths, roi_modes, paddings, windows, min_confidences
+    ):
+        cfg = service_config(
+            base,
+            asl_roi_mode=roi_mode,
+            asl_padding=padding,
+            asl_smoothing=window,
+            asl_min_confidence=min_confidence,
+        )
+        frames = run_setting(stream, cfg, width, fallback)
+        emitted = [frame.label for frame in frames]
+        latencies = [frame.latency_ms for frame in frames]
+        answered = [(t, e) for t, e in zip(truth, emitted) if e != NO_HAND]
+        correct = sum(t == e for t, e in answered)
+        rows.append(
+            {
+                "width": width,
+                "roiMode": roi_mode,
+                "padding": padding,
+                "smoothingWindow": window,
+                "minConfidence": min_confidence,
+                "frames": len(frames),
+                "accuracy": round(correct / len(frames), 4),
+                "coverage": round(len(answered) / len(frames), 4),
+                "precision": round(correct / len(answered), 4) if answered else 0.0,
+                "detectionRate": round(sum(frame.detected for frame in frames) / len(frames), 4),
+                "rejectionRate": round(sum(frame.rejected for frame in frames) / len(frames), 4),
+                "latencyMs": {
+                    "p50": round(float(np.percentile(latencies, 50)), 3),
+                    "p95": round(float(np.percentile(latencies, 95)), 3),
+                    "mean": round(float(np.mean(latencies)), 3),
+                },
+                "confusion": confusion_matrix(truth, emitted),
+            }
+        )
+    front = pareto_front([(-row["accuracy"], row["latencyMs"]["p50"]) for row in rows])
+    for row, optimal in zip(rows, front):
+        row["pareto"] = optimal
+    return rows
+
+
+def mesh_reconstruction_error(points: np.ndarray, stride: int) -> float:
+    """Distance moyenne de chaque point du maillage au point conserve le plus proche, en fraction de la diagonale du visage."""
+    kept = points[::stride]
+    distances = np.sqrt(((points[:, None, :] - kept[None, :, :]) ** 2).sum(axis=2)).min(axis=1)
+    diagonal = float(np.linalg.norm(points.max(axis=0) - points.min(axis=0))) or 1.0
+    return float(distances.mean() / diagonal)
+
+
+def sweep_face_stride(samples: List[Sample], strides: Sequence[int]) -> List[Dict[str, Any]]:
+    face_mesh = mp.solutions.face_mesh.FaceMesh(static_image_mode=True, max_num_faces=1, refine_landmarks=False)
+    meshes: List[Tuple[Any, int, int]] = []
+    try:
+        for sample in samples:
+            h, w = sample.frame.shape[:2]
+            result = face_mesh.process(cv2.cvtColor(sample.frame, cv2.COLOR_BGR2RGB))
+            if result.multi_face_landmarks:
+                meshes.append((result.multi_face_landmarks[0], w, h))
+    finally:
+        face_mesh.close()
+    if not meshes:
+        return []
+    rows: List[Dict[str, Any]] = []
+    for stride in strides:
+        errors: List[float] = []
+        sizes: List[int] = []
+        timings: List[float] = []
+        for landmarks, w, h in meshes:
+            started = time.perf_counter()
+            payload = _points_json(landmarks, w, h, stride)
+            timings.append((time.perf_counter() - started) * 1000.0)
+            sizes.append(len(json.dumps(payload, separators=(",", ":"))))
+            points = np.array([(lm.x * w, lm.y * h) for lm in landmarks.landmark], dtype=np.float64)
+            errors.append(mesh_reconstruction_error(points, stride))
+        rows.append(
+            {
+                "faceStride": stride,
+                "faces": len(meshes),
+                "points": len(payload),
+                "reconstructionError": round(float(np.mean(errors)), 5),
+                "payloadBytes": int(np.mean(sizes)),
+                "serializeMs": round(float(np.median(timings)), 4),
+            }
+        )
+    front = pareto_front([(row["reconstructionError"], row["payloadBytes"]) for row in rows])
+    for row, optimal in zip(rows, front):
+        row["pareto"] = optimal
+    return rows
+
+
+def print_confusion(confusion: Dict[str, Any]) -> None:
+    columns = [name if name != NO_HAND else "-" for name in confusion["columns"]]
+    cell = max(3, max(len(name) for name in columns) + 1)
+    print("       " + "".join(f"{name:>{cell}}" for name in columns))
+    for name, counts in zip(confusion["rows"], confusion["matrix"]):
+        print(f"  {name:<5}" + "".join(f"{count if count else '.':>{cell}}" for count in counts))
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    asl = report["asl"]
+    print(f"[Sweep] {report['samples']} echantillons x {report['repeats']} frames, {len(asl)} configurations")
+    print("   width roiMode  padding window minConf   accuracy coverage precision detect reject   p50 ms   p95 ms")
+    for row in sorted(asl, key=lambda r: (-r["accuracy"], r["latencyMs"]["p50"])):
+        print(
+            f" {'*' if row['pareto'] else ' '} {row['width'] or 'natif':>5} {row['roiMode']:<8} {row['padding']:>7.2f} "
+            f"{row['smoothingWindow']:>6} {row['minConfidence']:>7.2f}   {row['accuracy']:>8.1%} {row['coverage']:>8.1%} "
+            f"{row['precision']:>9.1%} {row['detectionRate']:>6.0%} {row['rejectionRate']:>6.0%} "
+            f"{row['latencyMs']['p50']:>8.2f} {row['latencyMs']['p95']:>8.2f}"
+        )
+    front = [row for row in asl if row["pareto"]]
+    if front:
+        best = max(front, key=lambda r: (r["accuracy"], -r["latencyMs"]["p50"]))
+        print(
+            f"\n[Sweep] confusion (lignes: attendu, colonnes: emis, '-' = {NO_HAND}) pour width={best['width'] or 'natif'} "
+            f"roiMode={best['roiMode']} padding={best['padding']} window={best['smoothingWindow']} minConf={best['minConfidence']}"
+        )
+        print_confusion(best["confusion"])
+    face = report.get("face")
+    if face is None:
+        return
+    if not face:
+        print("\n[Sweep] SEGMENTATION_FACE_STRIDE: aucun visage detecte dans --face-dataset, balayage ignore")
+        return
+    print("\n[Sweep] SEGMENTATION_FACE_STRIDE")
+    print("   stride points  erreur  octets  serialize ms")
+    for row in face:
+        print(
+            f" {'*' if row['pareto'] else ' '} {row['faceStride']:>6} {row['points']:>6} {row['reconstructionError']:>7.4f} "
+            f"{row['payloadBytes']:>7} {row['serializeMs']:>12.4f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dataset", type=Path, default=None, help="Dossier DIR/<label>/*.jpg (defaut: assets/alphabet.jpg)")
+    parser.add_argument("--image", type=Path, default=ROOT / "assets/alphabet.jpg")
+    parser.add_argument("--model", type=Path, default=Path(os.getenv("ASL_MODEL_PATH", str(ROOT / "backend/assets/model.tflite"))))
+    parser.add_argument("--labels", type=Path, default=Path(os.getenv("ASL_LABELS_PATH", str(ROOT / "backend/assets/labels.txt"))))
+    parser.add_argument("--widths", default=None, help="Largeurs de traitement en px, 0 = native (defaut: 160,240,0 ou 320,480,0)")
+    parser.add_argument("--roi-modes", default=None, help="Valeurs de ASL_ROI_MODE (defaut: celle de l'environnement)")
+    parser.add_argument("--paddings", default="0.1,0.2,0.3", help="Valeurs de ASL_PADDING")
+    parser.add_argument("--windows", default="1,3,5", help="Valeurs de ASL_SMOOTHING_WINDOW")
+    parser.add_argument("--min-confidences", default="0.5,0.7,0.85", help="Valeurs de ASL_MIN_CONFIDENCE")
+    parser.add_argument("--repeats", type=int, default=5, help="Frames par echantillon (signe tenu)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--roi-fallback",
+        choices=("auto", "none", "silhouette"),
+        default="auto",
+        help="ROI sans main detectee: silhouette (pixels sombres) ou aucune; auto = silhouette pour alphabet.jpg",
+    )
+    parser.add_argument("--face-dataset", type=Path, default=None, help="Images avec visage pour SEGMENTATION_FACE_STRIDE")
+    parser.add_argument("--face-strides", default="2,4,6,8,10", help="Valeurs de SEGMENTATION_FACE_STRIDE")
+    parser.add_argument("--opencv-threads", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="Rapport JSON sur la sortie standard")
+    parser.add_argument("--output", type=Path, default=None, help="Ecrit le rapport JSON complet dans ce fichier")
+    args = parser.parse_args()
+
+    cv2.setNumThreads(args.opencv_threads)
+    if not args.model.exists():
+        raise SystemExit(f"Modele introuvable: {args.model}")
+    samples = folder_samples(args.dataset) if args.dataset else alphabet_samples(args.image)
+    fallback = args.roi_fallback if args.roi_fallback != "auto" else ("none" if args.dataset else "silhouette")
+    widths = _parse_list(args.widths or ("320,480,0" if args.dataset else "160,240,0"), int)
+    labels = load_labels(str(args.labels) if args.labels.exists() else None)
+    base = service_config(AppConfig(), asl_model_path=str(args.model), asl_labels_path=str(args.labels), asl_max_hands=1)
+    roi_modes = _parse_list(args.roi_modes or base.asl_roi_mode, str)
+    invalid = sorted(set(roi_modes) - set(ROI_MODES))
+    if invalid:
+        raise SystemExit(f"ASL_ROI_MODE inconnu: {', '.join(invalid)} (choix: {', '.join(ROI_MODES)})")
+    unknown = sorted({sample.label for sample in samples} - set(labels))
+    if unknown:
+        print(f"[Sweep] labels absents du modele (toujours faux): {', '.join(unknown)}")
+
+    report: Dict[str, Any] = {
+        "dataset": str(args.dataset or args.image),
+        "samples": len(samples),
+        "repeats": args.repeats,
+        "roiFallback": fallback,
+        "asl": sweep_asl(
+            samples,
+            base,
+            widths,
+            roi_modes,
+            _parse_list(args.paddings, float),
+            _parse_list(args.windows, int),
+            _parse_list(args.min_confidences, float),
+            args.repeats,
+            args.seed,
+            fallback,
+        ),
+    }
+    if args.face_dataset:
+        face_samples = [
+            Sample("", frame, str(path))
+            for path in sorted(args.face_dataset.rglob("*"))
+            if path.suffix.lower() in IMAGE_SUFFIXES and (frame := cv2.imread(str(path))) is not None
+        ]
+        report["face"] = sweep_face_stride(face_samples, _parse_list(args.face_strides, int))
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"[Sweep] rapport ecrit: {args.output}")
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print_report(report)
+
+
+if __name__ == "__main__":
+    main()
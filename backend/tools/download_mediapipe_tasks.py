@@ -0,0 +1,38 @@
+"""
+Telecharge les modeles MediaPipe Tasks (.task) utilises par MEDIAPIPE_ENGINE=tasks.
+
+    python -m backend.tools.download_mediapipe_tasks [--dir backend/assets/mediapipe]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import urllib.request
+from pathlib import Path
+
+from backend.src.mp_tasks import TASK_MODELS
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Telechargement des modeles MediaPipe Tasks")
+    parser.add_argument("--dir", type=str, default=os.getenv("MEDIAPIPE_TASKS_DIR", "backend/assets/mediapipe"))
+    parser.add_argument("--force", action="store_true", help="Re-telecharge meme si le fichier existe")
+    args = parser.parse_args()
+
+    target = Path(args.dir)
+    target.mkdir(parents=True, exist_ok=True)
+    for name, url in TASK_MODELS.values():
+        path = target / name
+        if path.exists() and not args.force:
+            print(f"[Tasks] {name}: deja present")
+            continue
+        print(f"[Tasks] {name} <- {url}")
+        tmp = path.with_suffix(".part")
+        urllib.request.urlretrieve(url, tmp)
+        tmp.replace(path)
+    print(f"[Tasks] Modeles disponibles dans {target}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+"""
+Micro-benchmarks des fonctions chaudes, avec baseline JSON et seuil de regression.
+
+Entrees synthetiques deterministes: frames tirees de assets/alphabet.jpg a plusieurs
+resolutions, landmarks fixes. Les benchmarks hand_roi injectent un detecteur (`hands=`) qui
+renvoie toujours les memes mains: on mesure le decoupage des ROI (bbox et mode oriente),
+pas MediaPipe ni un echec de detection. Chaque benchmark est calibre (iterations par tour pour
+~`--min-time` s), puis mesure sur `--rounds` tours; on garde la mediane par appel.
+
+    python -m backend.tools.microbench --save             # enregistre la baseline
+    python -m backend.tools.microbench                    # compare, code retour 1 si regression
+    python -m backend.tools.microbench --filter decode --threshold 0.10
+
+La baseline depend de la machine: elle n'est pas versionnee, chaque machine de reference
+enregistre la sienne (`--save`, a refaire apres un changement de materiel). Sans baseline,
+la comparaison echoue (code retour 2) plutot que de ne rien verifier. Avec `--json`, seul le
+rapport JSON va sur la sortie standard (traces et comparaison sur la sortie d'erreur).
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+from mediapipe.framework.formats import classification_pb2, landmark_pb2
+
+from backend.src.hand_roi import HandROIExtractor
+from backend.src.tflite_infer import TFLiteModel
+from backend.src.utils import PredictionSmoother
+
+ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_BASELINE = ROOT / "backend/benchmarks/microbench.json"
+RESOLUTIONS: Tuple[Tuple[int, int], ...] = ((320, 240), (640, 480), (1280, 720))
+ORIENTED_SIZE = (224, 224)
+
+
+@dataclass
+class Bench:
+    name: str
+    fn: Callable[[], Any]
+
+
+def synthetic_landmarks(count: int, seed: int) -> landmark_pb2.NormalizedLandmarkList:
+    """Liste de landmarks MediaPipe deterministe (vrais objets protobuf, comme en production)."""
+    rng = np.random.default_rng(seed)
+    points = landmark_pb2.NormalizedLandmarkList()
+    for x, y, z in rng.uniform(0.0, 1.0, size=(count, 3)):
+        points.landmark.add(x=float(x), y=float(y), z=float(z))
+    return points
+
+
+def synthetic_hand(center_x: float, seed: int) -> landmark_pb2.NormalizedLandmarkList:
+    """Main plausible (~25% de la frame): poignet (0) en bas, base du majeur (9) au-dessus, axe incline."""
+    rng = np.random.default_rng(seed)
+    offsets = rng.uniform(-0.12, 0.12, size=(21, 2))
+    offsets[0] = (0.0, 0.12)
+    offsets[9] = (0.03, -0.02)
+    points = landmark_pb2.NormalizedLandmarkList()
+    for dx, dy in offsets:
+        points.landmark.add(x=float(center_x + dx), y=float(0.5 + dy), z=0.0)
+    return points
+
+
+class FixedHands:
+    """Detecteur injecte dans HandROIExtractor: memes mains a chaque frame (format mp.solutions.hands)."""
+
+    def __init__(self, count: int) -> None:
+        self.landmarks = [synthetic_hand(0.3 + 0.4 * i, seed=10 + i) for i in range(count)]
+        self.handedness = []
+        for i in range(count):
+            classification = classification_pb2.ClassificationList()
+            classification.classification.add(index=i, score=0.95, label=("Right", "Left")[i % 2])
+            self.handedness.append(classification)
+
+    def process(self, rgb_frame: np.ndarray, **kwargs: Any) -> SimpleNamespace:
+        return SimpleNamespace(multi_hand_landmarks=self.landmarks, multi_handedness=self.handedness)
+
+    def close(self) -> None:
+        pass
+
+
+def build_benchmarks(image: Path, model_path: Optional[Path]) -> Tuple[List[Bench], List[Any]]:
+    # Importe ici: le chargement de l'app trace sur stdout (redirige vers stderr avec --json)
+    from backend.src.web_api import _decode_image_bytes, _hand_landmarks_json, _points_json
+
+    source = cv2.imread(str(image))
+    if source is None:
+        raise SystemExit(f"Image introuvable: {image}")
+    benches: List[Bench] = []
+    closers: List[Any] = []
+
+    frames: Dict[str, np.ndarray] = {}
+    for width, height in RESOLUTIONS:
+        label = f"{width}x{height}"
+        frame = cv2.resize(source, (width, height), interpolation=cv2.INTER_AREA)
+        frames[label] = frame
+        ok, buf = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 75])
+        jpeg = buf.tobytes()
+        benches.append(Bench(f"decode_image_bytes[{label}]", lambda jpeg=jpeg: _decode_image_bytes(jpeg, len(jpeg))))
+
+    # Memes reglages que le service (ASL_PADDING par defaut), detecteur a landmarks fixes
+    boxed = {count: HandROIExtractor(max_num_hands=count, hands=FixedHands(count)) for count in (1, 2)}
+    oriented = {
+        count: HandROIExtractor(max_num_hands=count, hands=FixedHands(count), oriented_size=ORIENTED_SIZE)
+        for count in (1, 2)
+    }
+    closers.extend(boxed.values())
+    closers.extend(oriented.values())
+    for label, frame in frames.items():
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        for count in (1, 2):
+            benches.append(
+                Bench(
+                    f"hand_roi.extract_rois[bbox,{count},{label}]",
+                    lambda frame=frame, rgb=rgb, extractor=boxed[count]: extractor.extract_rois(frame, rgb),
+                )
+            )
+            benches.append(
+                Bench(
+                    f"hand_roi.extract_rois[oriented,{count},{label}]",
+                    lambda frame=frame, rgb=rgb, extractor=oriented[count]: extractor.extract_rois(frame, rgb),
+                )
+            )
+        hand = oriented[1].hands.landmarks[0]
+        out = np.empty((ORIENTED_SIZE[1], ORIENTED_SIZE[0], 3), dtype=np.uint8)
+        benches.append(
+            Bench(f"hand_roi.warp_roi[{label}]", lambda rgb=rgb, hand=hand: oriented[1].warp_roi(rgb, hand, out))
+        )
+    height, width = frames["640x480"].shape[:2]
+    benches.append(
+        Bench(
+            "hand_roi.padded_bbox[21]",
+            lambda: boxed[1]._padded_bbox(boxed[1].hands.landmarks[0], width, height),
+        )
+    )
+
+    crop = frames["640x480"][120:360, 200:440].copy()
+    if model_path is not None and model_path.exists():
+        model = TFLiteModel(str(model_path))
+        size = model.get_input_size()
+        roi = cv2.resize(crop, size)
+        benches.append(Bench("tflite.preprocess[240x240]", lambda: model.preprocess(crop)))
+        benches.append(Bench(f"tflite.preprocess[{size[0]}x{size[1]}]", lambda: model.preprocess(roi, is_rgb=True)))
+        benches.append(Bench("tflite.predict[240x240]", lambda: model.predict(crop)))
+    else:
+        print(f"[Bench] modele absent ({model_path}): benchmarks TFLite ignores")
+
+    smoother = PredictionSmoother(window_size=5)
+    rng = np.random.default_rng(0)
+    for class_idx, confidence in zip(rng.integers(0, 29, size=5), rng.uniform(0.5, 1.0, size=5)):
+        smoother.add_prediction(int(class_idx), float(confidence))
+    benches.append(Bench("smoother.get_smoothed_prediction[5]", smoother.get_smoothed_prediction))
+
+    hand = synthetic_landmarks(21, seed=1)
+    pose = synthetic_landmarks(33, seed=2)
+    face = synthetic_landmarks(468, seed=3)
+    benches.append(Bench("serialize.hand_landmarks[21]", lambda: _hand_landmarks_json(hand)))
+    benches.append(Bench("serialize.pose_points[33]", lambda: _points_json(pose, 640, 480)))
+    benches.append(Bench("serialize.face_points[468/6]", lambda: _points_json(face, 640, 480, 6)))
+    return benches, closers
+
+
+def measure(fn: Callable[[], Any], rounds: int, min_time: float) -> Dict[str, Any]:
+    for _ in range(3):
+        fn()
+    iterations = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time or iterations >= 1_000_000:
+            break
+        iterations *= 2 if elapsed <= 0 else max(2, min(10, int(min_time / elapsed) + 1))
+    per_call: List[float] = []
+    for _ in range(max(1, rounds)):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        per_call.append((time.perf_counter() - started) / iterations * 1e6)
+    return {
+        "medianUs": round(statistics.median(per_call), 3),
+        "minUs": round(min(per_call), 3),
+        "iterations": iterations,
+        "rounds": len(per_call),
+    }
+
+
+def environment() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "opencvThreads": cv2.getNumThreads(),
+    }
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    regressions: List[str] = []
+    for name, result in results.items():
+        reference = baseline.get("results", {}).get(name)
+        if reference is None:
+            print(f"  {name:<40} {result['medianUs']:>12.2f} us   (pas de baseline)")
+            continue
+        ratio = result["medianUs"] / max(reference["medianUs"], 1e-9)
+        status = "REGRESSION" if ratio > 1.0 + threshold else ("mieux" if ratio < 1.0 - threshold else "ok")
+        if status == "REGRESSION":
+            regressions.append(name)
+        print(f"  {name:<40} {result['medianUs']:>12.2f} us   baseline {reference['medianUs']:>12.2f} us   x{ratio:.2f}  {status}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save", action="store_true", help="Ecrit les resultats comme nouvelle baseline")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Regression au-dela de +15%% (defaut)")
+    parser.add_argument("--filter", default="", help="Sous-chaine du nom des benchmarks a executer")
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--min-time", type=float, default=0.1, help="Duree minimale d'un tour en s")
+    parser.add_argument("--opencv-threads", type=int, default=1, help="Threads OpenCV (defaut: 1, stable)")
+    parser.add_argument("--image", type=Path, default=ROOT / "assets/alphabet.jpg")
+    parser.add_argument("--model", type=Path, default=Path(os.getenv("ASL_MODEL_PATH", str(ROOT / "backend/assets/model.tflite"))))
+    parser.add_argument("--json", action="store_true", help="Resultats JSON sur la sortie standard")
+    args = parser.parse_args()
+
+    if not args.save and not args.baseline.exists():
+        print(
+            f"[Bench] pas de baseline ({args.baseline}): l'enregistrer d'abord sur la machine de reference avec --save",
+            file=sys.stderr,
+        )
+        raise SystemExit(2)
+    # --json: la sortie standard ne porte que le rapport (traces des modeles et comparaison sur stderr)
+    with contextlib.redirect_stdout(sys.stderr if args.json else sys.stdout):
+        report, regressions = run(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    if regressions:
+        raise SystemExit(1)
+
+
+def run(args: argparse.Namespace) -> Tuple[Dict[str, Any], List[str]]:
+    """Mesure les benchmarks, puis enregistre la baseline (--save) ou compare a celle-ci."""
+    cv2.setNumThreads(args.opencv_threads)
+    benches, closers = build_benchmarks(args.image, args.model)
+    results: Dict[str, Dict[str, Any]] = {}
+    for bench in benches:
+        if args.filter and args.filter not in bench.name:
+            continue
+        results[bench.name] = measure(bench.fn, args.rounds, args.min_time)
+    for closer in closers:
+        closer.release()
+
+    report = {"environment": environment(), "results": results}
+    if args.save:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"[Bench] baseline enregistree: {args.baseline} ({len(results)} benchmarks)")
+        return report, []
+    baseline = json.loads(args.baseline.read_text())
+    if baseline.get("environment") != report["environment"]:
+        print(f"[Bench] attention: environnement different de la baseline ({baseline.get('environment')})")
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"[Bench] {len(regressions)} regression(s) au-dela de +{args.threshold:.0%}: {', '.join(regressions)}")
+    else:
+        print(f"[Bench] aucune regression au-dela de +{args.threshold:.0%}")
+    return report, regressions
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Compare l'empreinte des profils de deploiement (DEPLOY_PROFILE=asl|segmentation|all).
+
+Chaque profil est lance dans un processus neuf (les imports ne se defont pas): import de
+l'app, demarrage des services (graphes MediaPipe, interpreteur TFLite), puis rapport de
+`FootprintReport` (temps et RSS par phase, modules lourds charges).
+
+    python -m backend.tools.profile_footprint
+    python -m backend.tools.profile_footprint --profiles asl,all --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+from backend.src.deploy_profiles import PROFILES
+
+ROOT = Path(__file__).resolve().parents[2]
+MARKER = "FOOTPRINT "
+CHILD = f"""
+import json
+from backend.src import web_api
+web_api.startup_services()
+print({MARKER!r} + json.dumps(web_api.FOOTPRINT.stats()), flush=True)
+web_api.shutdown_services()
+"""
+
+
+def measure(profile: str, timeout: float) -> Dict[str, Any]:
+    env = dict(os.environ, DEPLOY_PROFILE=profile)
+    completed = subprocess.run(
+        [sys.executable, "-c", CHILD], cwd=ROOT, env=env, capture_output=True, text=True, timeout=timeout
+    )
+    for line in completed.stdout.splitlines():
+        if line.startswith(MARKER):
+            return json.loads(line[len(MARKER) :])
+    tail = (completed.stderr or completed.stdout).strip().splitlines()[-5:]
+    raise SystemExit(f"[Footprint] profil {profile}: echec (code {completed.returncode})\n" + "\n".join(tail))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", default=",".join(PROFILES), help="Profils a mesurer")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Delai max par profil en s")
+    parser.add_argument("--json", action="store_true", help="Resultats JSON sur la sortie standard")
+    args = parser.parse_args()
+
+    results: List[Dict[str, Any]] = [measure(p.strip(), args.timeout) for p in args.profiles.split(",") if p.strip()]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print("  profil         import ms  RSS Mo   startup ms  RSS Mo  modules")
+    for stats in results:
+        imported = stats["phases"].get("import", {})
+        started = stats["phases"].get("startup", {})
+        print(
+            f"  {stats['name']:<13} {imported.get('ms', 0):>10.0f} {imported.get('rssMb', 0):>7.0f} "
+            f"{started.get('ms', 0):>12.0f} {started.get('rssMb', 0):>7.0f}  {', '.join(stats['heavyModules'])}"
+        )
+
+
+if __name__ == "__main__":
+    main()
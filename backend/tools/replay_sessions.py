@@ -0,0 +1,182 @@
+"""
+Rejoue des sessions enregistrees (RECORD_SESSIONS=true) dans ASLService / SegmentationService.
+
+Les segments sont lus par mmap (backend/src/recorder.py). Chaque frame est redecodee et
+repassee dans le pipeline d'origine, au rythme d'origine (`--timing original`) ou au plus
+vite (`--timing fast`). Le rapport donne les latences par pipeline et, pour l'ASL, le nombre
+de lettres differentes de celles renvoyees en production.
+
+    python -m backend.tools.replay_sessions backend/recordings --timing fast --session abc
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from backend.src.raw_frames import ENCODED_FORMAT, raw_to_rgb, wrap_raw_frame
+from backend.src.recorder import Record, iter_records, list_segments, read_index
+from backend.src.web_api import AppConfig, ASLService, SegmentationService, _resolve_mediapipe_engine
+
+
+def _percentile(values: List[float], q: float) -> float:
+    return float(np.percentile(values, q)) if values else 0.0
+
+
+def iter_selected(paths: List[Path], session: Optional[str], pipeline: Optional[str], since: float) -> Iterator[Record]:
+    segments: List[Path] = []
+    for path in paths:
+        segments.extend(list_segments(path) if path.is_dir() else [path])
+    for segment in segments:
+        start = 0
+        if since > 0:
+            # Index: saute directement au premier enregistrement posterieur a --since
+            later = [offset for offset, ts in read_index(segment) if ts >= since]
+            if not later:
+                continue
+            start = later[0]
+        for record in iter_records(segment, start_offset=start):
+            if record.ts < since:
+                continue
+            if session and record.meta.get("session") != session:
+                continue
+            if pipeline and not str(record.meta.get("pipeline", "")).startswith(pipeline):
+                continue
+            yield record
+
+
+def decode(record: Record) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+    """(BGR, None) pour une image encodee, (None, RGB) pour des pixels bruts (copies hors mmap)."""
+    fmt = record.meta.get("format", ENCODED_FORMAT)
+    if fmt == ENCODED_FORMAT:
+        frame = cv2.imdecode(np.frombuffer(record.payload, np.uint8), cv2.IMREAD_COLOR)
+        if frame is None:
+            raise ValueError("Image invalide")
+        return frame, None
+    view = wrap_raw_frame(record.payload, fmt, int(record.meta["width"]), int(record.meta["height"]))
+    rgb, shares_buffer = raw_to_rgb(view, fmt)
+    return None, rgb.copy() if shares_buffer else rgb
+
+
+def _mask_options(pipeline: str) -> Tuple[Optional[Tuple[int, int]], str]:
+    if "+mask:" not in pipeline:
+        return None, "rle"
+    grid, _, fmt = pipeline.split("+mask:", 1)[1].partition(":")
+    width, _, height = grid.partition("x")
+    return (int(width), int(height)), fmt or "rle"
+
+
+def run_record(record: Record, asl: ASLService, seg: SegmentationService) -> Dict[str, Any]:
+    image, rgb = decode(record)
+    if rgb is None:
+        rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    session_id = str(record.meta.get("session", "replay"))
+    pipeline = str(record.meta.get("pipeline", "asl"))
+    mask_grid, mask_format = _mask_options(pipeline)
+    if pipeline == "asl":
+        return asl.predict(image, rgb=rgb, session_id=session_id)
+    if pipeline.startswith("analyze:"):
+        tasks = set(pipeline.split(":", 1)[1].split("+mask:")[0].split("+"))
+        response: Dict[str, Any] = {}
+        if "asl" in tasks:
+            response["asl"] = asl.predict(image, rgb=rgb, session_id=session_id)
+        if tasks & {"pose", "face"}:
+            response["segmentation"] = seg.predict(
+                image, with_face="face" in tasks, mask_grid=mask_grid, mask_format=mask_format, rgb=rgb,
+                session_id=session_id,
+            )
+        return response
+    return seg.predict(
+        image, with_face="+face" in pipeline, mask_grid=mask_grid, mask_format=mask_format, rgb=rgb,
+        session_id=session_id,
+    )
+
+
+def _asl_label(pipeline: str, result: Dict[str, Any]) -> Optional[str]:
+    if result.get("superseded") or result.get("frameReused"):
+        return None
+    if pipeline == "asl":
+        return result.get("label")
+    if pipeline.startswith("analyze:") and isinstance(result.get("asl"), dict):
+        return result["asl"].get("label")
+    return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", type=Path, help="Dossier d'enregistrement ou fichiers seg-*.rec")
+    parser.add_argument("--timing", choices=("original", "fast"), default="fast")
+    parser.add_argument("--session", default=None)
+    parser.add_argument("--pipeline", default=None, help="Prefixe de pipeline (asl, pose, analyze...)")
+    parser.add_argument("--since", type=float, default=0.0, help="Horodatage epoch de depart")
+    parser.add_argument("--limit", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Rapport JSON")
+    args = parser.parse_args()
+
+    cfg = AppConfig()
+    asl = ASLService(cfg)
+    seg_engine, seg_message = _resolve_mediapipe_engine(cfg, ("pose", "face"))
+    seg = SegmentationService(
+        face_stride=cfg.segmentation_face_stride,
+        engine=seg_engine,
+        engine_message=seg_message,
+        tasks_dir=cfg.mediapipe_tasks_dir,
+        tasks_mode=cfg.mediapipe_tasks_mode,
+    )
+    asl.start()
+    seg.start()
+
+    latencies: Dict[str, List[float]] = {}
+    compared = mismatches = errors = frames = 0
+    first_ts: Optional[float] = None
+    replay_start = time.perf_counter()
+    for record in iter_selected(args.paths, args.session, args.pipeline, args.since):
+        if args.limit and frames >= args.limit:
+            break
+        if args.timing == "original":
+            first_ts = record.ts if first_ts is None else first_ts
+            delay = (record.ts - first_ts) - (time.perf_counter() - replay_start)
+            if delay > 0:
+                time.sleep(delay)
+        pipeline = str(record.meta.get("pipeline", "asl"))
+        started = time.perf_counter()
+        try:
+            result = run_record(record, asl, seg)
+        except Exception as exc:
+            errors += 1
+            print(f"[Replay] {pipeline} @ {record.ts:.3f}: {exc}")
+            continue
+        frames += 1
+        latencies.setdefault(pipeline.split("+mask:")[0], []).append((time.perf_counter() - started) * 1000.0)
+        expected = _asl_label(pipeline, record.result)
+        if expected is not None:
+            compared += 1
+            mismatches += int(_asl_label(pipeline, result) != expected)
+
+    report = {
+        "frames": frames,
+        "errors": errors,
+        "aslCompared": compared,
+        "aslMismatches": mismatches,
+        "latencyMs": {
+            name: {"count": len(v), "p50": round(_percentile(v, 50), 2), "p95": round(_percentile(v, 95), 2),
+                   "p99": round(_percentile(v, 99), 2)}
+            for name, v in sorted(latencies.items())
+        },
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"[Replay] {frames} frames rejouees ({errors} erreurs), ASL: {mismatches}/{compared} lettres differentes")
+    for name, stats in report["latencyMs"].items():
+        print(f"[Replay] {name:<28} n={stats['count']:<5} p50={stats['p50']:.1f} ms p95={stats['p95']:.1f} ms p99={stats['p99']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
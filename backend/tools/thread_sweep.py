@@ -0,0 +1,144 @@
+"""
+Cherche la meilleure repartition du budget de threads pour un niveau de concurrence donne.
+
+Pour chaque repartition des coeurs entre OpenCV, TFLite et MediaPipe, lance N clients
+concurrents qui executent la chaine serveur (decodage JPEG, Hands, classifieur, Pose)
+sur des frames synthetiques issues de assets/alphabet.jpg, puis mesure debit et latences.
+
+    python -m backend.tools.thread_sweep --concurrency 4 --duration 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+from backend.src.hand_roi import HandROIExtractor
+from backend.src.inference_backends import build_backend
+from backend.src.preload import load_model_buffer
+from backend.src.tflite_infer import TFLiteModel
+from backend.src.thread_budget import ThreadBudget, available_cpus, limit_mediapipe_threads
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def _percentile(values: List[float], q: float) -> float:
+    return float(np.percentile(values, q)) if values else 0.0
+
+
+def candidate_splits(cpus: int, server: int) -> List[ThreadBudget]:
+    """Toutes les partitions des coeurs en (opencv, tflite, mediapipe), au moins 1 thread chacun."""
+    total = max(3, cpus)
+    splits = []
+    for opencv, tflite in itertools.product(range(1, total - 1), repeat=2):
+        mediapipe = total - opencv - tflite
+        if mediapipe >= 1:
+            splits.append(ThreadBudget(opencv=opencv, tflite=tflite, mediapipe=mediapipe, server=server))
+    return splits
+
+
+def _load_frame(image: Path, width: int) -> bytes:
+    frame = cv2.imread(str(image))
+    if frame is None:
+        raise SystemExit(f"Image introuvable: {image}")
+    height = int(frame.shape[0] * width / frame.shape[1])
+    ok, buf = cv2.imencode(".jpg", cv2.resize(frame, (width, height)), [cv2.IMWRITE_JPEG_QUALITY, 75])
+    if not ok:
+        raise SystemExit("Encodage JPEG impossible")
+    return buf.tobytes()
+
+
+def run_split(budget: ThreadBudget, model_content: bytes, jpeg: bytes, concurrency: int, duration: float) -> Dict[str, Any]:
+    cv2.setNumThreads(budget.opencv)
+    limit_mediapipe_threads(budget.mediapipe)
+    extractor = HandROIExtractor()
+    pose = mp.solutions.pose.Pose(static_image_mode=False, model_complexity=0)
+    model = TFLiteModel(backend=build_backend("tflite-xnnpack", model_content, None, num_threads=budget.tflite))
+    locks = {"hands": threading.Lock(), "model": threading.Lock(), "pose": threading.Lock()}
+    latencies: List[float] = []
+    latencies_lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client() -> None:
+        local: List[float] = []
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            frame = cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR)
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            with locks["hands"]:
+                extractor.hands.process(rgb)
+            h, w = frame.shape[:2]
+            with locks["model"]:
+                model.predict(frame[h // 4 : 3 * h // 4, w // 4 : 3 * w // 4])
+            with locks["pose"]:
+                pose.process(rgb)
+            local.append((time.perf_counter() - started) * 1000.0)
+        with latencies_lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    extractor.release()
+    pose.close()
+    return {
+        **budget.as_dict(),
+        "frames": len(latencies),
+        "fps": round(len(latencies) / elapsed, 2),
+        "p50Ms": round(_percentile(latencies, 50), 1),
+        "p95Ms": round(_percentile(latencies, 95), 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sweep du budget de threads (OpenCV / TFLite / MediaPipe)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Nombre de clients simultanes (defaut: 4)")
+    parser.add_argument("--duration", type=float, default=5.0, help="Duree de mesure par repartition en s (defaut: 5)")
+    parser.add_argument("--cpus", type=int, default=None, help="Coeurs a repartir (defaut: detection cgroup/affinite)")
+    parser.add_argument("--model", type=str, default=os.getenv("ASL_MODEL_PATH", str(ROOT / "backend/assets/model.tflite")))
+    parser.add_argument("--image", type=str, default=str(ROOT / "assets/alphabet.jpg"))
+    parser.add_argument("--width", type=int, default=640, help="Largeur des frames envoyees (defaut: 640)")
+    parser.add_argument("--objective", choices=("fps", "p95"), default="fps", help="Critere de classement")
+    parser.add_argument("--output", type=str, default=None, help="Fichier JSON de resultats (optionnel)")
+    args = parser.parse_args()
+
+    cpus = args.cpus or available_cpus()["cpus"]
+    model_content = load_model_buffer(Path(args.model))
+    jpeg = _load_frame(Path(args.image), args.width)
+    results = []
+    for budget in candidate_splits(cpus, server=max(4, 2 * args.concurrency)):
+        result = run_split(budget, model_content, jpeg, args.concurrency, args.duration)
+        print(f"[Sweep] {json.dumps(result)}")
+        results.append(result)
+
+    if args.objective == "fps":
+        results.sort(key=lambda r: (-r["fps"], r["p95Ms"]))
+    else:
+        results.sort(key=lambda r: (r["p95Ms"], -r["fps"]))
+    best = results[0]
+    best_budget = ThreadBudget(best["opencv"], best["tflite"], best["mediapipe"], best["server"])
+    print(f"[Sweep] cpus={cpus} concurrency={args.concurrency} objectif={args.objective}")
+    for result in results:
+        print(f"  opencv={result['opencv']} tflite={result['tflite']} mediapipe={result['mediapipe']} "
+              f"fps={result['fps']} p50={result['p50Ms']}ms p95={result['p95Ms']}ms")
+    print(f"[Sweep] Meilleure repartition: THREAD_BUDGET={best_budget.as_env()}")
+    if args.output:
+        Path(args.output).write_text(json.dumps({"cpus": cpus, "concurrency": args.concurrency, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Analyse hors ligne des traces JSONL (TRACE_SAMPLE_RATE > 0, backend/src/tracing.py).
+
+Par endpoint: latences p50/p95/p99 et duree mediane de chaque span. Les frames aberrantes
+(au-dessus du p99 de leur endpoint, ou de `--factor` fois la mediane) sont listees avec
+le span responsable (celui qui depasse le plus sa propre mediane) et leur cascade.
+
+    python -m backend.tools.trace_report backend/traces
+    python -m backend.tools.trace_report backend/traces --trace 7a06a59b26739dfc
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from backend.src.tracing import SPAN_NAMES
+
+WATERFALL_WIDTH = 60
+
+
+def iter_traces(paths: List[Path]) -> Iterator[Dict[str, Any]]:
+    files: List[Path] = []
+    for path in paths:
+        files.extend(sorted(path.glob("traces-*.jsonl")) if path.is_dir() else [path])
+    for file in files:
+        with open(file, "r", encoding="utf-8") as handle:
+            for line in handle:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # Derniere ligne tronquee (arret pendant l'ecriture)
+                    continue
+
+
+def span_totals(trace: Dict[str, Any]) -> Dict[str, float]:
+    totals: Dict[str, float] = {}
+    for span in trace["spans"]:
+        totals[span["name"]] = totals.get(span["name"], 0.0) + span["durationMs"]
+    return totals
+
+
+def waterfall(trace: Dict[str, Any], width: int = WATERFALL_WIDTH) -> str:
+    total = max(trace["durationMs"], 1e-6)
+    lines = [f"{trace['traceId']}  {trace['endpoint']}  session={trace['session']}  {total:.1f} ms  {trace.get('attrs', {})}"]
+    for span in trace["spans"]:
+        start = int(round(span["startMs"] / total * width))
+        length = max(1, int(round(span["durationMs"] / total * width)))
+        bar = " " * start + "#" * min(length, width - start)
+        lines.append(f"  {span['name']:<11}|{bar:<{width}}| {span['startMs']:8.1f} +{span['durationMs']:7.1f} ms")
+    return "\n".join(lines)
+
+
+def _span_order(name: str) -> int:
+    return SPAN_NAMES.index(name) if name in SPAN_NAMES else len(SPAN_NAMES)
+
+
+def analyze(traces: List[Dict[str, Any]], factor: float, limit: int) -> Dict[str, Any]:
+    by_endpoint: Dict[str, List[Dict[str, Any]]] = {}
+    for trace in traces:
+        by_endpoint.setdefault(trace["endpoint"], []).append(trace)
+    report: Dict[str, Any] = {"traces": len(traces), "endpoints": {}, "outliers": []}
+    outliers: List[Dict[str, Any]] = []
+    for endpoint, items in sorted(by_endpoint.items()):
+        durations = np.array([t["durationMs"] for t in items], dtype=np.float64)
+        p50, p95, p99 = (float(v) for v in np.percentile(durations, (50, 95, 99)))
+        spans: Dict[str, List[float]] = {}
+        for trace in items:
+            for name, value in span_totals(trace).items():
+                spans.setdefault(name, []).append(value)
+        span_median = {name: float(np.median(values)) for name, values in spans.items()}
+        report["endpoints"][endpoint] = {
+            "count": len(items),
+            "p50": round(p50, 2),
+            "p95": round(p95, 2),
+            "p99": round(p99, 2),
+            "spanMedianMs": {
+                name: round(span_median[name], 2) for name in sorted(span_median, key=_span_order)
+            },
+        }
+        threshold = min(p99, factor * p50) if len(items) >= 20 else factor * p50
+        for trace in items:
+            if trace["durationMs"] <= threshold:
+                continue
+            excess = {name: value - span_median.get(name, 0.0) for name, value in span_totals(trace).items()}
+            culprit = max(excess, key=excess.get) if excess else None
+            outliers.append(
+                {
+                    "traceId": trace["traceId"],
+                    "endpoint": endpoint,
+                    "durationMs": trace["durationMs"],
+                    "ratioToMedian": round(trace["durationMs"] / p50, 2) if p50 > 0 else None,
+                    "culprit": culprit,
+                    "culpritExcessMs": round(excess[culprit], 2) if culprit else 0.0,
+                    "trace": trace,
+                }
+            )
+    outliers.sort(key=lambda o: o["durationMs"], reverse=True)
+    report["outliers"] = outliers[:limit]
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", type=Path, help="Dossier TRACE_DIR ou fichiers traces-*.jsonl")
+    parser.add_argument("--endpoint", default=None, help="Filtrer un endpoint (ex: asl/predict)")
+    parser.add_argument("--trace", default=None, help="Afficher la cascade d'une trace")
+    parser.add_argument("--factor", type=float, default=3.0, help="Aberrante au-dela de factor x mediane")
+    parser.add_argument("--limit", type=int, default=10, help="Nombre de frames aberrantes affichees")
+    parser.add_argument("--json", action="store_true", help="Rapport JSON")
+    args = parser.parse_args()
+
+    traces = [t for t in iter_traces(args.paths) if not args.endpoint or t["endpoint"] == args.endpoint]
+    if args.trace:
+        found: Optional[Dict[str, Any]] = next((t for t in traces if t["traceId"] == args.trace), None)
+        print(waterfall(found) if found else f"[Traces] {args.trace} introuvable")
+        return
+    if not traces:
+        print("[Traces] aucune trace")
+        return
+    report = analyze(traces, args.factor, args.limit)
+    if args.json:
+        for outlier in report["outliers"]:
+            outlier.pop("trace")
+        print(json.dumps(report, indent=2))
+        return
+    print(f"[Traces] {report['traces']} traces")
+    for endpoint, stats in report["endpoints"].items():
+        spans = "  ".join(f"{name}={value:.1f}" for name, value in stats["spanMedianMs"].items())
+        print(
+            f"[Traces] {endpoint:<28} n={stats['count']:<5} p50={stats['p50']:.1f} ms "
+            f"p95={stats['p95']:.1f} ms p99={stats['p99']:.1f} ms"
+        )
+        print(f"         medianes: {spans}")
+    if report["outliers"]:
+        print(f"\n[Traces] {len(report['outliers'])} frames aberrantes")
+    for outlier in report["outliers"]:
+        print(f"\n-> x{outlier['ratioToMedian']} mediane, cause probable: {outlier['culprit']} (+{outlier['culpritExcessMs']} ms)")
+        print(waterfall(outlier["trace"]))
+
+
+if __name__ == "__main__":
+    main()
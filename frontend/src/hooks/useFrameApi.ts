@@ -1,15 +1,27 @@
 import { MutableRefObject, useEffect, useRef, useState } from "react";
 
+// VITE_FRAME_INGEST=rgba: pixels bruts du canvas (reduits a RAW_MAX_PIXELS) au lieu d'un JPEG
+const RAW_INGEST = import.meta.env.VITE_FRAME_INGEST === "rgba";
+const RAW_MAX_PIXELS = 640 * 480;
+
+function createSessionId(): string {
+  if (typeof crypto !== "undefined" && "randomUUID" in crypto) return crypto.randomUUID();
+  return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+}
+
 export function useFrameApi<T>(
   videoRef: MutableRefObject<HTMLVideoElement | null>,
   endpoint: string,
   running: boolean,
   fps = 10,
-  extraForm?: () => Record<string, string>
+  extraParams?: () => Record<string, string>,
+  // Post-traitement de la reponse (ex: decodage des deltas de points); null = reponse ignoree
+  transform?: (payload: T) => T | null
 ) {
   const [result, setResult] = useState<T | null>(null);
   const [error, setError] = useState<string | null>(null);
   const inFlight = useRef(false);
+  const sessionId = useRef(createSessionId());
 
   useEffect(() => {
     if (!running) return;
@@ -25,24 +37,39 @@ export function useFrameApi<T>(
       if (inFlight.current || !video.videoWidth || !video.videoHeight) return;
       inFlight.current = true;
       try {
-        canvas.width = video.videoWidth;
-        canvas.height = video.videoHeight;
+        const scale = RAW_INGEST ? Math.min(1, Math.sqrt(RAW_MAX_PIXELS / (video.videoWidth * video.videoHeight))) : 1;
+        canvas.width = Math.floor(video.videoWidth * scale);
+        canvas.height = Math.floor(video.videoHeight * scale);
         ctx.drawImage(video, 0, 0, canvas.width, canvas.height);
 
-        const blob = await new Promise<Blob | null>((resolve) => canvas.toBlob(resolve, "image/jpeg", 0.75));
-        if (!blob) throw new Error("Capture impossible");
-
-        const formData = new FormData();
-        formData.append("frame", blob, "frame.jpg");
-        if (extraForm) {
-          const extras = extraForm();
-          Object.keys(extras).forEach((key) => formData.append(key, extras[key]));
+        // Variante octet-stream: image dans le corps, options en parametres de requete
+        const params = new URLSearchParams(extraParams ? extraParams() : {});
+        let body: Blob | Uint8ClampedArray;
+        if (RAW_INGEST) {
+          body = ctx.getImageData(0, 0, canvas.width, canvas.height).data;
+          params.set("format", "rgba");
+          params.set("width", String(canvas.width));
+          params.set("height", String(canvas.height));
+        } else {
+          const blob = await new Promise<Blob | null>((resolve) => canvas.toBlob(resolve, "image/jpeg", 0.75));
+          if (!blob) throw new Error("Capture impossible");
+          body = blob;
         }
-
-        const response = await fetch(endpoint, { method: "POST", body: formData });
+        const query = params.toString();
+        const response = await fetch(`${endpoint}/binary${query ? `?${query}` : ""}`, {
+          method: "POST",
+          body,
+          headers: { "Content-Type": "application/octet-stream", "X-Session-Id": sessionId.current },
+        });
+        // Quota de frames de la session depasse: frame ignoree, on continue au rythme suivant
+        if (response.status === 429) return;
         if (!response.ok) throw new Error(`Erreur API ${response.status}`);
-        const payload = (await response.json()) as T;
-        setResult(payload);
+        const payload = (await response.json()) as T & { superseded?: boolean };
+        // Frame remplacee cote serveur par une plus recente: on garde l'affichage courant
+        if (!payload.superseded) {
+          const next = transform ? transform(payload) : payload;
+          if (next) setResult(next);
+        }
         setError(null);
       } catch {
         setError("Serveur indisponible");
@@ -52,7 +79,7 @@ export function useFrameApi<T>(
     }, interval);
 
     return () => window.clearInterval(timer);
-  }, [videoRef, endpoint, running, fps, extraForm]);
+  }, [videoRef, endpoint, running, fps, extraParams, transform]);
 
   return { result, error };
 }
@@ -0,0 +1,58 @@
+import { Point, PointsDelta, PointStream } from "../types";
+
+const STREAMS = ["posePoints", "facePoints"] as const;
+type StreamName = (typeof STREAMS)[number];
+
+function unpack(stream: PointStream): Int16Array {
+  const bytes = Uint8Array.from(atob(stream.data), (c) => c.charCodeAt(0));
+  const view = new DataView(bytes.buffer);
+  const values = new Int16Array(bytes.length / 2);
+  for (let i = 0; i < values.length; i += 1) values[i] = view.getInt16(i * 2, true);
+  return values;
+}
+
+// Reconstruit les points envoyes avec points=delta (voir backend/src/landmark_delta.py)
+export class LandmarkDeltaDecoder {
+  private seq: number | null = null;
+  private streams: Record<StreamName, Int16Array> = { posePoints: new Int16Array(0), facePoints: new Int16Array(0) };
+
+  // Parametre pointsBase a envoyer: absent tant qu'aucune image cle n'a ete recue
+  get base(): string | null {
+    return this.seq === null ? null : String(this.seq);
+  }
+
+  reset(): void {
+    this.seq = null;
+  }
+
+  // null si le delta ne s'applique pas a l'etat courant: la requete suivante redemande une image cle
+  apply(points: PointsDelta): Record<StreamName, Point[]> | null {
+    if (!points.key && points.base !== this.seq) {
+      this.reset();
+      return null;
+    }
+    for (const name of STREAMS) {
+      const values = unpack(points[name]);
+      if (points.key) {
+        this.streams[name] = values;
+        continue;
+      }
+      const current = this.streams[name];
+      for (let i = 0; i + 2 < values.length; i += 3) {
+        current[values[i] * 2] += values[i + 1];
+        current[values[i] * 2 + 1] += values[i + 2];
+      }
+    }
+    this.seq = points.seq;
+    const decoded = {} as Record<StreamName, Point[]>;
+    for (const name of STREAMS) {
+      const current = this.streams[name];
+      const list: Point[] = new Array(current.length / 2);
+      for (let i = 0; i < list.length; i += 1) {
+        list[i] = { x: current[i * 2] / points.scale, y: current[i * 2 + 1] / points.scale };
+      }
+      decoded[name] = list;
+    }
+    return decoded;
+  }
+}
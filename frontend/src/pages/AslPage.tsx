@@ -59,27 +59,34 @@ export default function AslPage() {
       ctx.clearRect(0, 0, w, h);
       if (!showLandmarks) return;
       const rect = getVideoRect(w, h, video.videoWidth, video.videoHeight, "cover");
-      const pts = result.handLandmarks || [];
-      ctx.lineWidth = 2;
-      ctx.strokeStyle = "#22d3ee";
-      HAND_CONNECTIONS.forEach(([a, b]) => {
-        if (!pts[a] || !pts[b]) return;
-        ctx.beginPath();
-        ctx.moveTo(rect.x + pts[a].x * rect.width, rect.y + pts[a].y * rect.height);
-        ctx.lineTo(rect.x + pts[b].x * rect.width, rect.y + pts[b].y * rect.height);
-        ctx.stroke();
-      });
-      ctx.fillStyle = "#a78bfa";
-      pts.forEach((p) => {
-        ctx.beginPath();
-        ctx.arc(rect.x + p.x * rect.width, rect.y + p.y * rect.height, 3, 0, Math.PI * 2);
-        ctx.fill();
+      const hands = result.hands?.length ? result.hands.map((hand) => hand.landmarks) : [result.handLandmarks || []];
+      hands.forEach((pts) => {
+        ctx.lineWidth = 2;
+        ctx.strokeStyle = "#22d3ee";
+        HAND_CONNECTIONS.forEach(([a, b]) => {
+          if (!pts[a] || !pts[b]) return;
+          ctx.beginPath();
+          ctx.moveTo(rect.x + pts[a].x * rect.width, rect.y + pts[a].y * rect.height);
+          ctx.lineTo(rect.x + pts[b].x * rect.width, rect.y + pts[b].y * rect.height);
+          ctx.stroke();
+        });
+        ctx.fillStyle = "#a78bfa";
+        pts.forEach((p) => {
+          ctx.beginPath();
+          ctx.arc(rect.x + p.x * rect.width, rect.y + p.y * rect.height, 3, 0, Math.PI * 2);
+          ctx.fill();
+        });
       });
     };
     draw();
     return () => cancelAnimationFrame(raf);
   }, [result, showLandmarks]);
 
+  // Texte decode: partie validee + fin de l'hypothese courante (grisee, encore revisable)
+  const text = result?.text;
+  const stableText = text && text.hypothesis.startsWith(text.committed) ? text.committed : "";
+  const pendingText = text ? text.hypothesis.slice(stableText.length) : "";
+
   const modelInfo = useMemo(() => {
     if (!result) return "en attente";
     if (result.modelStatus === "loaded") return "modele charge";
@@ -100,7 +107,12 @@ export default function AslPage() {
             <p className="text-sm text-slate-300">Confiance: {Math.round((result?.confidence ?? 0) * 100)}%</p>
             <p className="text-sm text-slate-300">Lettres/sec: {result?.lettersPerSecond ?? 0}</p>
             <p className="text-xs text-slate-400">{modelInfo}</p>
+            {result?.rejected ? <p className="text-xs text-amber-300">ROI ignoree: {result.rejected}</p> : null}
           </div>
+          <p className="min-h-6 break-words font-mono text-base text-slate-100">
+            {stableText}
+            <span className="text-slate-400">{pendingText}</span>
+          </p>
           <div className="overflow-x-auto whitespace-nowrap text-sm text-slate-200">{history.length ? history.join("  |  ") : "Historique vide"}</div>
           {camera.error ? <p className="text-sm text-rose-300">{camera.error}</p> : null}
         </div>
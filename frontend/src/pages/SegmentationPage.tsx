@@ -4,6 +4,7 @@ import { ToolTopBar } from "../components/ToolTopBar";
 import { VideoStage } from "../components/VideoStage";
 import { useCamera } from "../hooks/useCamera";
 import { useFrameApi } from "../hooks/useFrameApi";
+import { LandmarkDeltaDecoder } from "../lib/landmarkDelta";
 import { getVideoRect } from "../lib/videoRect";
 import { SegmentationResponse } from "../types";
 import { Button } from "../ui/button";
@@ -28,7 +29,25 @@ export default function SegmentationPage() {
   const [showFace, setShowFace] = useState(true);
   const [showLabels, setShowLabels] = useState(false);
 
-  const { result, error } = useFrameApi<SegmentationResponse>(videoRef, "/api/segmentation/predict", camera.running, 3, () => ({ withFace: String(showFace) }));
+  // Points en deltas int16 par rapport a la derniere reponse appliquee (pointsBase)
+  const pointsDecoder = useRef(new LandmarkDeltaDecoder());
+  const { result, error } = useFrameApi<SegmentationResponse>(
+    videoRef,
+    "/api/segmentation/predict",
+    camera.running,
+    3,
+    () => {
+      const params: Record<string, string> = { withFace: String(showFace), points: "delta" };
+      const base = pointsDecoder.current.base;
+      if (base !== null) params.pointsBase = base;
+      return params;
+    },
+    (payload) => {
+      if (!payload.points) return payload;
+      const points = pointsDecoder.current.apply(payload.points);
+      return points ? { ...payload, ...points } : null;
+    }
+  );
 
   useEffect(() => {
     if (!camera.stream || !videoRef.current) return;
@@ -1,5 +1,23 @@
 export type Point = { x: number; y: number };
 
+export type RoiRejection = "too_small" | "clipped" | "occluded" | "blurry";
+
+export type AslHand = {
+  label: string;
+  confidence: number;
+  handedness: string;
+  handednessScore: number;
+  bbox: [number, number, number, number];
+  landmarks: Point[];
+  rejected?: RoiRejection | null;
+  trackId?: number;
+};
+
+export type AslText = {
+  committed: string;
+  hypothesis: string;
+};
+
 export type AslResponse = {
   label: string;
   confidence: number;
@@ -7,13 +25,56 @@ export type AslResponse = {
   lettersPerSecond: number;
   handLandmarks: Point[];
   bbox: [number, number, number, number] | null;
+  hands?: AslHand[];
+  rejected?: RoiRejection | null;
+  text?: AslText;
   modelStatus: string;
   message?: string;
+  frameReused?: boolean;
+  superseded?: boolean;
+};
+
+export type SegmentationMask = {
+  width: number;
+  height: number;
+  format: "rle" | "png";
+  counts?: number[];
+  data?: string;
+};
+
+export type PointStream = {
+  count: number;
+  // int16 little-endian en base64: [x, y, ...] (image cle) ou [index, dx, dy, ...] (delta)
+  data: string;
+};
+
+export type PointsDelta = {
+  encoding: "delta";
+  seq: number;
+  base: number | null;
+  key: boolean;
+  scale: number;
+  posePoints: PointStream;
+  facePoints: PointStream;
 };
 
 export type SegmentationResponse = {
   posePoints: Point[];
   facePoints: Point[];
+  // Present avec points=delta (posePoints/facePoints absents, a reconstruire cote client)
+  points?: PointsDelta;
+  mask?: SegmentationMask | null;
+  qualityTier?: "high" | "balanced" | "reduced" | "minimal";
   modelStatus: string;
   message?: string;
+  frameReused?: boolean;
+  superseded?: boolean;
+};
+
+export type AnalyzeResponse = {
+  asl?: AslResponse;
+  segmentation?: SegmentationResponse;
+  timingsMs: Record<string, number>;
+  frameReused?: boolean;
+  superseded?: boolean;
 };